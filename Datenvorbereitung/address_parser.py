@@ -0,0 +1,145 @@
+import pandas as pd
+
+from gemeinde_matcher import label_gemeinden
+
+# Zuordnungstabelle Postleitzahl -> Gemeindeschlüssel (Spalten plz, gkz, ort), z.B. aus dem
+# Gemeindeverzeichnis von Destatis oder OpenGeoDB
+PLZ_GKZ_PATH = '../Datensatz/plz_gkz.csv'
+
+# Aufbau der Adresse: [Straße,] [Ortsteil,] PLZ Stadt[, Kreis]; bei mehreren Postleitzahlen zählt die letzte
+ADDRESS_PATTERN = r'^(?:(?P<prefix>.*),\s*)?(?P<plz>\d{5})\s+(?P<municipality>[^,]+?)(?:,\s*(?P<county>[^,]+))?$'
+
+# Merkmale eines Straßensegments: eine Hausnummer, ein Platzhalter für die verborgene Hausnummer
+# ('XXX', 'xx', '-') oder eine Straßenendung am Segmentende
+STREET_PATTERN = (r'\d|\s(?:[Xx]+|[-.+]+)$|(?i:(?:stra(?:ß|ss)e|str\.|weg|allee|platz|ring|gasse|damm|chaussee|ufer'
+                  r'|pfad|steig|stieg)(?:\s+[-.+]+)?)$')
+
+# Hinweistext, den ImmobilienScout24 bei verborgener Straße an die Adresse anhängt
+HIDDEN_ADDRESS_NOTE = r'(?s)\s*Die vollständige Adresse.*$'
+
+
+def parse_addresses(address):
+    """
+    Zerlegt alle Adressen vektorisiert in Straße, Postleitzahl, Ortsteil, Gemeinde und Kreis.
+
+    Args:
+        address (pd.Series): Adressspalte der Inserate.
+
+    Returns:
+        pd.DataFrame: Spalten street, plz, district, municipality und county (NaN, wenn nicht vorhanden).
+    """
+    normalized = (address.fillna('')
+                  .str.replace(HIDDEN_ADDRESS_NOTE, '', regex=True)
+                  .str.replace(r'\s*\n\s*', ' ', regex=True)
+                  .str.strip()
+                  .str.rstrip(','))
+    parsed = normalized.str.extract(ADDRESS_PATTERN)
+
+    # Vor der Postleitzahl stehen Straße und Ortsteil; ein einzelnes Segment ist ein Ortsteil, sofern es
+    # keine Hausnummer, keinen Platzhalter dafür und keine Straßenendung enthält
+    prefix = parsed['prefix'].str.rsplit(',', n=1, expand=True).reindex(columns=[0, 1])
+    single = prefix[1].isna()
+    is_street = prefix[0].str.strip().str.contains(STREET_PATTERN, na=False)
+    street = prefix[0].where(~single | is_street)
+    district = prefix[1].where(~single, prefix[0].where(~is_street))
+
+    return pd.DataFrame({
+        'street': street.str.strip(),
+        'plz': parsed['plz'],
+        'district': district.str.strip(),
+        'municipality': parsed['municipality'].str.strip(),
+        'county': parsed['county'].str.strip(),
+    }, index=address.index)
+
+
+# Funktion zur Vereinheitlichung von Gemeindeschlüsseln als ganze Zahl (führende Nullen entfallen)
+def normalize_gkz(gkz):
+    return pd.to_numeric(gkz, errors='coerce').astype('Int64')
+
+
+# Funktion zur Vereinheitlichung von Ortsnamen für den Vergleich
+def name_key(names):
+    return names.str.casefold().str.replace(r'[^\w]+', ' ', regex=True).str.strip()
+
+
+def load_plz_gkz(path=PLZ_GKZ_PATH):
+    """
+    Lädt die Zuordnung von Postleitzahlen zu Gemeindeschlüsseln.
+
+    Args:
+        path (str): CSV-Datei mit den Spalten plz, gkz und ort.
+
+    Returns:
+        pd.DataFrame: Eindeutige Zeilen mit plz (5-stellig), gkz (ganzzahlig) und ort_key.
+    """
+    plz_gkz = pd.read_csv(path, dtype={'plz': str, 'gkz': str})
+    plz_gkz['plz'] = plz_gkz['plz'].str.zfill(5)
+    plz_gkz['gkz'] = normalize_gkz(plz_gkz['gkz'])
+    plz_gkz['ort_key'] = name_key(plz_gkz['ort'])
+    return plz_gkz[['plz', 'gkz', 'ort_key']].drop_duplicates()
+
+
+def resolve_gkz(parsed, plz_gkz):
+    """
+    Bestimmt den Gemeindeschlüssel über Hash-Joins auf der Postleitzahl.
+
+    Zuerst wird über (Postleitzahl, Gemeindename) verknüpft, danach für die übrigen
+    Adressen über die Postleitzahl allein, sofern sie genau einer Gemeinde zugeordnet ist.
+
+    Args:
+        parsed (pd.DataFrame): Ergebnis von parse_addresses.
+        plz_gkz (pd.DataFrame): Ergebnis von load_plz_gkz.
+
+    Returns:
+        pd.DataFrame: Spalten gkz und gkz_source ('plz_ort', 'plz' oder NaN).
+    """
+    keys = pd.DataFrame({'plz': parsed['plz'], 'ort_key': name_key(parsed['municipality'])}, index=parsed.index)
+
+    by_name = plz_gkz.drop_duplicates(['plz', 'ort_key'])
+    # Der Left-Join auf eindeutige Schlüssel erhält Reihenfolge und Anzahl der Inserate
+    gkz = pd.Series(keys.merge(by_name, on=['plz', 'ort_key'], how='left')['gkz'].to_numpy(), index=keys.index)
+    source = pd.Series('plz_ort', index=parsed.index).where(gkz.notna())
+
+    unique_plz = plz_gkz.drop_duplicates(['plz', 'gkz']).drop_duplicates('plz', keep=False).set_index('plz')['gkz']
+    by_plz = keys['plz'].map(unique_plz)
+    source = source.where(gkz.notna(), pd.Series('plz', index=parsed.index).where(by_plz.notna()))
+    gkz = gkz.fillna(by_plz)
+
+    return pd.DataFrame({'gkz': gkz, 'gkz_source': source}, index=parsed.index)
+
+
+def enrich_listings(immobilien_data, gemeinden, plz_gkz):
+    """
+    Ergänzt die Inserate um die Adressbestandteile und den ganzzahligen Gemeindeschlüssel.
+
+    Die Zuordnung erfolgt über den Gemeindeschlüssel aus der Postleitzahl; nur die
+    verbleibenden Inserate werden per Freitextsuche über die Gemeindenamen zugeordnet.
+    Die Gemeindedaten selbst werden nicht angehängt, sondern beim Laden aus dem regionalen
+    Feature-Store (regional_feature_store.py) über GKZ1221 geholt.
+
+    Args:
+        immobilien_data (pd.DataFrame): Inserate mit den Spalten 'address' und 'title'.
+        gemeinden (pd.DataFrame): Gemeinden mit den Spalten 'GKZ1221' und 'clean_Gemeindename'.
+        plz_gkz (pd.DataFrame): Ergebnis von load_plz_gkz.
+
+    Returns:
+        pd.DataFrame: Inserate mit Adressspalten, GKZ1221 und gkz_source.
+    """
+    parsed = parse_addresses(immobilien_data['address'])
+    resolved = resolve_gkz(parsed, plz_gkz)
+
+    gemeinden = gemeinden.assign(GKZ1221=normalize_gkz(gemeinden['GKZ1221']))
+    known = resolved['gkz'].isin(gemeinden['GKZ1221'])
+    resolved = resolved.where(known)
+
+    # Freitextsuche nur für Inserate ohne Treffer über die Postleitzahl
+    remainder = immobilien_data.loc[~known]
+    if not remainder.empty:
+        names = label_gemeinden(remainder, gemeinden)
+        gkz_by_name = gemeinden.drop_duplicates('clean_Gemeindename').set_index('clean_Gemeindename')['GKZ1221']
+        resolved.loc[remainder.index, 'gkz'] = names.map(gkz_by_name)
+        resolved.loc[remainder.index, 'gkz_source'] = pd.Series('text', index=remainder.index).where(names.notna())
+
+    print(f"Zuordnung: {resolved['gkz_source'].value_counts(dropna=False).to_dict()}")
+    resolved['gkz'] = resolved['gkz'].astype('Int64')
+    return pd.concat([immobilien_data, parsed, resolved.rename(columns={'gkz': 'GKZ1221'})], axis=1)
@@ -0,0 +1,50 @@
+import contextlib
+import io
+import time
+
+from gemeinde_matcher import label_gemeinden
+from merge_gemeinden_zu_datensatz import clean_population_density_data, extract_gemeindename_debug, load_data
+
+
+# Funktion zur Messung der bisherigen Zuordnung per iterrows auf einer Stichprobe
+def time_iterrows_matcher(sample, population_density_data):
+    start = time.perf_counter()
+    # Die Debug-Ausgaben pro Zeile werden unterdrückt, damit nur die Suche gemessen wird
+    with contextlib.redirect_stdout(io.StringIO()):
+        names = sample.apply(lambda row: extract_gemeindename_debug(row, population_density_data), axis=1)
+    return names, time.perf_counter() - start
+
+
+# Funktion zur Messung des Index-Matchers auf allen Inseraten
+def time_index_matcher(immobilien_data, population_density_data):
+    start = time.perf_counter()
+    names = label_gemeinden(immobilien_data, population_density_data)
+    return names, time.perf_counter() - start
+
+
+# Hauptprogramm
+def main(sample_size=200):
+    population_density_data, immobilien_data = load_data("./kategorisierte_gemeinden.csv",
+                                                         "../Datensatz/Cleaned_Bundesland_HAUS/properties_sachsen.csv")
+    population_density_data = clean_population_density_data(population_density_data)
+    sample = immobilien_data.head(sample_size)
+
+    old_names, old_seconds = time_iterrows_matcher(sample, population_density_data)
+    new_names, new_seconds = time_index_matcher(immobilien_data, population_density_data)
+
+    old_per_listing = old_seconds / len(sample)
+    new_per_listing = new_seconds / len(immobilien_data)
+    print(f"iterrows: {old_per_listing * 1000:.2f} ms pro Inserat ({len(sample)} Inserate, "
+          f"hochgerechnet {old_per_listing * len(immobilien_data):.0f} s für alle {len(immobilien_data)})")
+    print(f"Index:    {new_per_listing * 1000:.3f} ms pro Inserat ({new_seconds:.2f} s für alle)")
+    print(f"Beschleunigung: {old_per_listing / new_per_listing:.0f}x")
+
+    # Abweichungen zeigen, wo der erste Teilstring-Treffer einen falschen Ort geliefert hat
+    differences = sample.assign(iterrows=old_names, index=new_names.loc[sample.index])
+    differences = differences[differences['iterrows'].fillna('') != differences['index'].fillna('')]
+    print(f"{len(differences)} von {len(sample)} Zuordnungen weichen ab, z.B.:")
+    print(differences[['address', 'iterrows', 'index']].head(10).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+import glob
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
+
+# Byte-Order-Marks und die zugehörigen Codierungen
+BOM_ENCODINGS = [
+    (b'\xef\xbb\xbf', 'utf-8-sig'),
+    (b'\xff\xfe', 'utf-16'),
+    (b'\xfe\xff', 'utf-16'),
+]
+
+# Mögliche Trennzeichen der Seiten-CSV-Dateien
+DELIMITERS = [',', '\t', ';']
+
+
+def sniff_csv_format(file_path, sample_size=4096):
+    """
+    Bestimmt Codierung, Trennzeichen und Kopfzeile einer CSV-Datei anhand der ersten Bytes.
+
+    Args:
+        file_path (str): Pfad zur CSV-Datei.
+        sample_size (int): Anzahl der gelesenen Bytes.
+
+    Returns:
+        tuple: (encoding, sep, columns) oder None, wenn die Datei leer ist.
+    """
+    with open(file_path, 'rb') as file:
+        sample = file.read(sample_size)
+    if not sample:
+        return None
+
+    encoding = None
+    for bom, bom_encoding in BOM_ENCODINGS:
+        if sample.startswith(bom):
+            encoding = bom_encoding
+            break
+    if encoding is None:
+        # UTF-16 ohne BOM ist an den Nullbytes jedes zweiten Zeichens erkennbar
+        if sample[1::2].count(0) > len(sample) // 4:
+            encoding = 'utf-16-le'
+        else:
+            try:
+                sample.decode('utf-8')
+                encoding = 'utf-8'
+            except UnicodeDecodeError as e:
+                # Ein am Ende der Stichprobe abgeschnittenes Zeichen ist kein Fehler
+                encoding = 'utf-8' if e.start >= len(sample) - 3 else 'latin-1'
+
+    text = sample.decode(encoding, errors='ignore').lstrip('\ufeff')
+    header = text.splitlines()[0] if text else ''
+    sep = max(DELIMITERS, key=header.count)
+    columns = [column.strip().strip('"') for column in header.split(sep)]
+    return encoding, sep, columns
+
+
+def read_csv_file(file_path, encoding, sep, engine, columns=None):
+    """
+    Liest eine einzelne CSV-Datei mit der zuvor erkannten Codierung und dem Trennzeichen.
+
+    Args:
+        file_path (str): Pfad zur CSV-Datei.
+        encoding (str): Codierung der Datei.
+        sep (str): Trennzeichen.
+        engine (str): 'pyarrow' oder 'c'.
+        columns (list, optional): Spalten der Kopfzeile; wenn angegeben, werden alle Spalten
+            unverändert als Text eingelesen.
+
+    Returns:
+        pd.DataFrame: Eingelesene Daten oder None, wenn die Datei nicht gelesen werden konnte.
+    """
+    try:
+        if engine == 'pyarrow':
+            # Adressen enthalten Zeilenumbrüche in Anführungszeichen, daher newlines_in_values
+            convert_options = pa_csv.ConvertOptions(column_types=dict.fromkeys(columns, pa.string())) \
+                if columns else None
+            table = pa_csv.read_csv(file_path,
+                                    read_options=pa_csv.ReadOptions(encoding=encoding),
+                                    parse_options=pa_csv.ParseOptions(delimiter=sep, newlines_in_values=True),
+                                    convert_options=convert_options)
+            return table.to_pandas()
+        return pd.read_csv(file_path, sep=sep, encoding=encoding, engine='c', dtype=str if columns else None)
+    except Exception as e:
+        print(f"Could not read file {os.path.basename(file_path)} due to error: {e}")
+        return None
+
+
+def check_schema(columns_by_file):
+    """
+    Prüft die Kopfzeilen aller Dateien einmalig gegen die häufigste Kopfzeile und meldet Abweichungen.
+
+    Args:
+        columns_by_file (dict): Dateipfad -> Liste der Spalten.
+
+    Returns:
+        list: Referenzschema oder None, wenn keine Dateien vorhanden sind.
+    """
+    header_counts = Counter(tuple(columns) for columns in columns_by_file.values())
+    if not header_counts:
+        return None
+    reference = list(header_counts.most_common(1)[0][0])
+    for file_path, columns in columns_by_file.items():
+        if list(columns) != reference:
+            print(f"Skipping {os.path.basename(file_path)}: columns {list(columns)} differ from {reference}")
+    return reference
+
+
+# Funktion zum Einlesen eines Dateipakets in einem Worker-Prozess
+def read_csv_batch(batch, engine):
+    frames = [read_csv_file(file_path, encoding, sep, engine) for file_path, encoding, sep in batch]
+    frames = [df for df in frames if df is not None]
+    return pd.concat(frames, ignore_index=True) if frames else None
+
+
+def load_csv_files(folder_path, pattern='*.csv', max_workers=None, engine=None, batch_size=64):
+    """
+    Lädt alle CSV-Dateien eines Verzeichnisses parallel und kombiniert sie in einem DataFrame.
+
+    Codierung und Trennzeichen werden vorab aus den ersten Bytes jeder Datei bestimmt, statt
+    eine Datei erst als UTF-8 zu parsen und nach einem Fehler erneut als UTF-16 einzulesen.
+    Das Spaltenschema wird einmalig anhand der Kopfzeilen geprüft; Dateien mit abweichendem
+    Schema werden gemeldet und nicht übernommen.
+
+    Args:
+        folder_path (str): Pfad zum Verzeichnis, das die CSV-Dateien enthält.
+        pattern (str): Glob-Muster der einzulesenden Dateien.
+        max_workers (int, optional): Anzahl der Prozesse (Standard: Anzahl der CPU-Kerne).
+        engine (str, optional): 'pyarrow' oder 'c'; standardmäßig pyarrow, falls installiert.
+        batch_size (int): Anzahl der Dateien, die ein Prozess pro Auftrag einliest.
+
+    Returns:
+        pd.DataFrame: Zusammengeführter DataFrame, der alle CSV-Daten enthält.
+    """
+    start = time.perf_counter()
+    engine = engine or ('pyarrow' if pa_csv is not None else 'c')
+    csv_files = sorted(glob.glob(os.path.join(folder_path, pattern)))
+
+    # Format und Kopfzeile jeder Datei bestimmen
+    formats = {}
+    for file_path in csv_files:
+        file_format = sniff_csv_format(file_path)
+        if file_format is None:
+            print(f"Skipping empty file {os.path.basename(file_path)}")
+            continue
+        formats[file_path] = file_format
+
+    reference = check_schema({file_path: columns for file_path, (_, _, columns) in formats.items()})
+    if reference is None:
+        print("No valid CSV files found.")
+        return pd.DataFrame()
+
+    tasks = [(file_path, encoding, sep) for file_path, (encoding, sep, columns) in formats.items()
+             if columns == reference]
+    batches = [tasks[i:i + batch_size] for i in range(0, len(tasks), batch_size)]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        frames = [df for df in executor.map(read_csv_batch, batches, [engine] * len(batches)) if df is not None]
+
+    total_bytes = sum(os.path.getsize(file_path) for file_path, _, _ in tasks)
+    report_throughput(len(tasks), total_bytes, time.perf_counter() - start, engine)
+
+    if frames:
+        return pd.concat(frames, ignore_index=True)[reference]
+    print("No valid CSV files found.")
+    return pd.DataFrame()
+
+
+# Funktion zur Ausgabe des Durchsatzes in Dateien und Megabyte pro Sekunde
+def report_throughput(num_files, total_bytes, seconds, engine):
+    megabytes = total_bytes / 1024 ** 2
+    seconds = max(seconds, 1e-9)
+    print(f"Loaded {num_files} files ({megabytes:.1f} MB) in {seconds:.2f} s with the {engine} engine: "
+          f"{num_files / seconds:.0f} files/s, {megabytes / seconds:.1f} MB/s")
+
+
+if __name__ == '__main__':
+    # Das Verzeichnis enthält neben den Seitendateien auch zusammengeführte properties_*.csv
+    load_csv_files(os.path.join('..', 'Datensatz', 'ALLCSV-Häuser'), pattern='HAUS_property_data_*.csv')
@@ -0,0 +1,140 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from merge_manifest import file_sha256, load_csv_files_incremental
+
+# Zielverzeichnis des Parquet-Datensatzes
+DATASET_DIR = os.path.join('..', 'Datensatz', 'Parquet')
+
+# Quellen je Verarbeitungsstufe: (Stufe, Immobilienart, Verzeichnis, Dateimuster mit {location})
+SOURCES = [
+    ('raw', 'haus', os.path.join('..', 'Datensatz', 'ALLCSV-Häuser'), 'HAUS_property_data_{location}_page_*.csv'),
+    ('raw', 'wohnung', os.path.join('..', 'Datensatz', 'AllCSV-Wohnungen'), 'property_data_{location}_page_*.csv'),
+    ('cleaned', 'haus', os.path.join('..', 'Datensatz', 'Cleaned_Bundesland_HAUS'), 'properties_{location}.csv'),
+    ('cleaned', 'wohnung', os.path.join('..', 'Datensatz', 'Cleaned_Bundesland_WOHNUNGEN'), 'properties_{location}.csv'),
+]
+
+# Partitionsschlüssel des Datensatzes
+PARTITION_COLUMNS = ['property_kind', 'bundesland']
+
+# Textspalten mit wenigen unterschiedlichen Werten, die als Dictionary gespeichert werden
+DICTIONARY_COLUMNS = ['type', 'available_from', 'garage_parking', 'buyer_commission', 'rooms', 'bedrooms',
+                      'bathrooms']
+
+locations = [
+    'baden-wuerttemberg', 'bayern', 'berlin', 'brandenburg', 'bremen', 'hamburg',
+    'hessen', 'mecklenburg-vorpommern', 'niedersachsen', 'nordrhein-westfalen',
+    'rheinland-pfalz', 'saarland', 'sachsen', 'sachsen-anhalt', 'schleswig-holstein', 'thueringen'
+]
+
+
+def read_source(stage, property_kind, folder_path, pattern, seen_hashes):
+    """
+    Liest alle Dateien einer Quelle je Bundesland ein. Dateien, deren Inhalt in derselben Stufe
+    bereits für dieselbe Immobilienart konvertiert wurde, werden mit einer Meldung übersprungen.
+
+    Args:
+        stage (str): Verarbeitungsstufe ('raw' oder 'cleaned').
+        property_kind (str): Immobilienart ('haus' oder 'wohnung').
+        folder_path (str): Verzeichnis der Quelldateien.
+        pattern (str): Dateimuster mit dem Platzhalter {location}.
+        seen_hashes (set): (Stufe, Immobilienart, Inhalts-Hash) bereits konvertierter Dateien.
+
+    Returns:
+        list: DataFrames mit den Partitionsspalten property_kind und bundesland.
+    """
+    frames = []
+    for location in locations:
+        location_pattern = pattern.format(location=location)
+        if stage == 'raw':
+            # Die Seitendateien werden über den Manifest-Cache der Zusammenführung gelesen
+            df = load_csv_files_incremental(folder_path, pattern=location_pattern)
+        else:
+            file_path = os.path.join(folder_path, location_pattern)
+            if not os.path.exists(file_path):
+                continue
+            # Gleicher Inhalt unter einer anderen Immobilienart ergibt eine eigene Partition
+            key = (stage, property_kind, file_sha256(file_path))
+            if key in seen_hashes:
+                print(f"Skipping {file_path}: identical content already converted for {property_kind}")
+                continue
+            seen_hashes.add(key)
+            df = pd.read_csv(file_path)
+        if df.empty:
+            continue
+        df['property_kind'] = property_kind
+        df['bundesland'] = location
+        frames.append(df)
+    return frames
+
+
+def convert_to_dataset(dataset_dir=DATASET_DIR, sources=SOURCES):
+    """
+    Konvertiert die CSV-Dateien in einen nach Immobilienart und Bundesland partitionierten
+    Parquet-Datensatz je Verarbeitungsstufe ({dataset_dir}/{stage}/property_kind=.../bundesland=...).
+
+    Args:
+        dataset_dir (str): Zielverzeichnis.
+        sources (list): Quellen als (Stufe, Immobilienart, Verzeichnis, Dateimuster).
+    """
+    seen_hashes = set()
+    for stage in dict.fromkeys(source[0] for source in sources):
+        frames = []
+        for source_stage, property_kind, folder_path, pattern in sources:
+            if source_stage == stage:
+                frames.extend(read_source(stage, property_kind, folder_path, pattern, seen_hashes))
+        if not frames:
+            print(f"No CSV files found for stage {stage}.")
+            continue
+
+        # Gemeinsames Zusammenführen gleicht die Spaltentypen aller Partitionen an
+        df = pd.concat(frames, ignore_index=True)
+        # Als category gespeicherte Spalten werden in Parquet dictionary-codiert und als category zurückgelesen
+        dictionary_columns = [column for column in DICTIONARY_COLUMNS
+                              if column in df.columns and df[column].dtype == object]
+        for column in dictionary_columns + PARTITION_COLUMNS:
+            df[column] = df[column].astype('category')
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        stage_dir = os.path.join(dataset_dir, stage)
+        pq.write_to_dataset(table, stage_dir, partition_cols=PARTITION_COLUMNS,
+                            existing_data_behavior='delete_matching', compression='zstd')
+        print(f"Stage {stage}: {len(df)} rows written to {stage_dir}")
+
+
+def load_listings(stage='cleaned', columns=None, property_kind=None, bundesland=None, filters=None,
+                  dataset_dir=DATASET_DIR):
+    """
+    Lädt Inserate aus dem Parquet-Datensatz. Es werden nur die angeforderten Spalten und nur
+    die Partitionen gelesen, die zu property_kind und bundesland passen.
+
+    Args:
+        stage (str): Verarbeitungsstufe ('raw' oder 'cleaned').
+        columns (list, optional): Zu lesende Spalten; None liest alle Spalten.
+        property_kind (str or list, optional): 'haus' und/oder 'wohnung'.
+        bundesland (str or list, optional): Ein oder mehrere Bundesländer.
+        filters (list, optional): Zusätzliche Filter im pyarrow-Format, z.B. [('price', '<', 500000)].
+        dataset_dir (str): Verzeichnis des Datensatzes.
+
+    Returns:
+        pd.DataFrame: Die gefilterten Inserate.
+    """
+    partition_filters = []
+    for name, value in (('property_kind', property_kind), ('bundesland', bundesland)):
+        if value is None:
+            continue
+        if isinstance(value, str):
+            partition_filters.append((name, '=', value))
+        else:
+            partition_filters.append((name, 'in', list(value)))
+
+    return pd.read_parquet(os.path.join(dataset_dir, stage), engine='pyarrow', columns=columns,
+                           filters=partition_filters + list(filters or []) or None)
+
+
+if __name__ == '__main__':
+    convert_to_dataset()
+    print(load_listings(columns=['price'], bundesland='hessen').describe())
@@ -0,0 +1,72 @@
+import pandas as pd
+
+from address_parser import HIDDEN_ADDRESS_NOTE, name_key
+
+# Spalten, aus denen der Schlüssel eines Inserats gebildet wird
+KEY_COLUMNS = ['title', 'address', 'price', 'living_space', 'property_area']
+
+
+# Funktion zur Normalisierung von Textspalten (Adresshinweis, Groß-/Kleinschreibung, Satzzeichen, Leerraum)
+def normalize_text(values):
+    return name_key(values.fillna('').astype(str).str.replace(HIDDEN_ADDRESS_NOTE, '', regex=True))
+
+
+# Funktion zur Normalisierung von Preisen und Flächen; Rohtexte wie "153,19 m²" werden in Zahlen umgewandelt
+def normalize_number(values):
+    if not pd.api.types.is_numeric_dtype(values):
+        values = pd.to_numeric(values.astype(str)
+                               .str.replace(r'[^\d,]', '', regex=True)
+                               .str.replace(',', '.', regex=False),
+                               errors='coerce')
+    return values.round(2)
+
+
+def listing_keys(data, columns=KEY_COLUMNS):
+    """
+    Bildet für jedes Inserat einen 64-Bit-Schlüssel aus den normalisierten Schlüsselspalten.
+
+    Args:
+        data (pd.DataFrame): Inserate.
+        columns (list): Schlüsselspalten; fehlende Spalten werden ignoriert.
+
+    Returns:
+        pd.Series: uint64-Schlüssel je Inserat.
+    """
+    normalized = pd.DataFrame(index=data.index)
+    for column in columns:
+        if column not in data.columns:
+            continue
+        if column in ('title', 'address'):
+            normalized[column] = normalize_text(data[column])
+        else:
+            normalized[column] = normalize_number(data[column])
+    return pd.util.hash_pandas_object(normalized, index=False)
+
+
+def deduplicate(data, groups=None, columns=KEY_COLUMNS):
+    """
+    Entfernt exakte Duplikate anhand des 64-Bit-Schlüssels und meldet die Duplikatraten.
+
+    Es wird nur der Schlüssel je Zeile sortiert bzw. gehasht, sodass auch der gesamte
+    bundesweite Datensatz ohne paarweise Vergleiche verarbeitet wird. Behalten wird jeweils
+    das erste Vorkommen.
+
+    Args:
+        data (pd.DataFrame): Inserate.
+        groups (pd.Series, optional): Gruppierung für den Bericht, z.B. das Bundesland je Zeile.
+        columns (list): Schlüsselspalten.
+
+    Returns:
+        tuple: (deduplizierter DataFrame, DataFrame mit Inseraten, Duplikaten und Rate je Gruppe)
+    """
+    duplicated = listing_keys(data, columns).duplicated(keep='first')
+    groups = groups if groups is not None else pd.Series('gesamt', index=data.index)
+
+    report = duplicated.groupby(groups).agg(['size', 'sum', 'mean'])
+    report.columns = ['listings', 'duplicates', 'duplicate_rate']
+    report.loc['gesamt'] = [len(data), int(duplicated.sum()), duplicated.mean() if len(data) else 0.0]
+    report = report[~report.index.duplicated(keep='last')]
+
+    print(f"Removed {int(duplicated.sum())} of {len(data)} listings as exact duplicates")
+    print(report.to_string(formatters={'duplicate_rate': '{:.1%}'.format}))
+    return data.loc[~duplicated], report
@@ -0,0 +1,93 @@
+import re
+
+import pandas as pd
+
+# Wörter einschließlich Bindestrich- und Punkt-Verbindungen (z.B. "Baden-Baden", "St.Ingbert")
+TOKEN_PATTERN = re.compile(r'\w+(?:[-.]\w+)*')
+PLZ_PATTERN = re.compile(r'^\d{5}$')
+
+
+def tokenize(text):
+    """
+    Zerlegt einen Text in kleingeschriebene Wort-Token.
+
+    Args:
+        text (str): Adresse, Titel oder Gemeindename.
+
+    Returns:
+        tuple: Token in der Reihenfolge des Textes.
+    """
+    if not isinstance(text, str):
+        return ()
+    return tuple(TOKEN_PATTERN.findall(text.casefold()))
+
+
+class GemeindeMatcher:
+    """
+    Mehrmuster-Index über alle Gemeindenamen, der ganze Token vergleicht.
+
+    Wie bei Aho-Corasick wird jeder Text in einem Durchlauf gegen alle Namen zugleich
+    geprüft; da Treffer nur an Token-Grenzen beginnen dürfen, genügt als Automat ein
+    Hash-Index vom ersten Token eines Namens auf alle Namen mit diesem Anfang. Ein Text mit
+    n Token wird damit in O(n * k) geprüft (k = Namen je Anfangstoken), unabhängig von der
+    Anzahl der Gemeinden. Gibt es mehrere Treffer, gewinnt ein Name direkt hinter einer
+    Postleitzahl, danach der längste Name (erst nach Token, dann nach Zeichen).
+
+    Args:
+        names (iterable): Bereinigte Gemeindenamen (clean_Gemeindename).
+    """
+
+    def __init__(self, names):
+        self.index = {}
+        for name in dict.fromkeys(names):
+            tokens = tokenize(name)
+            if tokens:
+                self.index.setdefault(tokens[0], []).append((tokens, name))
+        # Längere Namen zuerst, damit bei gleichem Anfang der längste Treffer zuerst gefunden wird
+        for candidates in self.index.values():
+            candidates.sort(key=lambda candidate: (len(candidate[0]), len(candidate[1])), reverse=True)
+
+    def find(self, text):
+        """
+        Sucht den besten Gemeindenamen in einem Text.
+
+        Returns:
+            str: Gemeindename oder None, wenn kein Name als ganze Token-Folge vorkommt.
+        """
+        tokens = tokenize(text)
+        best = None
+        best_rank = None
+        for position, token in enumerate(tokens):
+            for name_tokens, name in self.index.get(token, ()):
+                if tokens[position:position + len(name_tokens)] != name_tokens:
+                    continue
+                follows_plz = position > 0 and PLZ_PATTERN.match(tokens[position - 1]) is not None
+                rank = (follows_plz, len(name_tokens), len(name))
+                if best_rank is None or rank > best_rank:
+                    best, best_rank = name, rank
+                # Kandidaten sind absteigend sortiert, der erste Treffer ist der längste an dieser Position
+                break
+        return best
+
+    def match(self, address, title):
+        """
+        Sucht zuerst in der Adresse und nur ohne Treffer dort im Titel.
+        """
+        return self.find(address) or self.find(title)
+
+
+def label_gemeinden(immobilien_data, population_density_data):
+    """
+    Ordnet allen Inseraten in einem Durchlauf ihren Gemeindenamen zu.
+
+    Args:
+        immobilien_data (pd.DataFrame): Inserate mit den Spalten 'address' und 'title'.
+        population_density_data (pd.DataFrame): Gemeinden mit der Spalte 'clean_Gemeindename'.
+
+    Returns:
+        pd.Series: Gemeindename je Inserat oder None.
+    """
+    matcher = GemeindeMatcher(population_density_data['clean_Gemeindename'].dropna())
+    names = [matcher.match(address, title)
+             for address, title in zip(immobilien_data['address'], immobilien_data['title'])]
+    return pd.Series(names, index=immobilien_data.index, dtype=object)
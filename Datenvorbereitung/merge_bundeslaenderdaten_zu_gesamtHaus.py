@@ -1,51 +1,7 @@
 import os
-import pandas as pd
 
-
-def load_csv_files(folder_path):
-    """
-    Lädt alle CSV-Dateien aus einem angegebenen Verzeichnis, behandelt verschiedene Codierungen und
-    kombiniert sie in einem DataFrame.
-
-    Args:
-        folder_path (str): Pfad zum Verzeichnis, das die CSV-Dateien enthält.
-
-    Returns:
-        pd.DataFrame: Zusammengeführter DataFrame, der alle CSV-Daten enthält.
-    """
-    # Liste aller Dateien im Verzeichnis
-    all_files = os.listdir(folder_path)
-
-    # Filterung der CSV-Dateien
-    csv_files = [f for f in all_files if f.endswith('.csv')]
-
-    # Liste zur Speicherung der DataFrames
-    df_list = []
-
-    # Einlesen jeder CSV-Datei
-    for csv_file in csv_files:
-        file_path = os.path.join(folder_path, csv_file)
-        try:
-            # Versuch, die Datei im UTF-8-Format einzulesen
-            df = pd.read_csv(file_path)
-            df_list.append(df)
-        except UnicodeDecodeError:
-            try:
-                # Falls UTF-8 fehlschlägt, versuche UTF-16 mit Tabulator-Trennung
-                df = pd.read_csv(file_path, sep='\t', encoding='utf-16')
-                df_list.append(df)
-            except Exception as e:
-                print(f"Could not read file {csv_file} due to error: {e}")
-        except Exception as e:
-            print(f"Could not read file {csv_file} due to error: {e}")
-
-    # Zusammenführung aller DataFrames in einen einzigen DataFrame
-    if df_list:
-        combined_df = pd.concat(df_list, ignore_index=True)
-        return combined_df
-    else:
-        print("No valid CSV files found.")
-        return pd.DataFrame()
+from deduplizierung import deduplicate
+from merge_manifest import load_csv_files_incremental
 
 
 def save_combined_data(df, output_path):
@@ -65,11 +21,14 @@ def main():
     output_file = 'ALL_HAUS.csv'  # Name der Ausgabedatei
     output_path = os.path.join(folder_path, output_file)
 
-    # Lade und kombiniere die CSV-Dateien
-    combined_df = load_csv_files(folder_path)
+    # Lade und kombiniere die CSV-Dateien (ohne eine bereits vorhandene ALL_HAUS.csv);
+    # nur neue oder geänderte Dateien werden geparst, alle übrigen stammen aus dem Cache
+    combined_df = load_csv_files_incremental(folder_path, pattern='properties_*.csv', source_column='source_file')
 
-    # Speichere den kombinierten DataFrame
+    # Speichere den kombinierten DataFrame ohne Inserate, die in mehreren Bundesländern vorkommen
     if not combined_df.empty:
+        bundesland = combined_df.pop('source_file').str.replace('properties_', '', regex=False)
+        combined_df, _ = deduplicate(combined_df, groups=bundesland)
         save_combined_data(combined_df, output_path)
 
 
@@ -1,7 +1,10 @@
 import os
-import glob
+
 import pandas as pd
 
+from deduplizierung import deduplicate
+from merge_manifest import load_csv_files_incremental
+
 # Liste der zu verarbeitenden Standorte/Bundesländer
 locations = [
     'baden-wuerttemberg', 'bayern', 'berlin', 'brandenburg', 'bremen', 'hamburg',
@@ -9,33 +12,32 @@ locations = [
     'rheinland-pfalz', 'saarland', 'sachsen', 'sachsen-anhalt', 'schleswig-holstein', 'thueringen'
 ]
 
-# Verzeichnis, in dem sich die CSV-Dateien befinden (angenommen, sie befinden sich im gleichen Verzeichnis wie das Skript)
-directory = os.getcwd()
 
-# Verarbeiten jeder Region/Bundesland
-for location in locations:
-    # Muster für das Auffinden aller CSV-Dateien, die zu dem aktuellen Bundesland gehören
-    pattern = f'HAUS_property_data_{location}_page_*.csv'
-    csv_files = glob.glob(os.path.join(directory, pattern))
+def main():
+    # Verzeichnis, in dem sich die CSV-Dateien befinden (angenommen, sie befinden sich im gleichen Verzeichnis wie das Skript)
+    directory = os.getcwd()
+
+    # Verarbeiten jeder Region/Bundesland
+    for location in locations:
+        # Muster für das Auffinden aller CSV-Dateien, die zu dem aktuellen Bundesland gehören;
+        # nur neue oder geänderte Seiten werden geparst, alle übrigen stammen aus dem Cache
+        combined_df = load_csv_files_incremental(directory, pattern=f'HAUS_property_data_{location}_page_*.csv')
 
-    # Initialisierung einer leeren Liste zur Speicherung der DataFrames
-    df_list = []
+        # Wenn Daten gefunden wurden, diese ohne mehrfach gelistete Inserate speichern
+        if not combined_df.empty:
+            combined_df, _ = deduplicate(combined_df, groups=pd.Series(location, index=combined_df.index))
 
-    # Einlesen jeder gefundenen CSV-Datei und Anhängen an die Liste
-    for file in csv_files:
-        df = pd.read_csv(file)
-        df_list.append(df)
+            # Name der Ausgabedatei basierend auf dem aktuellen Standort/Bundesland
+            output_file = f'properties_{location}.csv'
 
-    # Wenn DataFrames gefunden wurden, diese zusammenführen und speichern
-    if df_list:
-        combined_df = pd.concat(df_list, ignore_index=True)
+            # Speichern des zusammengeführten DataFrames in eine neue CSV-Datei
+            combined_df.to_csv(os.path.join(directory, output_file), index=False)
 
-        # Name der Ausgabedatei basierend auf dem aktuellen Standort/Bundesland
-        output_file = f'properties_{location}.csv'
+            print(f"All CSV files for {location} have been combined into {output_file}")
+        else:
+            print(f"No CSV files found for {location}.")
 
-        # Speichern des zusammengeführten DataFrames in eine neue CSV-Datei
-        combined_df.to_csv(os.path.join(directory, output_file), index=False)
 
-        print(f"All CSV files for {location} have been combined into {output_file}")
-    else:
-        print(f"No CSV files found for {location}.")
+# Die Prozesse des Einlesens benötigen einen geschützten Einstiegspunkt
+if __name__ == '__main__':
+    main()
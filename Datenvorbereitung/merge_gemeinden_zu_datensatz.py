@@ -4,6 +4,9 @@ import seaborn as sns
 import os
 from scipy.stats import ttest_ind, mannwhitneyu
 
+from address_parser import PLZ_GKZ_PATH, enrich_listings, load_plz_gkz
+from gemeinde_matcher import label_gemeinden
+
 
 # Funktion zum Laden der Daten
 def load_data(population_density_path, properties_path):
@@ -38,10 +41,10 @@ def extract_gemeindename_debug(row, population_density_data):
     return None
 
 
-# Anwenden der Match-Funktion auf die Immobilien-Daten
+# Anwenden der Match-Funktion auf die Immobilien-Daten über einen vorab aufgebauten Index aller Gemeindenamen
 def match_gemeindename(immobilien_data, population_density_data):
-    immobilien_data['Gemeindename'] = immobilien_data.apply(
-        lambda row: extract_gemeindename_debug(row, population_density_data), axis=1)
+    immobilien_data['Gemeindename'] = label_gemeinden(immobilien_data, population_density_data)
+    print(f"{immobilien_data['Gemeindename'].notna().sum()} von {len(immobilien_data)} Inseraten zugeordnet")
     return immobilien_data
 
 
@@ -69,11 +72,17 @@ def main():
     # Bereinigung der Gemeindenamen
     population_density_data = clean_population_density_data(population_density_data)
 
-    # Match der Gemeindenamen
-    immobilien_data = match_gemeindename(immobilien_data, population_density_data)
-
-    # Zusammenführen der gematchten Daten
-    matched_data = merge_matched_data(immobilien_data, population_density_data)
+    if os.path.exists(PLZ_GKZ_PATH):
+        # Zuordnung über Postleitzahl und Gemeindeschlüssel, Freitextsuche nur für den Rest;
+        # gespeichert wird nur GKZ1221, die Gemeindedaten liefert der regionale Feature-Store
+        enriched_data = enrich_listings(immobilien_data, population_density_data, load_plz_gkz(PLZ_GKZ_PATH))
+        matched_data = enriched_data.dropna(subset=['GKZ1221'])
+    else:
+        # Match der Gemeindenamen
+        immobilien_data = match_gemeindename(immobilien_data, population_density_data)
+
+        # Zusammenführen der gematchten Daten
+        matched_data = merge_matched_data(immobilien_data, population_density_data)
 
     # Speichern der gematchten Daten
     save_matched_data(matched_data, output_path)
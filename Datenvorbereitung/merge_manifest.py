@@ -0,0 +1,192 @@
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from csv_ingest import check_schema, pa_csv, read_csv_file, report_throughput, sniff_csv_format
+
+# Standardverzeichnis für Manifest und zwischengespeicherte Partitionen
+CACHE_DIR = '.merge_cache'
+
+
+def file_sha256(file_path, block_size=1024 * 1024):
+    """
+    Berechnet den SHA-256-Hash des Dateiinhalts.
+
+    Args:
+        file_path (str): Pfad zur Datei.
+        block_size (int): Größe der gelesenen Blöcke in Bytes.
+
+    Returns:
+        str: Hexadezimaler Hash.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class MergeManifest:
+    """
+    Manifest der Quelldateien mit Größe, Änderungszeit, Inhalts-Hash, Spalten und der
+    zugehörigen Parquet-Partition. Partitionen werden nach dem Inhalts-Hash benannt und
+    können so von mehreren Zusammenführungen gemeinsam genutzt werden.
+
+    Args:
+        cache_dir (str): Verzeichnis für manifest.json und die Partitionen.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, 'manifest.json')
+        os.makedirs(os.path.join(cache_dir, 'partitions'), exist_ok=True)
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as file:
+                self.entries = json.load(file)
+        else:
+            self.entries = {}
+
+    def partition_path(self, sha256):
+        return os.path.join(self.cache_dir, 'partitions', f'{sha256}.parquet')
+
+    def lookup(self, file_path):
+        """
+        Liefert den gültigen Manifesteintrag einer Datei oder None, wenn sie neu ist oder sich geändert hat.
+        Bei gleicher Größe, aber neuer Änderungszeit entscheidet der Inhalts-Hash.
+        """
+        key = os.path.abspath(file_path)
+        entry = self.entries.get(key)
+        stat = os.stat(file_path)
+        if entry is None or entry['size'] != stat.st_size or not os.path.exists(self.partition_path(entry['sha256'])):
+            return None
+        if entry['mtime_ns'] != stat.st_mtime_ns:
+            if file_sha256(file_path) != entry['sha256']:
+                return None
+            entry['mtime_ns'] = stat.st_mtime_ns
+        return entry
+
+    def update(self, file_path, sha256, columns):
+        stat = os.stat(file_path)
+        self.entries[os.path.abspath(file_path)] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': sha256,
+            'columns': columns,
+        }
+
+    def save(self):
+        temp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.entries, file, ensure_ascii=False, indent=1)
+        os.replace(temp_path, self.path)
+
+
+# Funktion zum Parsen einer Datei und Speichern als Parquet-Partition in einem Worker-Prozess
+def parse_to_partition(file_path, encoding, sep, columns, engine, partition_path):
+    # Alle Spalten werden als Text gespeichert, damit die zusammengeführte CSV den Quelldateien entspricht
+    df = read_csv_file(file_path, encoding, sep, engine, columns=columns)
+    if df is None:
+        return False
+    temp_path = f'{partition_path}.{os.getpid()}.tmp'
+    df.to_parquet(temp_path, index=False)
+    os.replace(temp_path, partition_path)
+    return True
+
+
+def load_csv_files_incremental(folder_path, pattern='*.csv', cache_dir=CACHE_DIR, max_workers=None, engine=None,
+                               source_column=None):
+    """
+    Lädt alle CSV-Dateien eines Verzeichnisses und parst dabei nur neue oder geänderte Dateien.
+
+    Jede geparste Datei wird als Parquet-Partition zwischengespeichert. Unveränderte Dateien
+    (gleiche Größe und Änderungszeit bzw. gleicher Inhalts-Hash) werden direkt aus ihrer
+    Partition gelesen.
+
+    Args:
+        folder_path (str): Pfad zum Verzeichnis, das die CSV-Dateien enthält.
+        pattern (str): Glob-Muster der einzulesenden Dateien.
+        cache_dir (str): Verzeichnis für Manifest und Partitionen.
+        max_workers (int, optional): Anzahl der Prozesse für neue Dateien.
+        engine (str, optional): 'pyarrow' oder 'c'; standardmäßig pyarrow, falls installiert.
+        source_column (str, optional): Name einer zusätzlichen Spalte mit dem Dateinamen
+            (ohne Endung) der Quelldatei jeder Zeile.
+
+    Returns:
+        pd.DataFrame: Zusammengeführter DataFrame, der alle CSV-Daten als Text enthält.
+    """
+    start = time.perf_counter()
+    engine = engine or ('pyarrow' if pa_csv is not None else 'c')
+    manifest = MergeManifest(cache_dir)
+    csv_files = sorted(glob.glob(os.path.join(folder_path, pattern)))
+
+    # Unveränderte Dateien aus dem Manifest übernehmen, alle anderen zum Parsen vormerken
+    columns_by_file = {}
+    partitions = {}
+    changed = []
+    for file_path in csv_files:
+        entry = manifest.lookup(file_path)
+        if entry is not None:
+            columns_by_file[file_path] = entry['columns']
+            partitions[file_path] = manifest.partition_path(entry['sha256'])
+            continue
+        file_format = sniff_csv_format(file_path)
+        if file_format is None:
+            print(f"Skipping empty file {os.path.basename(file_path)}")
+            continue
+        encoding, sep, columns = file_format
+        columns_by_file[file_path] = columns
+        changed.append((file_path, encoding, sep, columns, file_sha256(file_path)))
+
+    reference = check_schema(columns_by_file)
+    if reference is None:
+        print("No valid CSV files found.")
+        return pd.DataFrame()
+
+    # Neue oder geänderte Dateien parallel parsen; gleicher Inhalt wird nur einmal geparst
+    tasks = {}
+    for file_path, encoding, sep, columns, sha256 in changed:
+        if columns != reference:
+            continue
+        partition_path = manifest.partition_path(sha256)
+        if not os.path.exists(partition_path):
+            tasks.setdefault(sha256, (file_path, encoding, sep, columns, engine, partition_path))
+        partitions[file_path] = partition_path
+    if tasks:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = dict(zip(tasks, executor.map(parse_to_partition, *zip(*tasks.values()))))
+    else:
+        results = {}
+
+    for file_path, encoding, sep, columns, sha256 in changed:
+        if file_path not in partitions:
+            continue
+        if results.get(sha256, True):
+            manifest.update(file_path, sha256, columns)
+        else:
+            del partitions[file_path]
+    manifest.save()
+
+    selected = [file_path for file_path in csv_files
+                if file_path in partitions and columns_by_file[file_path] == reference]
+
+    # Als wiederverwendet zählen Dateien, deren Partition schon vor diesem Lauf existierte
+    created = {task[5] for sha256, task in tasks.items() if results.get(sha256)}
+    reused = sum(partitions[file_path] not in created for file_path in selected)
+    parsed_bytes = sum(os.path.getsize(task[0]) for sha256, task in tasks.items() if results.get(sha256))
+    print(f"{reused} cached partitions reused, {len(tasks)} files parsed.")
+    report_throughput(len(tasks), parsed_bytes, time.perf_counter() - start, engine)
+
+    frames = [pd.read_parquet(partitions[file_path]) for file_path in selected]
+    if source_column:
+        frames = [frame.assign(**{source_column: os.path.splitext(os.path.basename(file_path))[0]})
+                  for frame, file_path in zip(frames, selected)]
+        reference = reference + [source_column]
+    if frames:
+        return pd.concat(frames, ignore_index=True)[reference]
+    print("No valid CSV files found.")
+    return pd.DataFrame()
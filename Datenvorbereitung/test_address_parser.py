@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from address_parser import parse_addresses
+
+
+@pytest.mark.parametrize('address, street, district', [
+    ('Hauptstraße 5, 10115 Berlin', 'Hauptstraße 5', None),
+    ('Mahlsdorf, 12623 Berlin', None, 'Mahlsdorf'),
+    ('Hauptstraße 5, Mahlsdorf, 12623 Berlin', 'Hauptstraße 5', 'Mahlsdorf'),
+    # Verborgene Hausnummern und Straßen ohne Nummer sind kein Ortsteil
+    ('Hauptstraße XXX, 12623 Berlin', 'Hauptstraße XXX', None),
+    ('Querweg xx, 12623 Berlin', 'Querweg xx', None),
+    ('Am Dornbusch X, 12623 Berlin', 'Am Dornbusch X', None),
+    ('Spießgasse -, 12623 Berlin', 'Spießgasse -', None),
+    ('Kirchstr. xx, 12623 Berlin', 'Kirchstr. xx', None),
+    ('Dieselstraße, 12623 Berlin', 'Dieselstraße', None),
+    ('Am Ring, 12623 Berlin', 'Am Ring', None),
+    # Straßennamen innerhalb eines Ortsteilnamens zählen nicht
+    ('Gebiet Talstraße/Trillerberg, 98527 Suhl', None, 'Gebiet Talstraße/Trillerberg'),
+])
+def test_parse_addresses_street_or_district(address, street, district):
+    parsed = parse_addresses(pd.Series([address])).iloc[0]
+    assert (None if pd.isna(parsed['street']) else parsed['street']) == street
+    assert (None if pd.isna(parsed['district']) else parsed['district']) == district
+    assert parsed['plz'] == address.split(', ')[-1][:5]
+
+
+def test_parse_addresses_hidden_address_note():
+    address = pd.Series(['Hauptstraße XXX, 12623 Berlin, Marzahn-Hellersdorf\n'
+                         'Die vollständige Adresse der Immobilie erhalten Sie vom Anbieter.'])
+    parsed = parse_addresses(address).iloc[0]
+    assert parsed['street'] == 'Hauptstraße XXX'
+    assert parsed['municipality'] == 'Berlin'
+    assert parsed['county'] == 'Marzahn-Hellersdorf'
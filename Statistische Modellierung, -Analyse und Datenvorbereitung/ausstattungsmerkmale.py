@@ -0,0 +1,76 @@
+"""
+Ausstattungsmerkmale aus der Spalte criteriagroup_boolean_listing.
+
+Die Spalte enthält je Inserat die Textform eines Python-Dicts, z.B.
+"{'is24qa-keller-label': '', 'is24qa-gaeste-wc-label': ''}". Statt jede Zeile mit
+ast.literal_eval auszuwerten, wird die Spalte faktorisiert; nur die wenigen verschiedenen
+Merkmalskombinationen werden per regulärem Ausdruck zerlegt und anschließend über die Codes
+auf alle Inserate übertragen. Das Ergebnis ist eine bitgepackte Matrix (ein Bit je Merkmal).
+"""
+
+import numpy as np
+import pandas as pd
+
+# Schlüssel der Ausstattungsmerkmale, z.B. 'is24qa-gaeste-wc-label' -> gaeste-wc
+LABEL_PATTERN = r"'is24qa-(?P<label>[^']+?)-label'\s*:"
+
+# Präfix der Merkmalsspalten
+FEATURE_PREFIX = 'ausstattung_'
+
+
+def parse_amenities(values, vocabulary=None):
+    """
+    Wandelt die Spalte in eine bitgepackte Merkmalsmatrix um.
+
+    Args:
+        values (pd.Series): Spalte criteriagroup_boolean_listing.
+        vocabulary (list, optional): Feste Merkmalsliste (z.B. aus den Trainingsdaten);
+            standardmäßig alle gefundenen Merkmale in alphabetischer Reihenfolge.
+
+    Returns:
+        tuple: (np.ndarray uint8 der Form (Inserate, ceil(Merkmale / 8)), Liste der Merkmale)
+    """
+    # Fehlende Werte erhalten den Code -1 und damit die leere Zeile am Ende von combinations
+    codes, uniques = pd.factorize(values)
+    labels = pd.Series(uniques, dtype=object).str.extractall(LABEL_PATTERN)['label']
+    if vocabulary is None:
+        vocabulary = sorted(labels.unique())
+    label_codes = pd.Categorical(labels, categories=vocabulary).codes
+    rows = labels.index.get_level_values(0).to_numpy()
+
+    # Unbekannte Merkmale (Code -1) werden bei fester Merkmalsliste ignoriert
+    known = label_codes >= 0
+    combinations = np.zeros((len(uniques) + 1, len(vocabulary)), dtype=bool)
+    combinations[rows[known], label_codes[known]] = True
+    return np.packbits(combinations, axis=1)[codes], list(vocabulary)
+
+
+def amenity_frame(packed, vocabulary, index=None):
+    """
+    Entpackt die Matrix in einen DataFrame mit einer uint8-Spalte (0/1) je Merkmal.
+
+    Returns:
+        pd.DataFrame: Spalten ausstattung_<Merkmal>, z.B. ausstattung_gaeste_wc.
+    """
+    matrix = np.unpackbits(packed, axis=1, count=len(vocabulary))
+    columns = [FEATURE_PREFIX + label.replace('-', '_') for label in vocabulary]
+    return pd.DataFrame(matrix, index=index, columns=columns)
+
+
+def add_amenity_features(data, column='criteriagroup_boolean_listing', min_count=1, vocabulary=None):
+    """
+    Ergänzt die Inserate um je eine 0/1-Spalte pro Ausstattungsmerkmal.
+
+    Args:
+        data (pd.DataFrame): Inserate.
+        column (str): Spalte mit den Merkmalen.
+        min_count (int): Merkmale, die seltener vorkommen, werden weggelassen.
+        vocabulary (list, optional): Feste Merkmalsliste, siehe parse_amenities.
+
+    Returns:
+        tuple: (DataFrame mit den Merkmalsspalten, Liste der neuen Spaltennamen)
+    """
+    packed, vocabulary = parse_amenities(data[column], vocabulary)
+    features = amenity_frame(packed, vocabulary, index=data.index)
+    features = features.loc[:, features.sum() >= min_count]
+    return data.join(features), features.columns.tolist()
@@ -0,0 +1,31 @@
+import time
+
+import pandas as pd
+
+from bereinigung import clean_columns
+
+# Gesamtdatei der Häuser (wie in datenbereinigung.py); der Abgleich mit den Funktionen je Zelle
+# steht in test_bereinigung.py
+NATIONAL_FILE = './BundesLänder_HAUS_CSV/ALL_HAUs.csv'
+
+
+# Funktion zur Messung der Bereinigung in Zeilen pro Sekunde
+def time_cleaning(data, vectorized):
+    start = time.perf_counter()
+    clean_columns(data.copy(), vectorized=vectorized)
+    seconds = time.perf_counter() - start
+    return len(data) / seconds, seconds
+
+
+# Hauptprogramm
+def main(national_file=NATIONAL_FILE):
+    data = pd.read_csv(national_file)
+    apply_rate, apply_seconds = time_cleaning(data, vectorized=False)
+    vector_rate, vector_seconds = time_cleaning(data, vectorized=True)
+    print(f"apply:       {apply_rate:,.0f} Zeilen/s ({apply_seconds:.2f} s für {len(data)} Zeilen)")
+    print(f"vektorisiert: {vector_rate:,.0f} Zeilen/s ({vector_seconds:.2f} s)")
+    print(f"Beschleunigung: {vector_rate / apply_rate:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+r"""
+Bereinigung der Rohspalten aus dem Web Scraping.
+
+Die ursprünglichen Funktionen je Zelle (clean_price, clean_area, ...) bleiben als Referenz
+erhalten. Die *_column-Varianten liefern dieselben Werte, arbeiten aber mit vektorisierten
+String- und Regex-Operationen auf der ganzen Spalte; nur Zellen, die nicht dem einfachen
+Zahlenformat entsprechen, werden einzeln mit float() umgewandelt.
+
+Ist pyarrow installiert, laufen die String-Operationen in den Arrow-Kernels (RE2). Die
+Muster sind dafür so formuliert, dass sie dieselben Zeichen treffen wie \d und \s in re.
+Suchen laufen über contains_pattern, da Series.str.contains das Muster in pandas 2.x
+zusätzlich mit re kompiliert und dort \p{...} nicht kennt.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.compute
+except ImportError:
+    pyarrow = None
+
+if pyarrow is not None:
+    STRING_DTYPE = pd.StringDtype('pyarrow')
+    # RE2 kennt \d und \s nur für ASCII; re verwendet alle Unicode-Ziffern bzw. str.isspace()
+    DIGIT = r'\p{Nd}'
+    SPACE = r'[\t\n\x0b\f\r\x1c-\x1f\x85\p{Z}]'
+else:
+    STRING_DTYPE = object
+    DIGIT = r'\d'
+    SPACE = r'\s'
+
+# Einfaches Zahlenformat, das ohne Sonderfälle von float() akzeptiert wird
+SIMPLE_FLOAT = r'[0-9]+(?:\.[0-9]*)?'
+
+
+# Funktionen zur Datenbereinigung und -transformation (je Zelle)
+def clean_garage_parking(value):
+    """
+    Bereinigt die Werte in der Spalte 'garage_parking', indem alle nicht-numerischen Zeichen entfernt werden.
+    Konvertiert den bereinigten Wert in einen float.
+    """
+    if isinstance(value, str):
+        value = re.sub(r'[^\d]', '', value)
+        return float(value) if value else np.nan
+    return np.nan
+
+def clean_buyer_commission(value):
+    """
+    Extrahiert den prozentualen Anteil der Käuferprovision aus dem String.
+    """
+    if isinstance(value, str):
+        match = re.search(r'(\d+,\d+)\s*%', value)
+        if match:
+            return float(match.group(1).replace(',', '.'))
+    return np.nan
+
+def clean_price(value):
+    """
+    Bereinigt den Preiswert, indem Währungszeichen und andere unerwünschte Zeichen entfernt werden.
+    Konvertiert den Wert in einen float.
+    """
+    if isinstance(value, str):
+        value = value.replace('€', '').replace('.', '').replace(',', '.').strip()
+        if 'Auf Anfrage' in value or value == '':
+            return np.nan
+        try:
+            return float(value)
+        except ValueError:
+            return np.nan
+    return value if pd.notna(value) else np.nan
+
+def clean_area(value):
+    """
+    Bereinigt Werte in Flächenangaben, indem alle nicht-numerischen Zeichen entfernt werden.
+    Konvertiert den Wert in einen float.
+    """
+    if isinstance(value, str):
+        value = re.sub(r'[^\d,]', '', value).replace(',', '.')
+        return float(value) if value else np.nan
+    return value
+
+def clean_generic_numeric(value):
+    """
+    Generische Bereinigungsfunktion für numerische Spalten.
+    Entfernt nicht-numerische Zeichen und konvertiert in float.
+    """
+    if isinstance(value, str):
+        value = re.sub(r'[^\d,]', '', value).replace(',', '.')
+        return float(value) if value else np.nan
+    return value
+
+
+# Funktion zur Auswahl der Zellen, die Strings enthalten (nur diese werden von den Funktionen oben umgewandelt)
+def string_cells(values):
+    inferred = pd.api.types.infer_dtype(values, skipna=True)
+    if inferred == 'string':
+        return values[values.notna()].astype(STRING_DTYPE)
+    if inferred in ('mixed', 'mixed-integer'):
+        return values[values.map(type) == str].astype(STRING_DTYPE)
+    return values.iloc[:0].astype(STRING_DTYPE)
+
+
+# Funktion zur Suche eines Musters in jeder Zelle; mit pyarrow direkt im RE2-Kernel
+def contains_pattern(text, pattern):
+    if pyarrow is None:
+        return text.str.contains(pattern, regex=True)
+    found = pyarrow.compute.match_substring_regex(pyarrow.array(text, type=pyarrow.string()), pattern)
+    return pd.Series(found.to_numpy(zero_copy_only=False), index=text.index, dtype=bool)
+
+
+def parse_floats(text, errors='raise'):
+    """
+    Wandelt bereinigte Strings wie float() in Zahlen um; NaN bleibt NaN.
+
+    Args:
+        text (pd.Series): Bereinigte Strings oder NaN.
+        errors (str): 'raise' löst wie float() einen ValueError aus, 'coerce' liefert NaN.
+
+    Returns:
+        pd.Series: float64-Werte mit dem Index von text.
+    """
+    result = pd.Series(np.nan, index=text.index)
+    present = text.notna()
+    simple = present & text.str.fullmatch(SIMPLE_FLOAT, na=False).astype(bool)
+    result[simple] = text[simple].astype(float)
+
+    # Sonderfälle (Vorzeichen, Exponenten, Unterstriche, ungültige Werte) einzeln wie bisher
+    def parse(value):
+        try:
+            return float(value)
+        except ValueError:
+            if errors == 'raise':
+                raise
+            return np.nan
+
+    special = present & ~simple
+    if special.any():
+        result[special] = text[special].map(parse).astype(float)
+    return result
+
+
+# Funktion zur Zusammenführung: umgewandelte Strings und übrige Zellen unverändert (NaN bleibt NaN)
+def combine(values, parsed, keep_other=True):
+    result = pd.Series(np.nan, index=values.index, name=values.name)
+    if keep_other:
+        other = values.notna()
+        other.loc[parsed.index] = False
+        result[other] = values[other].astype(float)
+    result.loc[parsed.index] = parsed
+    return result
+
+
+def clean_garage_parking_column(values):
+    text = string_cells(values).str.replace(f'[^{DIGIT}]+', '', regex=True)
+    return combine(values, parse_floats(text.where(text != '')), keep_other=False)
+
+
+def clean_buyer_commission_column(values):
+    # Wie re.search: der kürzeste Präfix liefert den ersten Treffer (str.extract kennt nur die Syntax von re)
+    text = string_cells(values)
+    found = contains_pattern(text, f'{DIGIT}+,{DIGIT}+{SPACE}*%')
+    text = text[found].str.replace(f'(?s)^.*?({DIGIT}+,{DIGIT}+){SPACE}*%.*$', r'\1', regex=True)
+    return combine(values, parse_floats(text.str.replace(',', '.', regex=False)), keep_other=False)
+
+
+def clean_price_column(values):
+    text = (string_cells(values)
+            .str.replace('€', '', regex=False)
+            .str.replace('.', '', regex=False)
+            .str.replace(',', '.', regex=False)
+            .str.strip())
+    valid = (text != '') & ~text.str.contains('Auf Anfrage', regex=False)
+    return combine(values, parse_floats(text.where(valid), errors='coerce'))
+
+
+def clean_area_column(values):
+    text = string_cells(values).str.replace(f'[^{DIGIT},]+', '', regex=True).str.replace(',', '.', regex=False)
+    return combine(values, parse_floats(text.where(text != '')))
+
+
+# clean_generic_numeric entspricht clean_area
+clean_generic_numeric_column = clean_area_column
+
+# Bereinigung je Spalte: (Funktion je Zelle, vektorisierte Funktion)
+COLUMN_CLEANERS = {
+    'garage_parking': (clean_garage_parking, clean_garage_parking_column),
+    'buyer_commission': (clean_buyer_commission, clean_buyer_commission_column),
+    'price': (clean_price, clean_price_column),
+    'living_space': (clean_area, clean_area_column),
+    'property_area': (clean_area, clean_area_column),
+    'price_per_m2': (clean_generic_numeric, clean_generic_numeric_column),
+    'usable_area': (clean_generic_numeric, clean_generic_numeric_column),
+}
+
+
+def clean_columns(data, vectorized=True):
+    """
+    Bereinigt alle Spalten aus COLUMN_CLEANERS, die in den Daten vorhanden sind.
+
+    Args:
+        data (pd.DataFrame): Rohdaten.
+        vectorized (bool): False verwendet die bisherigen Funktionen je Zelle (Series.apply).
+
+    Returns:
+        pd.DataFrame: Daten mit bereinigten Spalten.
+    """
+    for column, (cell_cleaner, column_cleaner) in COLUMN_CLEANERS.items():
+        if column in data.columns:
+            data[column] = column_cleaner(data[column]) if vectorized else data[column].apply(cell_cleaner)
+    return data
@@ -1,7 +1,12 @@
+import os
+
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from near_duplicates import drop_near_duplicates
+from plot_executor import FIGURE_DIR, PlotExecutor
+
 # Dateipfade
 file_paths = {
     'Baden-Württemberg': './Cleaned_Bundesland_HAUS/properties_baden-wuerttemberg.csv',
@@ -22,8 +27,8 @@ file_paths = {
     'Schleswig-Holstein': './Cleaned_Bundesland_HAUS/properties_schleswig-holstein.csv'
 }
 
-# Laden der Daten und Berechnung der durchschnittlichen Preise
-average_prices = {}
+# Laden der Daten aller Bundesländer
+all_data = []
 
 for state, path in file_paths.items():
     # Lese die CSV-Datei für den aktuellen Bundesstaat ein
@@ -31,7 +36,15 @@ for state, path in file_paths.items():
 
     # Zeige die ersten fünf Zeilen der Daten für den aktuellen Bundesstaat an
     print(f'Daten für {state} geladen:\n', data.head(), '\n')
+    all_data.append(data.assign(state=state))
+
+# Mehrfach inserierte Objekte (auch bundeslandübergreifend) nur einmal berücksichtigen
+all_data = drop_near_duplicates(pd.concat(all_data, ignore_index=True))
+
+# Berechnung der durchschnittlichen Preise
+average_prices = {}
 
+for state, data in all_data.groupby('state', sort=False):
     # Überprüfe, ob die Spalte 'price' in den Daten vorhanden ist
     if 'price' in data.columns:
         # Berechne den Durchschnittspreis und konvertiere ihn in Tausend Euro
@@ -51,31 +64,36 @@ print('Sortierte durchschnittliche Preise:\n')
 for state, price in sorted_average_prices.items():
     print(f'{state}: {price:.2f} Tausend Euro')
 
-# Einstellen des Stils
-sns.set(style="whitegrid")
-plt.figure(figsize=(14, 10))
-
-# Erstellen des Balkendiagramms
-bars = plt.bar(sorted_average_prices.keys(), sorted_average_prices.values(), color=sns.color_palette("viridis", len(sorted_average_prices)))
-
-# Farbverlauf für die Balken
-for bar in bars:
-    bar.set_color(plt.cm.viridis(bar.get_height() / max(sorted_average_prices.values())))
-
-plt.xlabel('Bundesland', fontsize=14, labelpad=10)
-plt.ylabel('Durchschnittspreis in Tausend Euro', fontsize=14, labelpad=10)
-plt.title('Durchschnittliche Immobilienpreise für Häuser pro Bundesland', fontsize=16, pad=20)
-plt.xticks(rotation=45, ha='right', fontsize=12)
-plt.yticks(fontsize=12)
-
-# Erstellen einer Colorbar
-ax = plt.gca()
-sm = plt.cm.ScalarMappable(cmap=plt.cm.viridis, norm=plt.Normalize(vmin=min(sorted_average_prices.values()), vmax=max(sorted_average_prices.values())))
-sm.set_array([])
-cbar = plt.colorbar(sm, ax=ax)
-cbar.set_label('Preisniveau in T€', rotation=270, labelpad=20, fontsize=12)
-
-plt.tight_layout()
-
-# Diagramm anzeigen
-plt.show()
+# Funktion zum Erstellen des Balkendiagramms der Durchschnittspreise
+def plot_average_prices(data):
+    # Einstellen des Stils
+    sns.set(style="whitegrid")
+    plt.figure(figsize=(14, 10))
+
+    # Erstellen des Balkendiagramms
+    bars = plt.bar(data['state'], data['average_price'], color=sns.color_palette("viridis", len(data)))
+
+    # Farbverlauf für die Balken
+    for bar in bars:
+        bar.set_color(plt.cm.viridis(bar.get_height() / data['average_price'].max()))
+
+    plt.xlabel('Bundesland', fontsize=14, labelpad=10)
+    plt.ylabel('Durchschnittspreis in Tausend Euro', fontsize=14, labelpad=10)
+    plt.title('Durchschnittliche Immobilienpreise für Häuser pro Bundesland', fontsize=16, pad=20)
+    plt.xticks(rotation=45, ha='right', fontsize=12)
+    plt.yticks(fontsize=12)
+
+    # Erstellen einer Colorbar
+    ax = plt.gca()
+    sm = plt.cm.ScalarMappable(cmap=plt.cm.viridis, norm=plt.Normalize(vmin=data['average_price'].min(), vmax=data['average_price'].max()))
+    sm.set_array([])
+    cbar = plt.colorbar(sm, ax=ax)
+    cbar.set_label('Preisniveau in T€', rotation=270, labelpad=20, fontsize=12)
+
+    plt.tight_layout()
+
+# Diagramm anzeigen; mit PLOTS_HEADLESS=1 wird es nach figures/bundeslaender_preisverteilung gespeichert
+plots = PlotExecutor(os.path.join(FIGURE_DIR, 'bundeslaender_preisverteilung'))
+plots.submit('durchschnittspreise', plot_average_prices,
+             pd.DataFrame(list(sorted_average_prices.items()), columns=['state', 'average_price']))
+plots.run()
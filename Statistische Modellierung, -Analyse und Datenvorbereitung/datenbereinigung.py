@@ -1,79 +1,22 @@
+import os
+
 import pandas as pd
 import numpy as np
-import re
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+from bereinigung import clean_columns
+from plot_executor import FIGURE_DIR, PlotExecutor
+
 # Pfad zur CSV-Datei
 file_path = './BundesLänder_HAUS_CSV/ALL_HAUs.csv'
 
 # Daten laden
 data = pd.read_csv(file_path)
 
-# Funktionen zur Datenbereinigung und -transformation
-def clean_garage_parking(value):
-    """
-    Bereinigt die Werte in der Spalte 'garage_parking', indem alle nicht-numerischen Zeichen entfernt werden.
-    Konvertiert den bereinigten Wert in einen float.
-    """
-    if isinstance(value, str):
-        value = re.sub(r'[^\d]', '', value)
-        return float(value) if value else np.nan
-    return np.nan
-
-def clean_buyer_commission(value):
-    """
-    Extrahiert den prozentualen Anteil der Käuferprovision aus dem String.
-    """
-    if isinstance(value, str):
-        match = re.search(r'(\d+,\d+)\s*%', value)
-        if match:
-            return float(match.group(1).replace(',', '.'))
-    return np.nan
-
-def clean_price(value):
-    """
-    Bereinigt den Preiswert, indem Währungszeichen und andere unerwünschte Zeichen entfernt werden.
-    Konvertiert den Wert in einen float.
-    """
-    if isinstance(value, str):
-        value = value.replace('€', '').replace('.', '').replace(',', '.').strip()
-        if 'Auf Anfrage' in value or value == '':
-            return np.nan
-        try:
-            return float(value)
-        except ValueError:
-            return np.nan
-    return value if pd.notna(value) else np.nan
-
-def clean_area(value):
-    """
-    Bereinigt Werte in Flächenangaben, indem alle nicht-numerischen Zeichen entfernt werden.
-    Konvertiert den Wert in einen float.
-    """
-    if isinstance(value, str):
-        value = re.sub(r'[^\d,]', '', value).replace(',', '.')
-        return float(value) if value else np.nan
-    return value
-
-def clean_generic_numeric(value):
-    """
-    Generische Bereinigungsfunktion für numerische Spalten.
-    Entfernt nicht-numerische Zeichen und konvertiert in float.
-    """
-    if isinstance(value, str):
-        value = re.sub(r'[^\d,]', '', value).replace(',', '.')
-        return float(value) if value else np.nan
-    return value
-
-# Anwendung der Bereinigungsfunktionen auf die relevanten Spalten
-data['garage_parking'] = data['garage_parking'].apply(clean_garage_parking)
-data['buyer_commission'] = data['buyer_commission'].apply(clean_buyer_commission)
-data['price'] = data['price'].apply(clean_price)
-data['living_space'] = data['living_space'].apply(clean_area)
-data['property_area'] = data['property_area'].apply(clean_area)
-data['price_per_m2'] = data['price_per_m2'].apply(clean_generic_numeric)
-data['usable_area'] = data['usable_area'].apply(clean_generic_numeric)
+# Bereinigung und Umwandlung der Spalten garage_parking, buyer_commission, price, living_space,
+# property_area, price_per_m2 und usable_area (vektorisiert, siehe bereinigung.py)
+data = clean_columns(data)
 
 # Funktion zur Identifikation und Behandlung von Ausreißern
 def remove_outliers_and_print(data, column):
@@ -111,12 +54,35 @@ def remove_outliers_and_print(data, column):
 #    if col != 'price':  # 'price' wurde bereits behandelt
 #        remove_outliers_and_print(data, col)
 
+# Funktion für den Boxplot zur Überprüfung auf extrem hohe oder niedrige Preise
+def plot_price_boxplot(data):
+    plt.figure(figsize=(10, 6))
+    sns.boxplot(x=data['price'])
+    plt.title('Boxplot von Preis')
+    plt.xlabel('Preis')
+
+# Funktion für das Histogramm der Log-Preise
+def plot_log_price_histogram(data):
+    sns.set(style="whitegrid")
+    plt.figure(figsize=(10, 6))
+    sns.histplot(data['log_price'], kde=True)
+    plt.title('Log-Preis Verteilung')
+    plt.xlabel('Log-Preis')
+    plt.ylabel('Häufigkeit')
+
+# Funktion für den Boxplot der Log-Preise
+def plot_log_price_boxplot(data):
+    sns.set(style="whitegrid")
+    plt.figure(figsize=(10, 6))
+    sns.boxplot(x=data['log_price'])
+    plt.title('Boxplot von Log-Preis')
+    plt.xlabel('Log-Preis')
+
+# Mit PLOTS_HEADLESS=1 werden die Diagramme nach figures/datenbereinigung gespeichert
+plots = PlotExecutor(os.path.join(FIGURE_DIR, 'datenbereinigung'))
+
 # Zusätzliche Überprüfung auf extrem hohe oder niedrige Preise
-plt.figure(figsize=(10, 6))
-sns.boxplot(x=data['price'])
-plt.title('Boxplot von Preis')
-plt.xlabel('Preis')
-plt.show()
+plots.submit('boxplot_price', plot_price_boxplot, data[['price']])
 
 # Log-Transformation der bereinigten 'price' Spalte
 data['log_price'] = np.log1p(data['price'])
@@ -126,19 +92,9 @@ log_price_skewness = data['log_price'].skew()
 log_price_kurtosis = data['log_price'].kurt()
 
 # Visualisierungen für numerische Daten
-sns.set(style="whitegrid")
-plt.figure(figsize=(10, 6))
-sns.histplot(data['log_price'], kde=True)
-plt.title('Log-Preis Verteilung')
-plt.xlabel('Log-Preis')
-plt.ylabel('Häufigkeit')
-plt.show()
-
-plt.figure(figsize=(10, 6))
-sns.boxplot(x=data['log_price'])
-plt.title('Boxplot von Log-Preis')
-plt.xlabel('Log-Preis')
-plt.show()
+plots.submit('histogramm_log_price', plot_log_price_histogram, data[['log_price']])
+plots.submit('boxplot_log_price', plot_log_price_boxplot, data[['log_price']])
+plots.run()
 
 # Ausgabe der berechneten Schiefe und Kurtosis
 print("Log-Preis Schiefe:", log_price_skewness)
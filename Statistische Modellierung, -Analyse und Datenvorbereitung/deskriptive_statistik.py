@@ -1,32 +1,45 @@
+import os
+
 import pandas as pd
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+from listing_schema import read_listings
+from plot_executor import FIGURE_DIR, PlotExecutor
+from stage_cache import StageCache
+
+
+# Spalten, deren Häufigkeiten nach der Bereinigung ausgegeben werden
+COUNT_COLUMNS = ['rooms', 'bedrooms', 'bathrooms', 'garage_parking']
+
 
 # Daten laden
 def load_data(filepath):
-    return pd.read_csv(filepath)
+    return read_listings(filepath)
 
 
 # Datenbereinigung und -vorbereitung
 def clean_data(data):
-    columns_of_interest = ['rooms', 'bedrooms', 'bathrooms', 'garage_parking']
-
-    for col in columns_of_interest:
+    for col in COUNT_COLUMNS:
         data[col] = pd.to_numeric(data[col], errors='coerce')
-        value_counts = data[col].value_counts().sort_index()
-        filtered_value_counts = value_counts[value_counts.index <= 5]
-        print(f"\nAnzahl der Häuser nach {col} (bis zu 5):")
-        print(filtered_value_counts)
 
     data['price'] = pd.to_numeric(data['price'], errors='coerce').fillna(data['price'].median())
-    non_numeric_columns = data.select_dtypes(exclude=[np.number]).columns
+    non_numeric_columns = data.select_dtypes(exclude=[np.number, 'category']).columns
     data[non_numeric_columns] = data[non_numeric_columns].fillna("nil")
 
     return data
 
 
+# Ausgabe der Anzahl der Häuser nach Zimmern, Schlafzimmern, Badezimmern und Stellplätzen
+def print_value_counts(data, columns):
+    for col in columns:
+        value_counts = data[col].value_counts().sort_index()
+        filtered_value_counts = value_counts[value_counts.index <= 5]
+        print(f"\nAnzahl der Häuser nach {col} (bis zu 5):")
+        print(filtered_value_counts)
+
+
 # Ausreißerbehandlung
 def remove_outliers(data, column):
     Q1 = data[column].quantile(0.25)
@@ -60,22 +73,34 @@ def calculate_statistics(data, columns):
         print("10. und 90. Perzentil:", data[col].quantile([0.1, 0.9]).to_list())
 
 
-# Visualisierungen erstellen
-def visualize_data(data, columns):
+# Histogramm einer Spalte
+def plot_histogram(data, col):
     sns.set(style="whitegrid")
-    for col in columns:
-        plt.figure(figsize=(10, 6))
-        sns.histplot(data[col], kde=True)
-        plt.title(f'Verteilung von {col}')
-        plt.xlabel(col)
-        plt.ylabel('Häufigkeit')
-        plt.show()
+    plt.figure(figsize=(10, 6))
+    sns.histplot(data[col], kde=True)
+    plt.title(f'Verteilung von {col}')
+    plt.xlabel(col)
+    plt.ylabel('Häufigkeit')
 
-        plt.figure(figsize=(10, 6))
-        sns.boxplot(x=data[col])
-        plt.title(f'Boxplot von {col}')
-        plt.xlabel(col)
-        plt.show()
+
+# Boxplot einer Spalte
+def plot_boxplot(data, col):
+    sns.set(style="whitegrid")
+    plt.figure(figsize=(10, 6))
+    sns.boxplot(x=data[col])
+    plt.title(f'Boxplot von {col}')
+    plt.xlabel(col)
+
+
+# Visualisierungen erstellen; ohne Executor werden die Diagramme über einen eigenen Executor sofort ausgegeben
+def visualize_data(data, columns, plots=None):
+    local_plots = plots is None
+    plots = plots or PlotExecutor()
+    for col in columns:
+        plots.submit(f'verteilung_{col}', plot_histogram, data[[col]], col=col)
+        plots.submit(f'boxplot_{col}', plot_boxplot, data[[col]], col=col)
+    if local_plots:
+        plots.run()
 
 
 # Korrelationsmatrix visualisieren
@@ -84,16 +109,19 @@ def plot_correlation_matrix(data):
     correlation = data.corr()
     sns.heatmap(correlation, annot=True, fmt=".2f", cmap='coolwarm')
     plt.title('Korrelationsmatrix')
-    plt.show()
 
 
 # Hauptprogramm
 def main():
     filepath = "../../../Desktop/Cleaned_HAUS_Properties.csv"
-    data = load_data(filepath)
-    data = clean_data(data)
-    data_cleaned = remove_outliers(data, 'price')
-    data_cleaned = log_transform(data_cleaned, 'price')
+    # Bereinigung, Ausreißerfilter und Log-Transformation werden zwischengespeichert und nur bei
+    # geänderter Eingabedatei oder geändertem Code neu berechnet
+    cleaned = StageCache().source(filepath, load_data).then('clean_data', clean_data)
+    # Die Ausgabe steht außerhalb der Stufe, damit sie auch bei einem Cache-Treffer erscheint
+    print_value_counts(cleaned.frame(), COUNT_COLUMNS)
+    data_cleaned = (cleaned.then('remove_outliers', remove_outliers, column='price')
+                    .then('log_transform', log_transform, column='price')
+                    .frame())
 
     print("Log-Preis Schiefe:", data_cleaned['log_price'].skew())
     print("Log-Preis Kurtosis:", data_cleaned['log_price'].kurt())
@@ -105,8 +133,11 @@ def main():
     print("\nKorrelation:\n", data_cleaned[numerical_cols].corr())
     print("\nKovarianz:\n", data_cleaned[numerical_cols].cov())
 
-    visualize_data(data_cleaned, numerical_cols)
-    plot_correlation_matrix(data_cleaned)
+    # Mit PLOTS_HEADLESS=1 werden die Diagramme parallel nach figures/deskriptive_statistik gespeichert
+    plots = PlotExecutor(os.path.join(FIGURE_DIR, 'deskriptive_statistik'))
+    visualize_data(data_cleaned, numerical_cols, plots)
+    plots.submit('korrelationsmatrix', plot_correlation_matrix, data_cleaned[numerical_cols])
+    plots.run()
 
 
 # Ausführung des Hauptprogramms
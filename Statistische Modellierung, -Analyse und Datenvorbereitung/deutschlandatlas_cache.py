@@ -0,0 +1,54 @@
+import hashlib
+import os
+
+import pandas as pd
+
+# Standardpfade der Arbeitsmappe und des Caches
+ATLAS_PATH = "Deutschlandatlas-Daten.xlsx"
+CACHE_DIR = ".deutschlandatlas_cache"
+
+
+# Funktion zur Berechnung des Inhalts-Hashes der Arbeitsmappe
+def workbook_sha256(workbook_path):
+    digest = hashlib.sha256()
+    with open(workbook_path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Funktion zur Umwandlung gemischter Textspalten, die Parquet nicht speichern kann
+def make_parquet_safe(data):
+    for column in data.columns:
+        if data[column].dtype == object and pd.api.types.infer_dtype(data[column], skipna=True) != 'string':
+            data[column] = data[column].map(lambda value: value if pd.isna(value) else str(value))
+    return data
+
+
+def load_atlas_sheet(sheet_name='Deutschlandatlas_GEM1221', columns=None, workbook_path=ATLAS_PATH,
+                     cache_dir=CACHE_DIR):
+    """
+    Lädt ein Tabellenblatt des Deutschlandatlas über einen Parquet-Cache.
+
+    Beim ersten Aufruf wird das gesamte Blatt einmal aus der Excel-Datei gelesen und unter
+    dem Hash der Arbeitsmappe zwischengespeichert. Spätere Aufrufe lesen nur die angeforderten
+    Spalten aus dem Cache; eine geänderte Arbeitsmappe erhält automatisch einen neuen Cache.
+
+    Args:
+        sheet_name (str): Name des Tabellenblatts, z.B. 'Deutschlandatlas_GEM1221'.
+        columns (list, optional): Zu lesende Spalten; None liest alle Spalten.
+        workbook_path (str): Pfad zur Excel-Datei.
+        cache_dir (str): Verzeichnis des Caches.
+
+    Returns:
+        pd.DataFrame: Die angeforderten Spalten des Tabellenblatts.
+    """
+    cache_path = os.path.join(cache_dir, workbook_sha256(workbook_path)[:16], f"{sheet_name}.parquet")
+    if not os.path.exists(cache_path):
+        print(f"Parsing sheet {sheet_name} from {workbook_path} ...")
+        data = make_parquet_safe(pd.read_excel(workbook_path, sheet_name=sheet_name))
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        data.to_parquet(temp_path, index=False)
+        os.replace(temp_path, cache_path)
+    return pd.read_parquet(cache_path, columns=columns)
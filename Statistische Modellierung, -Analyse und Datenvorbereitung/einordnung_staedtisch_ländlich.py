@@ -1,7 +1,10 @@
 import pandas as pd
 
-# Daten laden
-data = pd.read_excel("Deutschlandatlas-Daten.xlsx", sheet_name='Deutschlandatlas_GEM1221', usecols=['GKZ1221', 'Gemeindename', 'bev_dicht'])
+from deutschlandatlas_cache import load_atlas_sheet
+
+# Daten laden (die Excel-Datei wird nur beim ersten Lauf geparst, danach aus dem Parquet-Cache gelesen)
+data = load_atlas_sheet('Deutschlandatlas_GEM1221', columns=['GKZ1221', 'Gemeindename', 'bev_dicht'],
+                        workbook_path="Deutschlandatlas-Daten.xlsx")
 
 # Quartilberechnung für die Bevölkerungsdichte
 data['Quartil'] = pd.qcut(data['bev_dicht'], 4, labels=['Q1', 'Q2', 'Q3', 'Q4'])
@@ -13,4 +16,5 @@ threshold = data['bev_dicht'].quantile(0.75)
 data['Kategorie'] = data['bev_dicht'].apply(lambda x: 'städtisch' if x > threshold else 'ländlich')
 
 # Auswahl der relevanten Spalten und Speichern in einer neuen CSV-Datei
-data[['Gemeindename', 'bev_dicht', 'Quartil', 'Kategorie']].to_csv('kategorisierte_gemeinden.csv', index=False)
+# (mit Gemeindeschlüssel für die Zuordnung der Inserate über die Postleitzahl)
+data[['GKZ1221', 'Gemeindename', 'bev_dicht', 'Quartil', 'Kategorie']].to_csv('kategorisierte_gemeinden.csv', index=False)
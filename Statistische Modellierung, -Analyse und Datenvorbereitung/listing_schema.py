@@ -0,0 +1,116 @@
+"""
+Gemeinsames Schema der bereinigten Inseratstabelle (Cleaned_HAUS_Properties.csv und die daraus
+abgeleiteten Dateien wie HAUS_Regionale_Einordnung.csv).
+
+Wiederholte Texte werden als Kategorien geladen, Flächen und Kennzahlen als float32 und
+Zählwerte als nullbare kleine Ganzzahlen. "nil" aus dem Web Scraping wird schon beim Einlesen
+zu einem fehlenden Wert, sodass spätere pd.to_numeric(..., errors='coerce')-Aufrufe entfallen.
+"""
+
+import pandas as pd
+
+# Platzhalter für fehlende Werte in den gescrapten Daten
+NA_VALUES = ['nil']
+
+# Datentyp je Spalte; nicht aufgeführte Spalten behalten den Standardtyp von read_csv
+SCHEMA = {
+    'title': 'string',
+    'price': 'float64',
+    'address': 'category',
+    'rooms': 'float32',
+    'living_space': 'float32',
+    'property_area': 'float32',
+    'price_per_m2': 'float32',
+    'type': 'category',
+    'usable_area': 'float32',
+    'available_from': 'category',
+    'bedrooms': 'Int16',
+    'bathrooms': 'Int16',
+    'garage_parking': 'Int16',
+    'buyer_commission': 'float32',
+    'criteriagroup_boolean_listing': 'category',
+    'log_price': 'float32',
+    'Gemeindename': 'category',
+    'Gemeindename_x': 'category',
+    'Gemeindename_y': 'category',
+    'clean_Gemeindename': 'category',
+    'GKZ1221': 'Int64',
+    'bev_dicht': 'float32',
+    'Quartil': 'category',
+    'Kategorie': 'category',
+}
+
+# Spalten, die read_csv direkt im Zieltyp einlesen kann
+TEXT_TYPES = ('category', 'string')
+
+
+def apply_schema(data, schema=SCHEMA):
+    """
+    Wandelt die Spalten eines bereits geladenen DataFrames in die Typen des Schemas um.
+
+    Zahlen werden mit errors='coerce' umgewandelt. Enthält eine Ganzzahlspalte Nachkommastellen,
+    wird sie stattdessen als float32 gespeichert, damit keine Werte verloren gehen.
+
+    Args:
+        data (pd.DataFrame): Inserate.
+        schema (dict): Datentyp je Spalte.
+
+    Returns:
+        pd.DataFrame: Inserate mit den Typen des Schemas.
+    """
+    for column, dtype in schema.items():
+        if column not in data.columns or data[column].dtype == dtype:
+            continue
+        if dtype in TEXT_TYPES:
+            data[column] = data[column].astype(dtype)
+            continue
+        values = pd.to_numeric(data[column], errors='coerce')
+        if dtype.startswith('Int') and not (values.dropna() % 1 == 0).all():
+            print(f"Spalte {column} enthält Nachkommastellen und wird als float32 geladen")
+            dtype = 'float32'
+        data[column] = values.astype(dtype)
+    return data
+
+
+def read_listings(filepath, schema=SCHEMA, **kwargs):
+    """
+    Lädt eine Inseratstabelle mit dem gemeinsamen Schema.
+
+    Args:
+        filepath (str): Pfad zur CSV-Datei.
+        schema (dict): Datentyp je Spalte.
+        **kwargs: Weitere Parameter für pd.read_csv, z.B. usecols.
+
+    Returns:
+        pd.DataFrame: Inserate mit Kategorien, float32- und Int16-Spalten.
+    """
+    text_columns = {column: dtype for column, dtype in schema.items() if dtype in TEXT_TYPES}
+    data = pd.read_csv(filepath, na_values=NA_VALUES, dtype=text_columns, **kwargs)
+    return apply_schema(data, schema)
+
+
+def memory_report(filepath, schema=SCHEMA):
+    """
+    Vergleicht den Speicherbedarf je Zeile mit Standardtypen und mit dem Schema.
+
+    Returns:
+        pd.DataFrame: Bytes je Zeile und Spalte vorher/nachher sowie die Typen.
+    """
+    default = pd.read_csv(filepath)
+    typed = read_listings(filepath, schema)
+    report = pd.DataFrame({
+        'dtype_vorher': default.dtypes.astype(str),
+        'bytes_je_zeile_vorher': default.memory_usage(deep=True, index=False) / len(default),
+        'dtype_nachher': typed.dtypes.astype(str),
+        'bytes_je_zeile_nachher': typed.memory_usage(deep=True, index=False) / len(typed),
+    })
+    report.loc['gesamt', ['bytes_je_zeile_vorher', 'bytes_je_zeile_nachher']] = (
+        report[['bytes_je_zeile_vorher', 'bytes_je_zeile_nachher']].sum())
+    print(report.round(1).to_string())
+    before, after = report.loc['gesamt', ['bytes_je_zeile_vorher', 'bytes_je_zeile_nachher']]
+    print(f"{before:.0f} -> {after:.0f} Bytes je Zeile ({1 - after / before:.0%} weniger)")
+    return report
+
+
+if __name__ == '__main__':
+    memory_report('../../../Desktop/Cleaned_HAUS_Properties.csv')
@@ -0,0 +1,232 @@
+"""
+Erkennung von Beinahe-Duplikaten: dasselbe Objekt, von mehreren Anbietern mit leicht
+abweichendem Titel inseriert (z.B. "Gepflegtes Einfamilienhaus mit 3 Zimmern" und
+"Einfamilienhaus, 3 Zi., gepflegt").
+
+Titel und Adresse werden in Shingles zerlegt und als MinHash-Signatur zusammengefasst.
+Über LSH-Banding landen ähnliche Signaturen im selben Bucket; nur innerhalb eines Buckets
+werden nach Preis benachbarte Inserate als Kandidaten verglichen. Kandidaten gelten als
+Duplikat, wenn die geschätzte Jaccard-Ähnlichkeit reicht und Wohnfläche, Grundstücksfläche
+und Preis innerhalb der Toleranz liegen und die Postleitzahl nicht widerspricht. Zusammenhängende Paare bilden einen Cluster.
+"""
+
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# Hinweistext bei verborgener Straße; entspricht address_parser.HIDDEN_ADDRESS_NOTE in Datenvorbereitung,
+# das aus diesem Skriptverzeichnis nicht importiert werden kann
+HIDDEN_ADDRESS_NOTE = r'(?s)\s*Die vollständige Adresse.*$'
+
+# Relative Toleranz je numerischer Spalte; fehlende Werte gelten nicht als Widerspruch
+TOLERANCES = {
+    'living_space': 0.05,
+    'property_area': 0.05,
+    'price': 0.05,
+}
+
+# Maximalwert einer Signaturkomponente (Multiply-Shift-Hashes haben 32 Bit)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+# Funktion zur Normalisierung von Titel und Adresse wie deduplizierung.normalize_text
+def normalize_text(values):
+    return (values.fillna('').astype(str)
+            .str.replace(HIDDEN_ADDRESS_NOTE, '', regex=True)
+            .str.casefold()
+            .str.replace(r'[^\w]+', ' ', regex=True))
+
+
+# Funktion zur Zerlegung eines Textes in Zeichen-Trigramme je Wort; kurze Wörter bleiben ganz
+def text_shingles(text, prefix, size=3):
+    shingles = set()
+    for token in text.split():
+        if len(token) <= size:
+            shingles.add(f'{prefix}{token}')
+        else:
+            shingles.update(f'{prefix}{token[i:i + size]}' for i in range(len(token) - size + 1))
+    return shingles
+
+
+def listing_shingles(data):
+    """
+    Bildet die Shingle-Mengen aus Titel und Adresse jedes Inserats als 32-Bit-Hashes.
+
+    Args:
+        data (pd.DataFrame): Inserate mit den Spalten 'title' und 'address'.
+
+    Returns:
+        list: Ein np.ndarray (uint64) mit den Shingle-Hashes je Inserat.
+    """
+    titles = normalize_text(data['title'])
+    addresses = normalize_text(data['address'])
+    result = []
+    for title, address in zip(titles, addresses):
+        shingles = text_shingles(title, 't:') | text_shingles(address, 'a:')
+        result.append(np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                                  dtype=np.uint64, count=len(shingles)))
+    return result
+
+
+def minhash_signatures(shingle_sets, num_perm=128, seed=42, chunk_size=50000):
+    """
+    Berechnet die MinHash-Signaturen aller Inserate vektorisiert.
+
+    Args:
+        shingle_sets (list): Ergebnis von listing_shingles.
+        num_perm (int): Anzahl der Hashfunktionen (Länge der Signatur).
+        seed (int): Startwert für die Hashfamilie.
+        chunk_size (int): Maximale Anzahl Shingles, die gleichzeitig verarbeitet werden.
+
+    Returns:
+        np.ndarray: Matrix (Inserate x num_perm) vom Typ uint64; leere Mengen erhalten den Maximalwert.
+    """
+    # Hashfamilie ((a * x + b) mod 2^64) >> 32 mit ungeradem a; der Überlauf von uint64 ist gewollt
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64, endpoint=True) | np.uint64(1)
+    b = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64, endpoint=True)
+    signatures = np.full((len(shingle_sets), num_perm), MAX_HASH, dtype=np.uint64)
+
+    start = 0
+    while start < len(shingle_sets):
+        # Inserate zu Blöcken von höchstens chunk_size Shingles zusammenfassen
+        stop, count = start, 0
+        while stop < len(shingle_sets) and (count == 0 or count + len(shingle_sets[stop]) <= chunk_size):
+            count += len(shingle_sets[stop])
+            stop += 1
+        block = shingle_sets[start:stop]
+        lengths = np.array([len(shingles) for shingles in block])
+        filled = np.flatnonzero(lengths)
+        if len(filled):
+            values = np.concatenate([block[position] for position in filled])
+            with np.errstate(over='ignore'):
+                hashed = (values[:, None] * a + b) >> np.uint64(32)
+            offsets = np.concatenate(([0], np.cumsum(lengths[filled])[:-1]))
+            signatures[start + filled] = np.minimum.reduceat(hashed, offsets, axis=0)
+        start = stop
+    return signatures
+
+
+def lsh_candidate_pairs(signatures, prices, bands=32, window=5):
+    """
+    Bestimmt Kandidatenpaare über LSH-Banding.
+
+    Die Signatur wird in bands Bänder zerlegt; Inserate mit identischem Band teilen einen
+    Bucket. Innerhalb eines Buckets wird jedes Inserat nur mit den window nach Preis folgenden
+    Inseraten gepaart, damit große Buckets (z.B. viele Inserate derselben Stadt) nicht
+    quadratisch wachsen.
+
+    Args:
+        signatures (np.ndarray): Ergebnis von minhash_signatures.
+        prices (np.ndarray): Preis je Inserat zum Sortieren innerhalb der Buckets.
+        bands (int): Anzahl der Bänder; num_perm muss durch bands teilbar sein.
+        window (int): Anzahl der Nachbarn je Inserat innerhalb eines Buckets.
+
+    Returns:
+        tuple: (left, right) als np.ndarray mit den Positionen der Kandidatenpaare, left < right.
+    """
+    rows = signatures.shape[1] // bands
+    positions = np.arange(len(signatures))
+    left, right = [], []
+    for band in range(bands):
+        buckets = pd.util.hash_pandas_object(pd.DataFrame(signatures[:, band * rows:(band + 1) * rows]),
+                                             index=False).to_numpy()
+        order = np.lexsort((prices, buckets))
+        sorted_buckets = buckets[order]
+        for offset in range(1, window + 1):
+            same = sorted_buckets[offset:] == sorted_buckets[:-offset]
+            left.append(order[:-offset][same])
+            right.append(order[offset:][same])
+
+    if not left:
+        return positions[:0], positions[:0]
+    pairs = np.unique(np.sort(np.column_stack((np.concatenate(left), np.concatenate(right))), axis=1), axis=0)
+    return pairs[:, 0], pairs[:, 1]
+
+
+# Funktion zur Schätzung der Jaccard-Ähnlichkeit je Kandidatenpaar; blockweise, damit der Vergleich der
+# Signaturen nicht Paare x num_perm Werte auf einmal anlegt
+def signature_similarity(signatures, left, right, chunk_size=20000):
+    similarity = np.empty(len(left))
+    for start in range(0, len(left), chunk_size):
+        stop = start + chunk_size
+        similarity[start:stop] = (signatures[left[start:stop]] == signatures[right[start:stop]]).mean(axis=1)
+    return similarity
+
+
+# Funktion zur Prüfung der numerischen Toleranz; fehlende Werte gelten als verträglich
+def within_tolerance(values, left, right, tolerance):
+    first, second = values[left], values[right]
+    scale = np.maximum(np.abs(first), np.abs(second))
+    with np.errstate(invalid='ignore'):
+        close = np.abs(first - second) <= tolerance * scale
+    return close | np.isnan(first) | np.isnan(second)
+
+
+# Funktion zur Bestimmung zusammenhängender Komponenten (Union-Find per Minimum-Propagation mit Pfadverkürzung)
+def connected_components(count, left, right):
+    labels = np.arange(count)
+    while True:
+        previous = labels.copy()
+        minimum = np.minimum(labels[left], labels[right])
+        np.minimum.at(labels, left, minimum)
+        np.minimum.at(labels, right, minimum)
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def assign_clusters(data, threshold=0.5, tolerances=TOLERANCES, num_perm=128, bands=32, window=5):
+    """
+    Ordnet jedem Inserat eine Cluster-ID zu; Beinahe-Duplikate erhalten dieselbe ID.
+
+    Args:
+        data (pd.DataFrame): Inserate mit 'title', 'address' und den Spalten aus tolerances.
+        threshold (float): Mindestwert der geschätzten Jaccard-Ähnlichkeit der Shingles.
+        tolerances (dict): Relative Toleranz je numerischer Spalte.
+        num_perm (int): Länge der MinHash-Signatur.
+        bands (int): Anzahl der LSH-Bänder.
+        window (int): Anzahl der Nachbarn je Inserat innerhalb eines Buckets.
+
+    Returns:
+        pd.Series: cluster_id je Inserat, die Position des ersten Inserats im Cluster.
+    """
+    signatures = minhash_signatures(listing_shingles(data), num_perm=num_perm)
+    numeric = {column: pd.to_numeric(data[column], errors='coerce').to_numpy(dtype=float)
+               for column in tolerances if column in data.columns}
+    prices = numeric.get('price', np.zeros(len(data)))
+    left, right = lsh_candidate_pairs(signatures, np.nan_to_num(prices), bands=bands, window=window)
+
+    # Kandidaten prüfen: geschätzte Jaccard-Ähnlichkeit und numerische Toleranz
+    similarity = signature_similarity(signatures, left, right)
+    # Inserate ohne Titel und Adresse haben keine aussagekräftige Signatur
+    empty = (signatures == MAX_HASH).all(axis=1)
+    accepted = (similarity >= threshold) & ~empty[left]
+    for column, values in numeric.items():
+        accepted &= within_tolerance(values, left, right, tolerances[column])
+
+    # Gleicher Bauträger-Entwurf an verschiedenen Orten ist kein Duplikat: Postleitzahlen müssen übereinstimmen
+    plz = data['address'].astype(str).str.extract(r'\b(\d{5})\b', expand=False).to_numpy(dtype=object)
+    accepted &= (plz[left] == plz[right]) | pd.isna(plz[left]) | pd.isna(plz[right])
+
+    labels = connected_components(len(data), left[accepted], right[accepted])
+    clusters = pd.Series(labels, index=data.index, name='cluster_id')
+    print(f"{len(left)} candidate pairs, {int(accepted.sum())} near-duplicate pairs, "
+          f"{len(data) - clusters.nunique()} listings in clusters with an earlier listing")
+    return clusters
+
+
+def drop_near_duplicates(data, **kwargs):
+    """
+    Ergänzt die Spalte cluster_id und behält je Cluster nur das erste Inserat.
+
+    Args:
+        data (pd.DataFrame): Inserate.
+        **kwargs: Weitere Parameter für assign_clusters.
+
+    Returns:
+        pd.DataFrame: Ein Inserat je Cluster mit der Spalte cluster_id.
+    """
+    data = data.assign(cluster_id=assign_clusters(data, **kwargs))
+    return data[data['cluster_id'].to_numpy() == np.arange(len(data))]
@@ -0,0 +1,133 @@
+"""
+Ausgabe der Diagramme der Analyseskripte, interaktiv oder ohne Bildschirm.
+
+Interaktiv (Standard) wird jedes Diagramm wie bisher sofort gezeichnet und mit plt.show()
+angezeigt. Im Headless-Modus (Umgebungsvariable PLOTS_HEADLESS=1 oder headless=True) werden
+die Diagramme nur vorgemerkt; run() zeichnet sie im Agg-Backend verteilt auf einen
+Prozesspool und speichert sie als PNG. Ein Diagramm wird übersprungen, wenn die Datei
+existiert und der Fingerabdruck aus Daten, Zeichenfunktion und Parametern unverändert ist.
+
+Die Zeichenfunktionen erhalten die Daten als ersten Parameter, legen mit plt.figure() eine
+Abbildung an und rufen selbst kein plt.show() auf.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from stage_cache import function_fingerprint
+
+# Zielverzeichnis der Diagramme und Umgebungsvariable für den Headless-Modus
+FIGURE_DIR = 'figures'
+HEADLESS_VARIABLE = 'PLOTS_HEADLESS'
+
+
+# Funktion zur Berechnung eines Fingerabdrucks der Daten eines Diagramms
+def data_fingerprint(data):
+    digest = hashlib.sha256()
+    digest.update(json.dumps([list(map(str, data.columns)), list(map(str, data.dtypes))]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# Funktion zum Zeichnen und Speichern eines Diagramms in einem Worker-Prozess
+def render_figure(path, function, data, params, dpi):
+    matplotlib.use('Agg')
+    function(data, **params)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    plt.savefig(temp_path, format='png', dpi=dpi, bbox_inches='tight')
+    plt.close('all')
+    os.replace(temp_path, path)
+    return path
+
+
+class PlotExecutor:
+    """
+    Warteschlange für Diagramme mit paralleler Ausgabe im Headless-Modus.
+
+    Args:
+        output_dir (str): Verzeichnis der PNG-Dateien und des Fingerabdruck-Manifests.
+        headless (bool, optional): Headless-Modus; standardmäßig aus PLOTS_HEADLESS.
+        max_workers (int, optional): Anzahl der Prozesse.
+        dpi (int): Auflösung der gespeicherten Diagramme.
+    """
+
+    def __init__(self, output_dir=FIGURE_DIR, headless=None, max_workers=None, dpi=100):
+        self.output_dir = output_dir
+        self.headless = os.environ.get(HEADLESS_VARIABLE) == '1' if headless is None else headless
+        self.max_workers = max_workers
+        self.dpi = dpi
+        self.queue = []
+        self.manifest_path = os.path.join(output_dir, 'fingerprints.json')
+        if self.headless:
+            plt.switch_backend('Agg')
+            os.makedirs(output_dir, exist_ok=True)
+
+    def path(self, name):
+        return os.path.join(self.output_dir, f'{name}.png')
+
+    def submit(self, name, function, data, **params):
+        """
+        Zeichnet ein Diagramm sofort (interaktiv) oder merkt es zur Ausgabe vor (headless).
+
+        Args:
+            name (str): Dateiname ohne Endung.
+            function (callable): Zeichenfunktion function(data, **params).
+            data (pd.DataFrame): Nur die Daten, die das Diagramm benötigt.
+            **params: Weitere Parameter der Zeichenfunktion.
+        """
+        if not self.headless:
+            function(data, **params)
+            plt.show()
+            return
+        fingerprint = hashlib.sha256(json.dumps([data_fingerprint(data), function_fingerprint(function), params],
+                                                sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        self.queue.append((name, fingerprint, function, data, params))
+
+    def run(self):
+        """
+        Gibt alle vorgemerkten Diagramme aus und überspringt unveränderte.
+
+        Returns:
+            list: Pfade der neu gezeichneten Diagramme.
+        """
+        if not self.queue:
+            return []
+        manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding='utf-8') as file:
+                manifest = json.load(file)
+        pending = [spec for spec in self.queue
+                   if manifest.get(spec[0]) != spec[1] or not os.path.exists(self.path(spec[0]))]
+
+        rendered = []
+        if pending:
+            # fork übernimmt Zeichenfunktionen aus Skripten ohne __main__-Abfrage, ohne sie erneut auszuführen
+            context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+            with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context) as executor:
+                futures = {executor.submit(render_figure, self.path(name), function, data, params, self.dpi):
+                           (name, fingerprint) for name, fingerprint, function, data, params in pending}
+                for future in as_completed(futures):
+                    name, fingerprint = futures[future]
+                    try:
+                        rendered.append(future.result())
+                    except Exception as e:
+                        print(f"Error rendering figure {name}: {e}")
+                        continue
+                    manifest[name] = fingerprint
+
+            temp_path = f'{self.manifest_path}.{os.getpid()}.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(manifest, file, indent=1, sort_keys=True)
+            os.replace(temp_path, self.manifest_path)
+
+        print(f"{len(rendered)} figures rendered, {len(self.queue) - len(pending)} unchanged figures skipped "
+              f"in {self.output_dir}")
+        self.queue = []
+        return rendered
@@ -0,0 +1,164 @@
+"""
+Regionaler Feature-Store mit allen numerischen Indikatoren des Deutschlandatlas je Gemeinde.
+
+Die Indikatoren liegen als spaltenweise gespeicherte float64-Matrix (indicators.f64) in einer
+Datei, die per np.memmap eingeblendet wird, damit Schwellenwerte wie in den Skripten auf den
+unveränderten Werten berechnet werden; gkz.npy enthält die aufsteigend sortierten
+Gemeindeschlüssel. Inserate speichern nur noch den ganzzahligen Gemeindeschlüssel (GKZ1221)
+und holen sich die benötigten Indikatoren beim Laden über eine binäre Suche im Index.
+Dadurch wird nur der Teil der Datei gelesen, der zu den angeforderten Indikatoren gehört.
+Beim Öffnen wird der Store neu angelegt, wenn sich die Arbeitsmappe geändert hat.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from deutschlandatlas_cache import ATLAS_PATH, load_atlas_sheet, workbook_sha256
+
+STORE_DIR = "regional_features"
+STORE_DTYPE = 'float64'
+
+
+# Funktion zum Schreiben der Store-Dateien aus einem Tabellenblatt des Deutschlandatlas
+def write_feature_store(store_dir, sheet_name, workbook_path, key_column):
+    data = load_atlas_sheet(sheet_name, workbook_path=workbook_path)
+    data[key_column] = pd.to_numeric(data[key_column], errors='coerce')
+    data = data.dropna(subset=[key_column]).drop_duplicates(key_column).sort_values(key_column)
+
+    indicators = [column for column in data.select_dtypes(include='number').columns if column != key_column]
+    os.makedirs(store_dir, exist_ok=True)
+    np.save(os.path.join(store_dir, 'gkz.npy'), data[key_column].to_numpy(dtype=np.int64))
+
+    # Spaltenweise (Fortran-Reihenfolge), damit jeder Indikator zusammenhängend auf der Platte liegt
+    matrix = np.memmap(os.path.join(store_dir, 'indicators.f64'), dtype=STORE_DTYPE, mode='w+',
+                       shape=(len(data), len(indicators)), order='F')
+    for position, column in enumerate(indicators):
+        matrix[:, position] = data[column].to_numpy(dtype=STORE_DTYPE)
+    matrix.flush()
+    del matrix
+
+    with open(os.path.join(store_dir, 'meta.json'), 'w', encoding='utf-8') as file:
+        json.dump({'indicators': indicators, 'rows': len(data), 'sheet_name': sheet_name, 'key_column': key_column,
+                   'dtype': STORE_DTYPE, 'workbook_sha256': workbook_sha256(workbook_path)},
+                  file, ensure_ascii=False, indent=1)
+    print(f"Feature store with {len(indicators)} indicators for {len(data)} Gemeinden written to {store_dir}")
+
+
+def build_feature_store(store_dir=STORE_DIR, sheet_name='Deutschlandatlas_GEM1221', workbook_path=ATLAS_PATH,
+                        key_column='GKZ1221'):
+    """
+    Legt den Feature-Store aus einem Tabellenblatt des Deutschlandatlas an.
+
+    Args:
+        store_dir (str): Zielverzeichnis.
+        sheet_name (str): Tabellenblatt mit einer Zeile je Gemeinde.
+        workbook_path (str): Pfad zur Excel-Datei.
+        key_column (str): Spalte mit dem Gemeindeschlüssel.
+
+    Returns:
+        RegionalFeatureStore: Der geöffnete Store.
+    """
+    write_feature_store(store_dir, sheet_name, workbook_path, key_column)
+    return RegionalFeatureStore(store_dir, workbook_path)
+
+
+class RegionalFeatureStore:
+    """
+    Lesezugriff auf einen mit build_feature_store angelegten Store.
+
+    Ist die Arbeitsmappe vorhanden und weicht ihr Hash von dem in meta.json ab (oder fehlt der
+    Store), wird der Store vor dem Öffnen neu angelegt. Ohne Arbeitsmappe wird der vorhandene
+    Store ungeprüft verwendet.
+
+    Args:
+        store_dir (str): Verzeichnis des Stores.
+        workbook_path (str): Pfad zur Excel-Datei, aus der der Store angelegt wurde.
+    """
+
+    def __init__(self, store_dir=STORE_DIR, workbook_path=ATLAS_PATH):
+        meta_path = os.path.join(store_dir, 'meta.json')
+        meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as file:
+                meta = json.load(file)
+        if os.path.exists(workbook_path) and (meta.get('dtype') != STORE_DTYPE or
+                                              meta.get('workbook_sha256') != workbook_sha256(workbook_path)):
+            print(f"Feature store in {store_dir} is missing or out of date for {workbook_path}, rebuilding ...")
+            write_feature_store(store_dir, meta.get('sheet_name', 'Deutschlandatlas_GEM1221'), workbook_path,
+                                meta.get('key_column', 'GKZ1221'))
+        with open(meta_path, encoding='utf-8') as file:
+            self.meta = json.load(file)
+        self.indicators = self.meta['indicators']
+        self.positions = {name: position for position, name in enumerate(self.indicators)}
+        self.gkz = np.load(os.path.join(store_dir, 'gkz.npy'), mmap_mode='r')
+        self.matrix = np.memmap(os.path.join(store_dir, 'indicators.f64'), dtype=STORE_DTYPE, mode='r',
+                                shape=(self.meta['rows'], len(self.indicators)), order='F')
+
+    # Funktion zur Bestimmung der Zeilen im Store; nicht gefundene Schlüssel erhalten -1
+    def lookup(self, gkz):
+        keys = pd.to_numeric(pd.Series(gkz), errors='coerce').fillna(-1).to_numpy(dtype=np.int64)
+        rows = np.searchsorted(self.gkz, keys)
+        rows = np.minimum(rows, len(self.gkz) - 1)
+        return np.where(self.gkz[rows] == keys, rows, -1)
+
+    def gather(self, gkz, indicators):
+        """
+        Liefert die angeforderten Indikatoren für eine Folge von Gemeindeschlüsseln.
+
+        Args:
+            gkz (array-like): Gemeindeschlüssel, z.B. die Spalte GKZ1221 der Inserate.
+            indicators (list): Namen der Indikatoren.
+
+        Returns:
+            pd.DataFrame: Eine Spalte je Indikator, NaN für unbekannte Schlüssel.
+        """
+        index = gkz.index if isinstance(gkz, pd.Series) else None
+        rows = self.lookup(gkz)
+        found = rows >= 0
+        columns = {}
+        for name in indicators:
+            values = np.full(len(rows), np.nan, dtype=STORE_DTYPE)
+            values[found] = self.matrix[:, self.positions[name]][rows[found]]
+            columns[name] = values
+        return pd.DataFrame(columns, index=index)
+
+    def column(self, indicator):
+        return np.asarray(self.matrix[:, self.positions[indicator]])
+
+    def categorize(self, gkz, indicator='bev_dicht', quantile=0.75):
+        """
+        Ordnet Gemeinden wie einordnung_staedtisch_ländlich.py als 'städtisch' ein, wenn der
+        Indikator über dem Quantil aller Gemeinden liegt, sonst als 'ländlich'. Wie dort gelten
+        Gemeinden ohne Wert des Indikators als 'ländlich'.
+
+        Returns:
+            pd.Series: Kategorie je Schlüssel, NaN für unbekannte Schlüssel.
+        """
+        threshold = np.nanquantile(self.column(indicator), quantile)
+        values = self.gather(gkz, [indicator])[indicator]
+        return pd.Series(np.where(values > threshold, 'städtisch', 'ländlich'),
+                         index=values.index, dtype=object).where(self.lookup(gkz) >= 0)
+
+
+def add_regional_features(listings, indicators, store=None, key_column='GKZ1221'):
+    """
+    Ergänzt Inserate beim Laden um Indikatoren aus dem Feature-Store, ohne die CSV-Datei zu verbreitern.
+
+    Args:
+        listings (pd.DataFrame): Inserate mit der Spalte key_column.
+        indicators (list): Namen der Indikatoren.
+        store (RegionalFeatureStore, optional): Geöffneter Store; standardmäßig STORE_DIR.
+        key_column (str): Spalte mit dem Gemeindeschlüssel.
+
+    Returns:
+        pd.DataFrame: Inserate mit den zusätzlichen Spalten.
+    """
+    store = store or RegionalFeatureStore()
+    return listings.join(store.gather(listings[key_column], indicators))
+
+
+if __name__ == '__main__':
+    build_feature_store()
@@ -0,0 +1,223 @@
+"""
+Gemeinsamer Cache für Zwischenstufen der Analyseskripte.
+
+Jede Stufe (z.B. numerische Umwandlung, Ausreißerfilter, Log-Transformation) wird als
+Parquet-Datei gespeichert. Der Schlüssel setzt sich aus dem Schlüssel der vorherigen Stufe
+(am Anfang dem Inhalts-Hash der Eingabedatei), dem Namen und den Parametern der Stufe sowie
+einem Fingerabdruck der Stufenfunktion zusammen, der auch die von ihr verwendeten
+Hilfsfunktionen und lokalen Module (z.B. listing_schema) umfasst. Ändert sich nur ein
+Diagramm, startet das Skript beim nächsten Lauf direkt mit der letzten zwischengespeicherten
+Stufe.
+
+Wird eine Stufe aus dem Cache geladen, läuft ihre Funktion nicht; Ausgaben und andere
+Nebenwirkungen der Stufenfunktion entfallen dann. Analyseausgaben gehören deshalb hinter
+frame() und nicht in die Stufenfunktionen.
+
+Der Cache ist in der Größe begrenzt; bei Überschreitung werden die am längsten nicht
+verwendeten Dateien gelöscht (LRU über die Änderungszeit, die bei jedem Zugriff erneuert wird).
+"""
+
+import ast
+import hashlib
+import inspect
+import json
+import os
+import sys
+
+import pandas as pd
+
+# Inhalts-Hash einer beliebigen Datei, wie für die Arbeitsmappe des Deutschlandatlas
+from deutschlandatlas_cache import workbook_sha256 as file_sha256
+
+# Standardverzeichnis und Größenbegrenzung des Caches
+CACHE_DIR = '.stage_cache'
+MAX_BYTES = 1024 ** 3
+
+
+# Typen von Modulkonstanten, deren Wert in den Fingerabdruck eingeht
+SIMPLE_TYPES = (str, int, float, bool, tuple, list, dict, type(None))
+
+# Verzeichnis der Analyseskripte; nur Module aus diesem Verzeichnis fließen in die Fingerabdrücke ein
+LOCAL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# Funktion zur Prüfung, ob ein Modul zu den Analyseskripten gehört
+def is_local_module(module):
+    path = getattr(module, '__file__', None)
+    return path is not None and os.path.dirname(os.path.abspath(path)) == LOCAL_DIR
+
+
+# Funktion zur Bestimmung aller globalen Namen, die eine Funktion (einschließlich innerer Funktionen) verwendet
+def referenced_names(function):
+    names = set()
+    codes = [function.__code__]
+    while codes:
+        code = codes.pop()
+        names.update(code.co_names)
+        codes.extend(const for const in code.co_consts if inspect.iscode(const))
+    return names
+
+
+# Funktion zur Zuordnung der importierten Namen eines Moduls zu ihren Herkunftsmodulen
+def imported_names(module):
+    with open(module.__file__, encoding='utf-8') as file:
+        tree = ast.parse(file.read())
+    origins = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module:
+            origins.update({alias.asname or alias.name: node.module for alias in node.names})
+        elif isinstance(node, ast.Import):
+            origins.update({alias.asname or alias.name: alias.name for alias in node.names})
+    return origins
+
+
+# Funktion zur Bestimmung eines Fingerabdrucks eines lokalen Moduls samt der lokalen Module, die es importiert
+def module_fingerprint(module, seen=None):
+    seen = set() if seen is None else seen
+    seen.add(module.__name__)
+    digest = hashlib.sha256(file_sha256(module.__file__).encode('utf-8'))
+    for origin_name in sorted(set(imported_names(module).values()) - seen):
+        origin = sys.modules.get(origin_name)
+        if origin is not None and is_local_module(origin):
+            digest.update(module_fingerprint(origin, seen).encode('utf-8'))
+    return digest.hexdigest()
+
+
+# Funktion zur Bestimmung eines Fingerabdrucks der Stufenfunktion, damit Codeänderungen den Cache ungültig machen
+def function_fingerprint(function, seen=None):
+    """
+    Hasht den Quelltext und die Standardwerte der Funktion sowie alles, was sie aus den
+    Analyseskripten verwendet: Hilfsfunktionen und einfache Konstanten desselben Moduls
+    rekursiv, andere lokale Module (z.B. listing_schema, ausstattungsmerkmale) mit ihrem
+    gesamten Quelltext. Eine Änderung an SCHEMA oder parse_amenities macht so auch Stufen
+    ungültig, die nur über einen Wrapper wie load_data darauf zugreifen.
+
+    Args:
+        function (callable): Stufen- oder Zeichenfunktion.
+        seen (set, optional): Bereits berücksichtigte Funktionen (für rekursive Aufrufe).
+
+    Returns:
+        str: Hex-Digest.
+    """
+    seen = set() if seen is None else seen
+    seen.add(function)
+    try:
+        source = inspect.getsource(function)
+    except (OSError, TypeError):
+        source = function.__code__.co_code.hex()
+    digest = hashlib.sha256(source.encode('utf-8'))
+    digest.update(repr([function.__defaults__, function.__kwdefaults__]).encode('utf-8'))
+
+    module = inspect.getmodule(function)
+    if not is_local_module(module):
+        return digest.hexdigest()
+    origins = imported_names(module)
+    for name in sorted(referenced_names(function)):
+        if name not in function.__globals__:
+            continue
+        value = function.__globals__[name]
+        origin = value if inspect.ismodule(value) else sys.modules.get(origins.get(name))
+        if origin is not None:
+            # Lokale Module gehen mit ihrem gesamten Quelltext ein, Bibliotheken werden übergangen
+            if is_local_module(origin) and origin is not module:
+                digest.update(module_fingerprint(origin).encode('utf-8'))
+        elif inspect.isfunction(value):
+            if value not in seen:
+                digest.update(function_fingerprint(value, seen).encode('utf-8'))
+        elif isinstance(value, SIMPLE_TYPES):
+            digest.update(repr((name, value)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class StageCache:
+    """
+    Verzeichnis mit zwischengespeicherten Stufen und LRU-Verdrängung.
+
+    Args:
+        cache_dir (str): Verzeichnis des Caches.
+        max_bytes (int): Maximale Gesamtgröße aller Parquet-Dateien.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.parquet')
+
+    def load(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        # Zugriff vermerken, damit die Datei bei der Verdrängung als zuletzt verwendet gilt
+        os.utime(path)
+        return pd.read_parquet(path)
+
+    def store(self, key, data):
+        path = self.path(key)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        data.to_parquet(temp_path)
+        os.replace(temp_path, path)
+        self.evict()
+
+    def evict(self):
+        files = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith('.parquet')]
+        files = sorted((os.stat(path).st_mtime_ns, os.path.getsize(path), path) for path in files)
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            print(f"Evicted {os.path.basename(path)} from stage cache")
+
+    def source(self, file_path, load):
+        """
+        Beginnt eine Kette von Stufen mit einer Eingabedatei.
+
+        Args:
+            file_path (str): Eingabedatei; ihr Inhalts-Hash ist der Ausgangsschlüssel.
+            load (callable): Funktion, die die Datei lädt, z.B. read_listings.
+
+        Returns:
+            CachedStage: Die erste Stufe.
+        """
+        key = hashlib.sha256(json.dumps(['source', file_sha256(file_path), function_fingerprint(load)])
+                             .encode('utf-8')).hexdigest()
+        return CachedStage(self, key, 'source', lambda: load(file_path))
+
+
+class CachedStage:
+    """
+    Eine Stufe der Kette. Die Daten werden erst bei frame() geladen oder berechnet; liegt eine
+    Stufe im Cache, werden die vorherigen Stufen nicht mehr benötigt.
+    """
+
+    def __init__(self, cache, key, name, compute):
+        self.cache = cache
+        self.key = key
+        self.name = name
+        self.compute = compute
+        self.data = None
+
+    def then(self, name, function, **params):
+        """
+        Hängt eine Stufe an; function erhält den DataFrame der vorherigen Stufe und params.
+
+        Returns:
+            CachedStage: Die neue Stufe.
+        """
+        description = json.dumps([self.key, name, function_fingerprint(function), params], sort_keys=True, default=str)
+        key = hashlib.sha256(description.encode('utf-8')).hexdigest()
+        return CachedStage(self.cache, key, name, lambda: function(self.frame(), **params))
+
+    def frame(self):
+        if self.data is None:
+            self.data = self.cache.load(self.key)
+            if self.data is None:
+                self.data = self.compute()
+                self.cache.store(self.key, self.data)
+            else:
+                print(f"Stage '{self.name}' loaded from cache")
+        return self.data
@@ -0,0 +1,77 @@
+import glob
+import os
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bereinigung import COLUMN_CLEANERS
+
+# Rohdaten für den Abgleich, relativ zu diesem Verzeichnis
+RAW_CSV_PATTERN = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Datensatz', '*HAUS*',
+                               'properties_*.csv')
+RAW_CSV_FILES = sorted(glob.glob(RAW_CSV_PATTERN))
+
+# Bausteine für zufällige Werte im Stil der Rohdaten
+FRAGMENTS = ['1', '23', '456', '7.890', '0', ',', '.', ',5', ' ', '€', '€/m²', 'm²', '%', ' %', '-', '+', 'e5',
+             '_', 'Auf Anfrage', 'Preis auf Anfrage', 'inkl. MwSt.', 'nil', 'Stellplatz', '\n', '\t', '²', '³',
+             # Unicode-Ziffern und -Leerzeichen, die re anders behandelt als RE2
+             '١', '٣', '\xa0', '\u202f', '\x1c']
+
+
+# Funktion zum Vergleich zweier Spalten; NaN gilt als gleich
+def same_values(expected, actual):
+    expected = pd.to_numeric(expected, errors='coerce').to_numpy(dtype=float)
+    actual = actual.to_numpy(dtype=float)
+    return bool(np.array_equal(expected, actual, equal_nan=True))
+
+
+# Funktion zum Abgleich einer Spalte; auch ausgelöste Fehler müssen übereinstimmen
+def check_column(values, cell_cleaner, column_cleaner):
+    try:
+        expected = values.apply(cell_cleaner)
+    except ValueError:
+        expected = ValueError
+    try:
+        actual = column_cleaner(values)
+    except ValueError:
+        actual = ValueError
+    if expected is ValueError or actual is ValueError:
+        return expected is actual
+    return same_values(expected, actual)
+
+
+# Funktion zur Erzeugung zufällig zusammengesetzter Werte (inkl. NaN und Zahlen)
+def random_values(samples=20000, seed=0):
+    rng = random.Random(seed)
+    values = [''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 5))) for _ in range(samples)]
+    values += [np.nan, 3, 2.5, None]
+    return pd.Series(values, dtype=object)
+
+
+@pytest.mark.skipif(not RAW_CSV_FILES, reason="raw CSV files not available")
+@pytest.mark.parametrize('file_path', RAW_CSV_FILES, ids=os.path.basename)
+def test_vectorized_cleaning_matches_raw_files(file_path):
+    data = pd.read_csv(file_path)
+    mismatches = [column for column, (cell_cleaner, column_cleaner) in COLUMN_CLEANERS.items()
+                  if column in data.columns and not check_column(data[column], cell_cleaner, column_cleaner)]
+    assert mismatches == []
+
+
+# Werte, bei denen float() einen Fehler auslöst, werden einzeln geprüft
+@pytest.mark.parametrize('column', list(COLUMN_CLEANERS))
+def test_vectorized_cleaning_matches_random_values(column):
+    cell_cleaner, column_cleaner = COLUMN_CLEANERS[column]
+    values = random_values()
+    failing = []
+    for position, value in values.items():
+        try:
+            cell_cleaner(value)
+        except ValueError:
+            failing.append(position)
+
+    assert check_column(values.drop(failing), cell_cleaner, column_cleaner)
+    mismatches = [values[position] for position in failing
+                  if not check_column(values.loc[[position]], cell_cleaner, column_cleaner)]
+    assert mismatches == []
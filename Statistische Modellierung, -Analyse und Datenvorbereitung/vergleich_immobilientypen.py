@@ -1,13 +1,26 @@
+import os
+
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy.stats import kruskal
 
+from listing_schema import read_listings
+from plot_executor import FIGURE_DIR, PlotExecutor
+from stage_cache import StageCache
+
 # Untersuchung: Schauen, ob es einen signifikanten Unterschied zwischen den Immobilientypen:
 # Einfamilienhäuser, Mehrfamilienhäuser und Doppelhaushälften gibt
 # Daten laden und bereinigen
 def load_data(filepath):
-    return pd.read_csv(filepath)
+    return read_listings(filepath)
+
+# Entfernen nicht mehr vorkommender Typen aus der Kategorie, damit value_counts und der Boxplot
+# nur die gefilterten Typen zeigen
+def drop_unused_types(data):
+    if isinstance(data['type'].dtype, pd.CategoricalDtype):
+        data = data.assign(type=data['type'].cat.remove_unused_categories())
+    return data
 
 # Funktion zum Filtern der Typen
 def match_type(row, house_type):
@@ -18,27 +31,32 @@ def match_type(row, house_type):
                 return True
     return False
 
-# Filtern der Typen und Prüfen auf Matches
+# Filtern der Typen und Prüfen auf Matches; matched_type vermerkt den gesuchten Typ
 def filter_house_types(data, types):
     filtered_data = pd.DataFrame()
     for house_type in types:
-        matches = data[data.apply(lambda row: match_type(row, house_type), axis=1)]
+        matches = data[data.apply(lambda row: match_type(row, house_type), axis=1)].assign(matched_type=house_type)
         filtered_data = pd.concat([filtered_data, matches])
+
+    filtered_data.reset_index(drop=True, inplace=True)
+    return drop_unused_types(filtered_data)
+
+# Ausgabe der Anzahl und einiger Beispiele der Matches je Typ
+def print_matches(filtered_data, types):
+    for house_type in types:
+        matches = filtered_data[filtered_data['matched_type'] == house_type]
         print(f"Matches für {house_type}: {len(matches)}")
         print(f"Beispiele für {house_type}:")
         print(matches[['type', 'price', 'price_per_m2']].head())  # Beispielzeilen anzeigen
 
-    filtered_data.reset_index(drop=True, inplace=True)
-    return filtered_data
-
 # Beibehalten der drei Haupttypen
 def retain_main_types(filtered_data, types):
     filtered_data = filtered_data[filtered_data['type'].str.contains('|'.join(types), na=False)]
-    return filtered_data
+    return drop_unused_types(filtered_data)
 
 # Entfernen von Einträgen mit 0 oder negativem Preis pro m2
 def filter_price_per_m2(filtered_data):
-    return filtered_data[filtered_data['price_per_m2'] > 0]
+    return drop_unused_types(filtered_data[filtered_data['price_per_m2'] > 0])
 
 # Ausreißer im Preis pro Quadratmeter durch den Median ersetzen
 def replace_outliers_with_median(data, column):
@@ -49,6 +67,7 @@ def replace_outliers_with_median(data, column):
     upper_bound = q3 + 1.5 * iqr
     median_value = data[column].median()
     data.loc[(data[column] < lower_bound) | (data[column] > upper_bound), column] = median_value
+    return data
 
 # Boxplot für Preis pro Quadratmeter erstellen
 def plot_price_per_m2(filtered_data):
@@ -57,7 +76,6 @@ def plot_price_per_m2(filtered_data):
     plt.xlabel('Immobilientyp')
     plt.ylabel('Preis pro Quadratmeter')
     plt.title('Vergleich des Preises pro Quadratmeter nach Immobilientyp')
-    plt.show()
 
 # Überprüfen der Gruppengröße
 def check_group_sizes(filtered_data, types):
@@ -77,29 +95,35 @@ def perform_kruskal_test(data_groups):
 # Hauptprogramm
 def main():
     data_path = '../../../../../Desktop/Cleaned_HAUS_Properties.csv'
-    data = load_data(data_path)
-
     types = ['Einfamilienhaus', 'Mehrfamilienhaus', 'Doppelhaushälfte']
-    filtered_data = filter_house_types(data, types)
+
+    # Die Filterstufen werden zwischengespeichert und nur bei geänderter Eingabedatei oder geändertem Code neu berechnet
+    matched = StageCache().source(data_path, load_data).then('filter_house_types', filter_house_types, types=types)
+    # Die Ausgabe steht außerhalb der Stufe, damit sie auch bei einem Cache-Treffer erscheint
+    print_matches(matched.frame(), types)
 
     print("\nTypen nach dem Filtern:")
-    print(filtered_data['type'].value_counts())  # Richtig geschriebene Methode
+    print(matched.frame()['type'].value_counts())  # Richtig geschriebene Methode
 
-    filtered_data = retain_main_types(filtered_data, types)
+    main_types = matched.then('retain_main_types', retain_main_types, types=types)
 
     print("\nTypen nach dem Beibehalten der drei Haupttypen:")
-    print(filtered_data['type'].value_counts())  # Richtig geschriebene Methode
-
-    filtered_data = filter_price_per_m2(filtered_data)
+    print(main_types.frame()['type'].value_counts())  # Richtig geschriebene Methode
 
-    replace_outliers_with_median(filtered_data, 'price_per_m2')
+    filtered_data = (main_types.then('filter_price_per_m2', filter_price_per_m2)
+                     .then('replace_outliers_with_median', replace_outliers_with_median, column='price_per_m2')
+                     .frame())
 
-    plot_price_per_m2(filtered_data)
+    # Mit PLOTS_HEADLESS=1 wird das Diagramm nach figures/vergleich_immobilientypen gespeichert
+    plots = PlotExecutor(os.path.join(FIGURE_DIR, 'vergleich_immobilientypen'))
+    plots.submit('preis_pro_m2', plot_price_per_m2, filtered_data[['type', 'price_per_m2']])
 
     data_groups = check_group_sizes(filtered_data, types)
 
     perform_kruskal_test(data_groups)
 
+    plots.run()
+
 # Ausführung des Hauptprogramms
 if __name__ == '__main__':
     main()
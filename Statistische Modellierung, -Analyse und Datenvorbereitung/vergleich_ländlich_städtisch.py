@@ -4,14 +4,24 @@ und visualisiert die Ergebnisse. Ziel ist es, Unterschiede zwischen städtischen
 Regionen in Bezug auf verschiedene Immobilienmerkmale zu analysieren.
 """
 
+import os
+
 import pandas as pd
 import scipy.stats as stats
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from listing_schema import read_listings
+from plot_executor import FIGURE_DIR, PlotExecutor
+from regional_feature_store import RegionalFeatureStore
+
 # Datensatz laden
 file_path = '../../../../Desktop/HAUS_Regionale_Einordnung.csv'
-df = pd.read_csv(file_path)
+df = read_listings(file_path)
+
+# Inserate mit Gemeindeschlüssel erhalten die Kategorie erst beim Laden aus dem regionalen Feature-Store
+if 'Kategorie' not in df.columns:
+    df['Kategorie'] = RegionalFeatureStore().categorize(df['GKZ1221'])
 
 # Erste Übersicht über die Daten anzeigen
 print("Erste Übersicht über die Daten:")
@@ -26,12 +36,14 @@ for col in ['rooms', 'bedrooms', 'bathrooms']:
     if df[col].dtype == 'object':
         df[col] = pd.to_numeric(df[col], errors='coerce')
 
-# Bereinigung der Spalte 'garage_parking' durch Extrahieren von Zahlen
-df['garage_parking'] = df['garage_parking'].str.extract(r'(\d+)').astype(float)
+# Bereinigung der Spalte 'garage_parking' durch Extrahieren von Zahlen (nur bei noch unbereinigtem Text)
+if not pd.api.types.is_numeric_dtype(df['garage_parking']):
+    df['garage_parking'] = df['garage_parking'].str.extract(r'(\d+)').astype(float)
 
 # Bereinigung der Spalte 'buyer_commission', um Prozentsätze in float umzuwandeln
-df['buyer_commission'] = df['buyer_commission'].str.extract(r'(\d+,\d+) %')
-df['buyer_commission'] = df['buyer_commission'].str.replace(',', '.').astype(float)
+if not pd.api.types.is_numeric_dtype(df['buyer_commission']):
+    df['buyer_commission'] = df['buyer_commission'].str.extract(r'(\d+,\d+) %')
+    df['buyer_commission'] = df['buyer_commission'].str.replace(',', '.').astype(float)
 
 # Überprüfung auf NaN-Werte in den interessierenden Spalten
 print("\nAnzahl der NaN-Werte nach Umwandlung in den relevanten Spalten:")
@@ -57,14 +69,20 @@ print("\nErgebnisse des ungepaarten T-Tests:")
 for key, value in t_test_results.items():
     print(f"{key}: T-Statistik = {value['T-statistic']}, P-Wert = {value['P-value']}")
 
-# Visualisierung der Verteilungen zum Vergleich
-plt.figure(figsize=(14, 16))
-for i, column in enumerate(columns_of_interest[:-1], 1):  # 'Kategorie' ausschließen
-    plt.subplot(4, 2, i)
-    sns.boxplot(x='Kategorie', y=column, data=df_filtered)
-    plt.title(f'{column} nach Kategorie (städtisch vs. ländlich)')
-    plt.xlabel('Kategorie')
-    plt.ylabel(column)
-
-plt.tight_layout()
-plt.show()
+# Funktion zur Visualisierung der Verteilungen zum Vergleich
+def plot_category_boxplots(data, columns):
+    plt.figure(figsize=(14, 16))
+    for i, column in enumerate(columns, 1):
+        plt.subplot(4, 2, i)
+        sns.boxplot(x='Kategorie', y=column, data=data)
+        plt.title(f'{column} nach Kategorie (städtisch vs. ländlich)')
+        plt.xlabel('Kategorie')
+        plt.ylabel(column)
+
+    plt.tight_layout()
+
+# Mit PLOTS_HEADLESS=1 wird das Diagramm nach figures/vergleich_ländlich_städtisch gespeichert
+plots = PlotExecutor(os.path.join(FIGURE_DIR, 'vergleich_ländlich_städtisch'))
+plots.submit('verteilungen_nach_kategorie', plot_category_boxplots, df_filtered,
+             columns=columns_of_interest[:-1])  # 'Kategorie' ausschließen
+plots.run()
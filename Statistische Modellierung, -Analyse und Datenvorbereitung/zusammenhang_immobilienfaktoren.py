@@ -1,3 +1,5 @@
+import os
+
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -8,11 +10,15 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 from scipy.stats import pearsonr
 
+from ausstattungsmerkmale import FEATURE_PREFIX, add_amenity_features
+from listing_schema import read_listings
+from plot_executor import FIGURE_DIR, PlotExecutor
+from stage_cache import StageCache
+
 # Untersuchung: Zusammenhang zwischen den Immobilienfaktoren, speziell mit Hinblick auf den Preis
 # Daten laden und bereinigen
 def load_and_clean_data(filepath):
-    data = pd.read_csv(filepath)
-    pd.set_option('display.max_columns', None)
+    data = read_listings(filepath)
 
     # Konvertieren von Spalten in numerische Werte
     for col in ['rooms', 'bedrooms', 'bathrooms']:
@@ -27,11 +33,17 @@ def load_and_clean_data(filepath):
     return data
 
 
-# Entfernen von Zeilen mit fehlenden Werten
+# Ergänzung der Ausstattungsmerkmale (Keller, Gäste-WC, ...) als 0/1-Spalten
+def add_amenities(data, min_count=50):
+    return add_amenity_features(data, min_count=min_count)[0]
+
+
+# Entfernen von Zeilen mit fehlenden Werten; vorhandene Ausstattungsmerkmale werden mitgeführt
 def filter_data(data):
     numerical_cols = ['living_space', 'bedrooms', 'bathrooms', 'buyer_commission',
                       'property_area', 'price', 'rooms', 'usable_area']
-    data_filtered = data[numerical_cols].dropna()
+    amenity_cols = [col for col in data.columns if col.startswith(FEATURE_PREFIX)]
+    data_filtered = data[numerical_cols + amenity_cols].dropna(subset=numerical_cols)
 
     return data_filtered
 
@@ -71,11 +83,23 @@ def plot_correlation_matrix(data, columns_for_correlation, german_column_names):
     plt.title('Korrelationsmatrix der Immobilienmerkmale (logarithmierte Werte)', fontsize=24)
     plt.xticks(fontsize=16, rotation=45, ha='right')
     plt.yticks(fontsize=16, rotation=0)
-    plt.show()
+
+
+# Vorhergesagter gegen tatsächlichen Preis des Random Forest
+def plot_random_forest(results):
+    plt.figure(figsize=(10, 10))
+    plt.scatter(results['actual'], results['predicted'], color='blue', label='Predicted vs Actual', alpha=0.5)
+    plt.plot([min(results['actual']), max(results['actual'])], [min(results['actual']), max(results['actual'])],
+             color='red', linewidth=2)
+    plt.xlabel('Tatsächlicher Preis')
+    plt.ylabel('Vorhergesagter Preis')
+    plt.title('Random Forest - Komplexes Modell')
+    plt.legend()
+    plt.grid(True)
 
 
 # Random Forest Modell
-def random_forest_model(data, features, target):
+def random_forest_model(data, features, target, plots=None):
     X = data[features].replace([np.inf, -np.inf], np.nan).dropna()
     y = data[target].loc[X.index]
 
@@ -91,21 +115,30 @@ def random_forest_model(data, features, target):
 
     feature_importances = pd.DataFrame(model.feature_importances_, X.columns, columns=['Importance'])
 
+    # Ein hier angelegter Executor wird selbst ausgeführt, damit das Diagramm nicht verloren geht
+    local_plots = plots is None
+    plots = plots or PlotExecutor()
+    plots.submit('random_forest', plot_random_forest, pd.DataFrame({'actual': y_test, 'predicted': y_pred}))
+    if local_plots:
+        plots.run()
+
+    return mse, r2, feature_importances
+
+
+# Tatsächliche und vorhergesagte Werte der linearen Regression über einem Merkmal
+def plot_linear_regression(results, feature, target):
     plt.figure(figsize=(10, 10))
-    plt.scatter(y_test, y_pred, color='blue', label='Predicted vs Actual', alpha=0.5)
-    plt.plot([min(y_test), max(y_test)], [min(y_test), max(y_test)], color='red', linewidth=2)
-    plt.xlabel('Tatsächlicher Preis')
-    plt.ylabel('Vorhergesagter Preis')
-    plt.title('Random Forest - Komplexes Modell')
+    plt.scatter(results[feature], results['actual'], color='blue', label='Actual')
+    plt.scatter(results[feature], results['predicted'], color='red', label='Predicted', alpha=0.5)
+    plt.xlabel(feature)
+    plt.ylabel(target)
+    plt.title(f'Lineare Regression - {feature}')
     plt.legend()
     plt.grid(True)
-    plt.show()
-
-    return mse, r2, feature_importances
 
 
 # Lineares Regressionsmodell
-def linear_regression_model(data, feature, target):
+def linear_regression_model(data, feature, target, plots=None):
     X = data[[feature]].fillna(data[feature].median())
     y = data[target].fillna(data[target].median())
 
@@ -119,15 +152,12 @@ def linear_regression_model(data, feature, target):
     mse = mean_squared_error(y_test, y_pred)
     r2 = r2_score(y_test, y_pred)
 
-    plt.figure(figsize=(10, 10))
-    plt.scatter(X_test, y_test, color='blue', label='Actual')
-    plt.scatter(X_test, y_pred, color='red', label='Predicted', alpha=0.5)
-    plt.xlabel(feature)
-    plt.ylabel(target)
-    plt.title(f'Lineare Regression - {feature}')
-    plt.legend()
-    plt.grid(True)
-    plt.show()
+    local_plots = plots is None
+    plots = plots or PlotExecutor()
+    results = pd.DataFrame({feature: X_test[feature], 'actual': y_test, 'predicted': y_pred})
+    plots.submit(f'regression_{feature}', plot_linear_regression, results, feature=feature, target=target)
+    if local_plots:
+        plots.run()
 
     return mse, r2, model
 
@@ -135,10 +165,15 @@ def linear_regression_model(data, feature, target):
 # Hauptprogramm
 def main():
     filepath = '../../../../../Desktop/Cleaned_HAUS_Properties.csv'
-    data = load_and_clean_data(filepath)
-
-    data_filtered = filter_data(data)
-    data_filtered = logarithmic_transformation(data_filtered)
+    pd.set_option('display.max_columns', None)
+    # Laden, Ausstattungsmerkmale, Filter und Log-Transformation werden zwischengespeichert und nur bei
+    # geänderter Eingabedatei oder geändertem Code neu berechnet
+    data_filtered = (StageCache().source(filepath, load_and_clean_data)
+                     .then('add_amenities', add_amenities, min_count=50)
+                     .then('filter_data', filter_data)
+                     .then('logarithmic_transformation', logarithmic_transformation)
+                     .frame())
+    amenity_features = [col for col in data_filtered.columns if col.startswith(FEATURE_PREFIX)]
 
     columns_for_correlation = ['log_living_space', 'log_bedrooms', 'log_bathrooms',
                                'log_buyer_commission', 'log_property_area', 'log_price',
@@ -146,17 +181,21 @@ def main():
     german_column_names = ['Wohnfläche', 'Schlafzimmer', 'Badezimmer', 'Käuferprovision',
                            'Grundstücksfläche', 'Preis', 'Zimmer', 'Nutzungsfläche']
 
-    plot_correlation_matrix(data_filtered, columns_for_correlation, german_column_names)
+    # Mit PLOTS_HEADLESS=1 werden die Diagramme parallel nach figures/zusammenhang_immobilienfaktoren gespeichert
+    plots = PlotExecutor(os.path.join(FIGURE_DIR, 'zusammenhang_immobilienfaktoren'))
+    plots.submit('korrelationsmatrix', plot_correlation_matrix, data_filtered[columns_for_correlation],
+                 columns_for_correlation=columns_for_correlation, german_column_names=german_column_names)
 
     features = ['log_living_space', 'log_bedrooms', 'log_bathrooms', 'log_garage_parking',
                 'log_buyer_commission', 'log_property_area', 'log_rooms', 'log_usable_area']
 
     for feature in features:
         if feature in data_filtered.columns:
-            linear_regression_model(data_filtered, feature, 'log_price')
+            linear_regression_model(data_filtered, feature, 'log_price', plots)
 
-    available_features = [feature for feature in features if feature in data_filtered.columns]
-    mse, r2, feature_importances = random_forest_model(data_filtered, available_features, 'log_price')
+    available_features = [feature for feature in features if feature in data_filtered.columns] + amenity_features
+    mse, r2, feature_importances = random_forest_model(data_filtered, available_features, 'log_price', plots)
+    plots.run()
 
     print("\nFeature Importances des RandomForest-Regressors:\n", feature_importances)
 
@@ -0,0 +1,77 @@
+"""
+Vergleicht die Latenz pro Exposé zwischen extract_details (ein WebDriver-Aufruf pro Feld)
+und extract_details_batched (ein einziger execute_script-Aufruf).
+
+Als Eingabe dient ein Verzeichnis mit gespeicherten Exposé-Seiten (*.html). Ist das
+Verzeichnis nicht vorhanden, werden die generierten Seiten des Fixture-Servers verwendet.
+Beide Extraktoren laufen auf derselben geladenen Seite, sodass nur die Extraktion selbst
+gemessen wird; zusätzlich wird geprüft, dass beide identische Datensätze liefern.
+"""
+
+import os
+import statistics
+import time
+from urllib.request import pathname2url
+
+from websraping_immoscout24 import create_driver, extract_details, extract_details_batched
+from fixture_server import start_fixture_server, stop_fixture_server
+
+
+# Funktion zur Zeitmessung eines Extraktors auf der aktuell geladenen Seite
+def time_extractor(extract, driver, repetitions):
+    durations = []
+    details = None
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        details = extract(driver)
+        durations.append(time.perf_counter() - start)
+    return durations, details
+
+
+# Funktion zur Durchführung des Benchmarks über eine Liste von Exposé-URLs
+def run_benchmark(driver, urls, repetitions=5):
+    results = {'extract_details': [], 'extract_details_batched': []}
+    mismatches = []
+
+    for url in urls:
+        driver.get(url)
+        sequential_durations, sequential_details = time_extractor(extract_details, driver, repetitions)
+        batched_durations, batched_details = time_extractor(extract_details_batched, driver, repetitions)
+        results['extract_details'].extend(sequential_durations)
+        results['extract_details_batched'].extend(batched_durations)
+        if sequential_details != batched_details:
+            mismatches.append(url)
+
+    print(f"\nExposés: {len(urls)}, Wiederholungen pro Exposé: {repetitions}")
+    for name, durations in results.items():
+        print(f"{name}: Mittelwert {statistics.mean(durations) * 1000:.1f} ms, "
+              f"Median {statistics.median(durations) * 1000:.1f} ms pro Exposé")
+    speedup = statistics.median(results['extract_details']) / statistics.median(results['extract_details_batched'])
+    print(f"Beschleunigung (Median): {speedup:.1f}x")
+    if mismatches:
+        print(f"Abweichende Ergebnisse bei {len(mismatches)} Exposés: {mismatches}")
+    return results, mismatches
+
+
+# Hauptprogramm
+def main():
+    html_dir = './saved_exposes'
+    driver = create_driver()
+    server = None
+    try:
+        if os.path.isdir(html_dir):
+            urls = ['file:' + pathname2url(os.path.abspath(os.path.join(html_dir, name)))
+                    for name in sorted(os.listdir(html_dir)) if name.endswith('.html')]
+        else:
+            print(f"{html_dir} not found, using fixture server pages.")
+            server = start_fixture_server()
+            urls = [f"{server.base_url}/expose/{server.site.exp_id('berlin', 1, position)}" for position in range(20)]
+        run_benchmark(driver, urls)
+    finally:
+        driver.quit()
+        if server:
+            stop_fixture_server(server)
+
+
+if __name__ == '__main__':
+    main()
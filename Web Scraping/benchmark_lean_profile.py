@@ -0,0 +1,72 @@
+"""
+Misst übertragene Bytes und Latenz bis zur Auswertbarkeit einer Exposé-Seite mit und ohne
+schlanke Browser-Konfiguration (Ressourcen-Blockierung und eager Page-Load-Strategie).
+
+Die Messung läuft gegen den lokalen Fixture-Server, der zu jeder Exposé-Seite Galeriebilder,
+Kartenkacheln, eine Webschrift und ein Tracking-Skript ausliefert. Die übertragenen Bytes
+werden serverseitig gezählt, die Latenz reicht vom Aufruf von driver.get bis zur sichtbaren
+Detailsektion (wait_for_details).
+"""
+
+import statistics
+import time
+
+from fixture_server import FixtureSite, start_fixture_server, stop_fixture_server, reset_server_stats
+from websraping_immoscout24 import create_driver, wait_for_details
+
+# Zu vergleichende Browser-Profile
+PROFILES = {
+    'full': {'block_resources': False, 'page_load_strategy': 'normal'},
+    'lean': {'block_resources': True, 'page_load_strategy': 'eager'},
+}
+
+
+# Funktion zur Messung eines Browser-Profils über eine Liste von Exposé-URLs
+def measure_profile(server, urls, driver_options):
+    driver = create_driver(driver_options=driver_options)
+    latencies = []
+    transferred = []
+    try:
+        for url in urls:
+            # Cache leeren, damit jede Seite ihre Ressourcen erneut anfordert
+            driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+            reset_server_stats(server)
+            start = time.perf_counter()
+            driver.get(url)
+            wait_for_details(driver)
+            latencies.append(time.perf_counter() - start)
+            # Kurz warten, damit noch laufende Anfragen in die Bytezählung eingehen
+            time.sleep(0.5)
+            transferred.append(reset_server_stats(server)['bytes_sent'])
+    finally:
+        driver.quit()
+    return latencies, transferred
+
+
+# Hauptprogramm
+def main(num_exposes=20):
+    server = start_fixture_server(FixtureSite())
+    try:
+        urls = [f"{server.base_url}/expose/{server.site.exp_id('berlin', 1, position)}"
+                for position in range(num_exposes)]
+        results = {}
+        for name, driver_options in PROFILES.items():
+            latencies, transferred = measure_profile(server, urls, {**driver_options, 'headless': True})
+            results[name] = (latencies, transferred)
+            print(f"{name}: {statistics.mean(transferred) / 1024:.1f} KiB pro Exposé, "
+                  f"Latenz Median {statistics.median(latencies) * 1000:.1f} ms, "
+                  f"Mittelwert {statistics.mean(latencies) * 1000:.1f} ms")
+
+        full_bytes = statistics.mean(results['full'][1])
+        lean_bytes = statistics.mean(results['lean'][1])
+        full_latency = statistics.median(results['full'][0])
+        lean_latency = statistics.median(results['lean'][0])
+        print(f"Einsparung: {(1 - lean_bytes / full_bytes):.0%} der Bytes, "
+              f"{(1 - lean_latency / full_latency):.0%} der Latenz (Median)")
+        return results
+    finally:
+        stop_fixture_server(server)
+
+
+if __name__ == '__main__':
+    main()
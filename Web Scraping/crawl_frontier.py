@@ -0,0 +1,167 @@
+"""
+Persistente Crawl-Frontier auf Basis von SQLite.
+
+Die Frontier merkt sich über Programmläufe hinweg, welche Ergebnisseiten und Exposés
+bereits erledigt, fehlgeschlagen oder noch offen sind. Exposés werden über ihre
+data-exp-id identifiziert; der Primärschlüssel sorgt dafür, dass gruppierte Angebote,
+die auf mehreren Seiten oder in mehreren Bundesländern auftauchen, nur einmal
+besucht werden. Mehrere Prozesse können dieselbe Datenbankdatei gleichzeitig nutzen.
+
+Statuswerte: 'pending', 'in_progress', 'done', 'failed'.
+"""
+
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    property_kind TEXT NOT NULL,
+    location TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (property_kind, location, page)
+);
+CREATE TABLE IF NOT EXISTS exposes (
+    exp_id TEXT PRIMARY KEY,
+    link TEXT NOT NULL,
+    property_kind TEXT NOT NULL,
+    location TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS exposes_page ON exposes (property_kind, location, page, status);
+"""
+
+
+class CrawlFrontier:
+    """
+    Zugriff auf die Frontier-Datenbank.
+
+    Args:
+        db_path (str): Pfad zur SQLite-Datei.
+        max_attempts (int): Anzahl der Versuche, nach denen ein fehlgeschlagenes Exposé
+            nicht mehr erneut vergeben wird.
+    """
+
+    def __init__(self, db_path='crawl_frontier.sqlite3', max_attempts=3):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.connection = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    # Funktion zum Zurücksetzen von Exposés, die bei einem Abbruch in Bearbeitung waren
+    def reset_in_progress(self):
+        cursor = self.connection.execute(
+            "UPDATE exposes SET status = 'pending', updated_at = ? WHERE status = 'in_progress'", (time.time(),))
+        if cursor.rowcount:
+            print(f"Reset {cursor.rowcount} interrupted exposés to pending.")
+        return cursor.rowcount
+
+    def page_status(self, location, page, property_kind='haus-kaufen'):
+        row = self.connection.execute(
+            "SELECT status FROM pages WHERE property_kind = ? AND location = ? AND page = ?",
+            (property_kind, location, page)).fetchone()
+        return row[0] if row else None
+
+    def mark_page(self, location, page, status, property_kind='haus-kaufen'):
+        self.connection.execute(
+            "INSERT INTO pages (property_kind, location, page, status, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (property_kind, location, page) "
+            "DO UPDATE SET status = excluded.status, updated_at = excluded.updated_at",
+            (property_kind, location, page, status, time.time()))
+
+    # Funktion zur Vergabe der noch offenen Exposés einer Ergebnisseite
+    def claim_exposes(self, listings, location, page, property_kind='haus-kaufen'):
+        """
+        Trägt die gefundenen Exposés ein und reserviert diejenigen, die noch nicht erledigt
+        sind und gerade von keinem anderen Prozess bearbeitet werden.
+
+        Args:
+            listings (list): Liste von (exp_id, link)-Tupeln einer Ergebnisseite.
+            location (str): Bundesland der Ergebnisseite.
+            page (int): Seitennummer.
+            property_kind (str): Suchkategorie, z.B. 'haus-kaufen' oder 'wohnung-kaufen'.
+
+        Returns:
+            list: Die reservierten (exp_id, link)-Tupel, die besucht werden sollen.
+        """
+        now = time.time()
+        claimed = []
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO exposes (exp_id, link, property_kind, location, page, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, 'pending', ?)",
+                [(exp_id, link, property_kind, location, page, now) for exp_id, link in listings])
+            for exp_id, link in listings:
+                cursor = self.connection.execute(
+                    "UPDATE exposes SET status = 'in_progress', property_kind = ?, location = ?, page = ?, "
+                    "attempts = attempts + 1, updated_at = ? "
+                    "WHERE exp_id = ? AND (status = 'pending' OR (status = 'failed' AND attempts < ?))",
+                    (property_kind, location, page, now, exp_id, self.max_attempts))
+                if cursor.rowcount:
+                    claimed.append((exp_id, link))
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+
+        skipped = len(listings) - len(claimed)
+        if skipped:
+            print(f"Skipping {skipped} exposés already done or in progress.")
+        return claimed
+
+    def mark_expose(self, exp_id, status):
+        self.connection.execute(
+            "UPDATE exposes SET status = ?, updated_at = ? WHERE exp_id = ?", (status, time.time(), exp_id))
+
+    # Funktion zur Freigabe der reservierten Exposés einer Seite, deren Bearbeitung abgebrochen wurde
+    def release_page(self, location, page, property_kind='haus-kaufen'):
+        cursor = self.connection.execute(
+            "UPDATE exposes SET status = 'pending', updated_at = ? "
+            "WHERE property_kind = ? AND location = ? AND page = ? AND status = 'in_progress'",
+            (time.time(), property_kind, location, page))
+        return cursor.rowcount
+
+    # Funktion zum Abschließen einer Seite, nachdem ihre Datensätze gespeichert wurden
+    def complete_page(self, location, page, exp_ids=(), property_kind='haus-kaufen'):
+        """
+        Markiert die Exposés mit gespeicherten Datensätzen und die Seite als erledigt. Noch
+        reservierte Exposés der Seite ohne Datensatz gelten als fehlgeschlagen und werden bei
+        einem späteren Lauf erneut vergeben.
+
+        Args:
+            location (str): Bundesland der Ergebnisseite.
+            page (int): Seitennummer.
+            exp_ids (list): Exposé-IDs der gespeicherten Datensätze.
+            property_kind (str): Suchkategorie.
+        """
+        now = time.time()
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.executemany(
+                "UPDATE exposes SET status = 'done', updated_at = ? "
+                "WHERE exp_id = ? AND property_kind = ? AND location = ? AND page = ? AND status = 'in_progress'",
+                [(now, exp_id, property_kind, location, page) for exp_id in exp_ids])
+            self.connection.execute(
+                "UPDATE exposes SET status = 'failed', updated_at = ? "
+                "WHERE property_kind = ? AND location = ? AND page = ? AND status = 'in_progress'",
+                (now, property_kind, location, page))
+            self.mark_page(location, page, 'done', property_kind)
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+
+    def summary(self):
+        pages = dict(self.connection.execute("SELECT status, COUNT(*) FROM pages GROUP BY status").fetchall())
+        exposes = dict(self.connection.execute("SELECT status, COUNT(*) FROM exposes GROUP BY status").fetchall())
+        return {'pages': pages, 'exposes': exposes}
+
+    def close(self):
+        self.connection.close()
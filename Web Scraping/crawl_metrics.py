@@ -0,0 +1,188 @@
+"""
+Metriken für den Hot Path des Scrapers.
+
+CrawlMetrics misst die Dauer der einzelnen Phasen (CAPTCHA, Seitenanzahl, Expandieren,
+Link-Sammlung, Exposé-Laden, Feldextraktion), zählt Timeouts, Wiederholungsversuche und
+"nil"-Felder je Feld und berechnet den gleitenden Durchsatz in Exposés pro Minute.
+Jede Phase wird als Zeile in ein JSON-Lines-Protokoll geschrieben; flush() schreibt
+zusätzlich eine Textdatei im Prometheus-Format (z.B. für den Textfile-Collector des
+node_exporters). Ein steigender Anteil von "nil" bei einem Feld deutet auf einen
+veralteten Selektor hin.
+
+Ohne Pfade werden die Metriken nur im Speicher gesammelt.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Phasen des Hot Paths in der Reihenfolge eines Seitenaufrufs
+PHASES = ['captcha', 'pagination', 'expansion', 'link_collection', 'expose_load', 'extraction']
+
+METRIC_PREFIX = 'is24_scraper'
+
+
+class CrawlMetrics:
+    """
+    Args:
+        log_path (str, optional): JSON-Lines-Datei für Phasen- und Zählerereignisse.
+        prometheus_path (str, optional): Textdatei im Prometheus-Format, die bei flush()
+            atomar ersetzt wird.
+        labels (dict, optional): Konstante Labels aller Metriken (z.B. {'worker': '1'}).
+        throughput_window (float): Zeitfenster des gleitenden Durchsatzes in Sekunden.
+        flush_every (float): Mindestabstand zwischen zwei automatischen flush()-Aufrufen.
+    """
+
+    def __init__(self, log_path=None, prometheus_path=None, labels=None, throughput_window=300.0, flush_every=30.0):
+        self.log_path = log_path
+        self.prometheus_path = prometheus_path
+        self.labels = dict(labels or {})
+        self.throughput_window = throughput_window
+        self.flush_every = flush_every
+        self.lock = threading.Lock()
+        self.phase_seconds = {phase: 0.0 for phase in PHASES}
+        self.phase_counts = {phase: 0 for phase in PHASES}
+        self.timeouts = {}
+        self.retries = 0
+        self.nil_fields = {}
+        self.listings = 0
+        self.listing_times = deque()
+        self.last_flush = time.monotonic()
+
+    # Funktion zum Messen einer Phase als Kontextmanager
+    @contextmanager
+    def phase(self, name, **context):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self.lock:
+                self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + seconds
+                self.phase_counts[name] = self.phase_counts.get(name, 0) + 1
+            self._log({'event': 'phase', 'phase': name, 'seconds': round(seconds, 4), **context})
+
+    # Funktion zum Zählen eines Timeouts einer bestimmten Art (z.B. 'page_load', 'details')
+    def timeout(self, kind, **context):
+        with self.lock:
+            self.timeouts[kind] = self.timeouts.get(kind, 0) + 1
+        self._log({'event': 'timeout', 'kind': kind, **context})
+
+    # Funktion zum Zählen eines Wiederholungsversuchs
+    def retry(self, **context):
+        with self.lock:
+            self.retries += 1
+        self._log({'event': 'retry', **context})
+
+    # Funktion zur Erfassung eines extrahierten Datensatzes (Durchsatz und "nil"-Felder)
+    def record(self, details, **context):
+        nil_fields = [field for field, value in details.items() if value == "nil"]
+        now = time.monotonic()
+        with self.lock:
+            self.listings += 1
+            self.listing_times.append(now)
+            for field in nil_fields:
+                self.nil_fields[field] = self.nil_fields.get(field, 0) + 1
+        if nil_fields:
+            self._log({'event': 'nil_fields', 'fields': nil_fields, **context})
+        self._maybe_flush()
+
+    # Funktion zur Berechnung der Exposés pro Minute im gleitenden Zeitfenster
+    def listings_per_minute(self):
+        now = time.monotonic()
+        with self.lock:
+            while self.listing_times and self.listing_times[0] < now - self.throughput_window:
+                self.listing_times.popleft()
+            count = len(self.listing_times)
+        return count * 60.0 / self.throughput_window
+
+    def snapshot(self):
+        listings_per_minute = self.listings_per_minute()
+        with self.lock:
+            return {
+                'phase_seconds': {phase: round(seconds, 3) for phase, seconds in self.phase_seconds.items()},
+                'phase_counts': dict(self.phase_counts),
+                'timeouts': dict(self.timeouts),
+                'retries': self.retries,
+                'nil_fields': dict(self.nil_fields),
+                'listings': self.listings,
+                'listings_per_minute': round(listings_per_minute, 2),
+            }
+
+    def _log(self, event):
+        if not self.log_path:
+            return
+        event = {'time': round(time.time(), 3), **self.labels, **event}
+        line = (json.dumps(event, ensure_ascii=False) + "\n").encode('utf-8')
+        # Ein einzelner Schreibaufruf im Append-Modus, damit mehrere Prozesse dieselbe Datei nutzen können
+        descriptor = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(descriptor, line)
+        finally:
+            os.close(descriptor)
+
+    def _maybe_flush(self):
+        if time.monotonic() - self.last_flush >= self.flush_every:
+            self.flush()
+
+    # Funktion zum Schreiben der Prometheus-Datei und eines Schnappschusses ins Protokoll
+    def flush(self):
+        self.last_flush = time.monotonic()
+        snapshot = self.snapshot()
+        self._log({'event': 'snapshot', **snapshot})
+        if not self.prometheus_path:
+            return snapshot
+        temp_path = f'{self.prometheus_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(format_prometheus(snapshot, self.labels))
+        os.replace(temp_path, self.prometheus_path)
+        return snapshot
+
+
+# Funktion zur Formatierung eines Label-Satzes im Prometheus-Format
+def format_labels(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+# Funktion zur Umwandlung eines Schnappschusses in das Prometheus-Textformat
+def format_prometheus(snapshot, labels=None):
+    labels = labels or {}
+    lines = []
+
+    def metric(name, metric_type, help_text, samples):
+        lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name} {metric_type}")
+        for sample_labels, value in samples:
+            lines.append(f"{METRIC_PREFIX}_{name}{format_labels({**labels, **sample_labels})} {value}")
+
+    metric('phase_seconds_total', 'counter', "Time spent per scraper phase.",
+           [({'phase': phase}, seconds) for phase, seconds in snapshot['phase_seconds'].items()])
+    metric('phase_runs_total', 'counter', "Number of runs per scraper phase.",
+           [({'phase': phase}, count) for phase, count in snapshot['phase_counts'].items()])
+    metric('timeouts_total', 'counter', "Timeouts by kind.",
+           [({'kind': kind}, count) for kind, count in snapshot['timeouts'].items()])
+    metric('retries_total', 'counter', "Retried result pages.", [({}, snapshot['retries'])])
+    metric('nil_fields_total', 'counter', "Extracted fields that fell back to nil.",
+           [({'field': field}, count) for field, count in snapshot['nil_fields'].items()])
+    metric('listings_total', 'counter', "Extracted exposés.", [({}, snapshot['listings'])])
+    metric('listings_per_minute', 'gauge', "Rolling throughput in exposés per minute.",
+           [({}, snapshot['listings_per_minute'])])
+    return "\n".join(lines) + "\n"
+
+
+# Funktion zur Erstellung der Metriken einer Sitzung; alle Sitzungen teilen sich das Protokoll
+def metrics_for(metrics_dir, session):
+    if not metrics_dir:
+        return CrawlMetrics(labels={'session': session})
+    os.makedirs(metrics_dir, exist_ok=True)
+    return CrawlMetrics(os.path.join(metrics_dir, 'crawl_metrics.jsonl'),
+                        os.path.join(metrics_dir, f'{session}.prom'), labels={'session': session})
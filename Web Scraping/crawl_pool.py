@@ -0,0 +1,245 @@
+"""
+Paralleler Crawl-Pool für ImmobilienScout24.
+
+Statt einer einzigen Chrome-Sitzung, die alle Bundesländer nacheinander abarbeitet,
+starten hier mehrere Worker-Prozesse mit jeweils eigener WebDriver-Sitzung. Die Worker
+holen sich Arbeitspakete (Bundesland, Seite) aus einer gemeinsamen Queue, behandeln
+CAPTCHAs und Wiederholungsversuche selbstständig und melden die extrahierten
+Datensätze an den Hauptprozess. Dieser schreibt die Seiten über eine geordnete Senke
+in derselben Reihenfolge wie das sequentielle Hauptprogramm.
+
+Für lokale Tests kann als base_url die Adresse des Fixture-Servers übergeben werden:
+
+    from fixture_server import start_fixture_server
+    server = start_fixture_server()
+    run_crawl_pool(['berlin', 'bremen'], num_workers=2, base_url=server.base_url, captcha_timeout=1)
+"""
+
+import multiprocessing as mp
+import queue
+from functools import partial
+
+from selenium.common.exceptions import WebDriverException
+
+from crawl_frontier import CrawlFrontier
+from crawl_metrics import metrics_for
+from html_archive import HtmlArchive
+from rate_limiter import limiter_for
+from record_sink import StreamingRecordSink
+from wait_conditions import PageTimer
+from websraping_immoscout24 import (BASE_URL, create_driver, get_url, open_page, get_total_pages, scrape_result_page,
+                                    save_data_to_csv, locations)
+
+
+class OrderedSink:
+    """
+    Puffert Ergebnisseiten, die in beliebiger Reihenfolge eintreffen, und gibt sie in der
+    Reihenfolge (Bundesland, Seite) an die Schreibfunktion weiter.
+
+    Args:
+        locations (list): Bundesländer in der gewünschten Ausgabereihenfolge.
+        start_page (int): Erste Seite jedes Bundeslandes.
+        write_page (callable): Schreibfunktion mit der Signatur (records, location, page).
+        on_page_done (callable, optional): Wird nach jeder freigegebenen Seite mit
+            (location, page, exp_ids) aufgerufen, auch wenn die Seite leer war; exp_ids sind die
+            Exposé-IDs der geschriebenen Datensätze.
+    """
+
+    def __init__(self, locations, start_page=1, write_page=save_data_to_csv, on_page_done=None):
+        self.locations = list(locations)
+        self.start_page = start_page
+        self.write_page = write_page
+        self.on_page_done = on_page_done
+        self.total_pages = {}
+        self.buffer = {}
+        self.location_index = 0
+        self.next_page = start_page
+
+    def set_total_pages(self, location, total_pages):
+        self.total_pages[location] = total_pages
+        self._flush()
+
+    def add(self, location, page, records, exp_ids=()):
+        self.buffer[(location, page)] = (records, exp_ids)
+        self._flush()
+
+    def _flush(self):
+        while self.location_index < len(self.locations):
+            location = self.locations[self.location_index]
+            total_pages = self.total_pages.get(location)
+            if total_pages is not None and self.next_page > total_pages:
+                self.location_index += 1
+                self.next_page = self.start_page
+                continue
+
+            key = (location, self.next_page)
+            if key not in self.buffer:
+                return
+            records, exp_ids = self.buffer.pop(key)
+            # Leere oder fehlgeschlagene Seiten werden übersprungen
+            if records:
+                self.write_page(records, location, self.next_page)
+            if records is not None and self.on_page_done:
+                self.on_page_done(location, self.next_page, exp_ids)
+            self.next_page += 1
+
+    @property
+    def done(self):
+        return self.location_index >= len(self.locations)
+
+
+# Funktion zur Abarbeitung der Arbeitspakete in einem eigenen Prozess mit eigener WebDriver-Sitzung
+def crawl_worker(worker_id, work_queue, result_queue, base_url, max_retries, captcha_timeout, driver_path,
+                 frontier_path=None, property_kind='haus-kaufen', driver_options=None, archive_dir=None,
+                 rate_limiter=None, metrics_dir=None):
+    driver = create_driver(driver_path, driver_options)
+    metrics = metrics_for(metrics_dir, f'worker-{worker_id}')
+    frontier = CrawlFrontier(frontier_path) if frontier_path else None
+    archive = HtmlArchive(archive_dir) if archive_dir else None
+    captcha_handled = False
+    retry_state = {}
+
+    try:
+        while True:
+            item = work_queue.get()
+            if item is None:
+                break
+
+            location, page, discover_pages = item
+            url = get_url(location, page, base_url, property_kind)
+            while True:
+                try:
+                    print(f"[worker {worker_id}] Accessing {location} page {page}...")
+                    timer = PageTimer(location, page)
+                    # Das erste CAPTCHA der Sitzung wird erwartet, spätere werden beim Auftreten gelöst
+                    open_page(driver, url, rate_limiter, expect_captcha=not captcha_handled,
+                              captcha_timeout=captcha_timeout, timer=timer, metrics=metrics, location=location,
+                              page=page)
+                    captcha_handled = True
+
+                    total_pages = None
+                    exp_ids = []
+                    if discover_pages:
+                        with metrics.phase('pagination', location=location, page=page):
+                            total_pages = get_total_pages(driver, timer=timer)
+                    if total_pages is not None and page > total_pages:
+                        records = []
+                    elif frontier is not None and frontier.page_status(location, page, property_kind) == 'done':
+                        records = []
+                    else:
+                        records = scrape_result_page(driver, base_url, frontier=frontier, location=location, page=page,
+                                                     timer=timer, property_kind=property_kind, archive=archive,
+                                                     rate_limiter=rate_limiter, metrics=metrics, exp_ids=exp_ids)
+                    timer.print_report()
+                    metrics.flush()
+                    result_queue.put(('page', location, page, records, total_pages, exp_ids))
+                    retry_state.pop((location, page), None)
+                    break
+                except WebDriverException as e:
+                    attempts = retry_state.get((location, page), 0) + 1
+                    retry_state[(location, page)] = attempts
+                    print(f"[worker {worker_id}] Error on {location} page {page} (attempt {attempts}): {e}")
+                    metrics.retry(location=location, page=page, attempt=attempts)
+                    # Nach einem Fehler wird das CAPTCHA beim nächsten Aufruf erneut geprüft
+                    captcha_handled = False
+                    # Die bereits reservierten Exposés der Seite werden für den nächsten Versuch freigegeben
+                    if frontier is not None:
+                        frontier.release_page(location, page, property_kind)
+                    if attempts > max_retries:
+                        result_queue.put(('failed', location, page, None, 1 if discover_pages else None, ()))
+                        retry_state.pop((location, page), None)
+                        break
+    finally:
+        driver.quit()
+        metrics.flush()
+        if frontier is not None:
+            frontier.close()
+        result_queue.put(('exit', worker_id, None, None, None, ()))
+
+
+# Hauptprogramm des parallelen Crawls
+def run_crawl_pool(locations, num_workers=4, start_page=1, base_url=BASE_URL, max_retries=2,
+                   captcha_timeout=20, driver_path="./chromedriver/chromedriver", write_page=save_data_to_csv,
+                   frontier_path=None, property_kind='haus-kaufen', driver_options=None, archive_dir=None,
+                   rate_limits=None, metrics_dir=None):
+    context = mp.get_context('spawn')
+    # Ein gemeinsamer Limiter im geteilten Speicher taktet die Seitenaufrufe aller Worker
+    rate_limiter = limiter_for(base_url, rate_limits, context)
+    work_queue = context.Queue()
+    result_queue = context.Queue()
+
+    # Der Hauptprozess markiert Seiten erst als erledigt, nachdem sie geschrieben wurden
+    frontier = CrawlFrontier(frontier_path) if frontier_path else None
+    if frontier is not None:
+        frontier.reset_in_progress()
+    sink = OrderedSink(locations, start_page, partial(write_page, property_kind=property_kind),
+                       on_page_done=partial(frontier.complete_page, property_kind=property_kind)
+                       if frontier is not None else None)
+
+    # Die erste Seite jedes Bundeslandes ermittelt zusätzlich die Gesamtseitenanzahl
+    for location in locations:
+        work_queue.put((location, start_page, True))
+    outstanding = len(locations)
+
+    workers = [
+        context.Process(target=crawl_worker,
+                        args=(worker_id, work_queue, result_queue, base_url, max_retries, captcha_timeout, driver_path,
+                              frontier_path, property_kind, driver_options, archive_dir, rate_limiter,
+                              metrics_dir))
+        for worker_id in range(num_workers)
+    ]
+    for worker in workers:
+        worker.start()
+
+    failed_pages = []
+    running_workers = num_workers
+    while outstanding > 0 and running_workers > 0:
+        try:
+            kind, location, page, records, total_pages, exp_ids = result_queue.get(timeout=5)
+        except queue.Empty:
+            running_workers = sum(worker.is_alive() for worker in workers)
+            print(f"Rate limiter: {rate_limiter.state()}")
+            continue
+
+        if kind == 'exit':
+            running_workers -= 1
+            continue
+
+        if total_pages is not None:
+            for next_page in range(start_page + 1, total_pages + 1):
+                # Bereits erledigte Seiten werden nicht erneut vergeben
+                if frontier is not None and frontier.page_status(location, next_page, property_kind) == 'done':
+                    sink.add(location, next_page, [])
+                    continue
+                work_queue.put((location, next_page, False))
+                outstanding += 1
+            sink.set_total_pages(location, total_pages)
+
+        if kind == 'failed':
+            failed_pages.append((location, page))
+            if frontier is not None:
+                frontier.mark_page(location, page, 'failed', property_kind)
+        sink.add(location, page, records, exp_ids)
+        outstanding -= 1
+
+    for _ in workers:
+        work_queue.put(None)
+    for worker in workers:
+        worker.join()
+
+    print(f"Rate limiter: {rate_limiter.state()}")
+    if frontier is not None:
+        print(f"Frontier summary: {frontier.summary()}")
+        frontier.close()
+    if outstanding > 0:
+        raise RuntimeError(f"All workers exited with {outstanding} work items left.")
+    if failed_pages:
+        print(f"Failed pages after all retries: {failed_pages}")
+    print("Data collection complete.")
+    return failed_pages
+
+
+if __name__ == '__main__':
+    with StreamingRecordSink() as record_sink:
+        run_crawl_pool(locations, frontier_path='crawl_frontier.sqlite3', write_page=record_sink.write_page,
+                       metrics_dir='crawl_metrics')
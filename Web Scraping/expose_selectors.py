@@ -0,0 +1,28 @@
+"""
+CSS-Selektoren der Exposé-Seiten von ImmobilienScout24.
+
+Die Selektoren werden sowohl vom Selenium-Scraper als auch vom browserlosen
+Offline-Parser verwendet, damit beide Wege dieselben Felder liefern.
+"""
+
+# CSS-Selektoren der Exposé-Felder: Feldname -> (Selektor, Fallback-Selektor)
+DETAIL_SELECTORS = {
+    'title': ("h1[data-qa='expose-title']", None),
+    'price': ("div.is24qa-kaufpreis-main span", "span.is24-preis-value"),
+    'address': ("span[data-qa='is24-expose-address'] div.address-block", None),
+    'rooms': ("div.is24qa-zi-main", None),
+    'living_space': ("dd.is24qa-wohnflaeche-ca", None),
+    'property_area': ("dd.is24qa-grundstueck-ca", None),
+    'price_per_m2': ("dd.is24qa-preism²", None),
+    'type': ("dd.is24qa-typ", None),
+    'usable_area': ("dd.is24qa-nutzflaeche-ca", None),
+    'available_from': ("dd.is24qa-bezugsfrei-ab", None),
+    'bedrooms': ("dd.is24qa-schlafzimmer", None),
+    'bathrooms': ("dd.is24qa-badezimmer", None),
+    'garage_parking': ("dd.is24qa-garage-stellplatz", None),
+    'buyer_commission': ("dd.is24qa-provision", None),
+}
+CRITERIA_SELECTOR = "span[class^='is24qa']"
+
+# Festes Spaltenschema der Detaildatensätze (entspricht dem Kopf der bisherigen CSV-Dateien)
+RECORD_FIELDS = list(DETAIL_SELECTORS) + ['criteriagroup_boolean_listing']
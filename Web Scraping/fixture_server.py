@@ -0,0 +1,258 @@
+"""
+Lokaler Fixture-Server, der vorgefertigte Such- und Exposé-Seiten im Aufbau von
+ImmobilienScout24 ausliefert. Damit lassen sich die Scraper-Funktionen und der
+parallele Crawl-Pool ohne Zugriff auf die echte Plattform ausführen, indem als
+base_url die Adresse dieses Servers übergeben wird.
+"""
+
+import os
+import re
+import threading
+import zlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+SEARCH_PATH = re.compile(r'^/Suche/de/(?P<location>[^/]+)/(?P<kind>[^/]+)$')
+EXPOSE_PATH = re.compile(r'^/expose/(?P<exp_id>\d+)$')
+ASSET_PATH = re.compile(r'^/assets/(?P<name>[\w.-]+)$')
+
+# Größe und Content-Type der Ressourcen, die eine Exposé-Seite zusätzlich nachlädt
+ASSET_TYPES = {
+    '.jpg': ('image/jpeg', 150 * 1024),
+    '.png': ('image/png', 40 * 1024),
+    '.woff2': ('font/woff2', 60 * 1024),
+    '.js': ('application/javascript', 40 * 1024),
+}
+
+EXPOSE_ASSETS = """<style>
+@font-face {{ font-family: 'Fixture'; src: url('/assets/fixture-font.woff2') format('woff2'); }}
+body {{ font-family: 'Fixture', sans-serif; }}
+</style>
+<script src="/assets/tracking.js"></script>
+<div class="gallery">{images}</div>
+<div class="map">{tiles}</div>
+"""
+
+SEARCH_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{location} Seite {page}</title></head>
+<body>
+<div id="resultListItems">
+{listings}
+</div>
+<ul class="reactPagination">
+<li class="p-prev"><a href="?pagenumber={prev_page}">zurück</a></li>
+{pagination}
+<li class="p-next"><a href="?pagenumber={next_page}">weiter</a></li>
+</ul>
+<script>
+function expandGroup(button) {{
+  button.getAttribute('data-group').split(',').forEach(function (id) {{
+    var link = document.createElement('a');
+    link.setAttribute('data-exp-id', id);
+    link.setAttribute('data-exp-referrer', 'RESULT_LIST_GROUPED');
+    link.setAttribute('href', '/expose/' + id);
+    link.textContent = 'Gruppiertes Angebot ' + id;
+    button.parentNode.appendChild(link);
+  }});
+  button.remove();
+}}
+</script>
+</body></html>
+"""
+
+EXPOSE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+{assets}
+<div class="is24-ex-details">
+<h1 data-qa="expose-title">{title}</h1>
+<div class="is24qa-kaufpreis-main"><span>{price}</span></div>
+<span data-qa="is24-expose-address"><div class="address-block">{address}</div></span>
+<div class="is24qa-zi-main">{rooms}</div>
+<dl>
+<dd class="is24qa-wohnflaeche-ca">{living_space}</dd>
+<dd class="is24qa-grundstueck-ca">{property_area}</dd>
+<dd class="is24qa-preism²">{price_per_m2}</dd>
+<dd class="is24qa-typ">Einfamilienhaus (freistehend)</dd>
+<dd class="is24qa-bezugsfrei-ab">nach Vereinbarung</dd>
+<dd class="is24qa-schlafzimmer">{bedrooms}</dd>
+<dd class="is24qa-badezimmer">1</dd>
+<dd class="is24qa-garage-stellplatz">1 Garage</dd>
+<dd class="is24qa-provision">3,57 % inkl. MwSt.</dd>
+</dl>
+<div class="criteriagroup boolean-listing">
+<span class="is24qa-keller-label">Keller</span>
+<span class="is24qa-gaeste-wc-label">Gäste-WC</span>
+</div>
+</div>
+</body></html>
+"""
+
+
+class FixtureSite:
+    """
+    Erzeugt deterministische Such- und Exposé-Seiten.
+
+    Args:
+        total_pages (int): Anzahl der Ergebnisseiten pro Bundesland.
+        listings_per_page (int): Anzahl der direkt sichtbaren Angebote pro Seite.
+        grouped_per_page (int): Anzahl der Angebote, die erst nach Klick auf den
+            Expandieren-Button erscheinen.
+        fixture_dir (str, optional): Verzeichnis mit gespeicherten Seiten
+            (search/{location}_page_{n}.html, expose/{exp_id}.html), die Vorrang vor
+            den generierten Seiten haben.
+        images_per_expose (int): Anzahl der Galeriebilder pro generierter Exposé-Seite; bei 0
+            werden weder Bilder noch Schriften, Kartenkacheln oder Tracking-Skripte eingebunden.
+    """
+
+    def __init__(self, total_pages=3, listings_per_page=4, grouped_per_page=2, fixture_dir=None,
+                 images_per_expose=8):
+        self.total_pages = total_pages
+        self.listings_per_page = listings_per_page
+        self.grouped_per_page = grouped_per_page
+        self.fixture_dir = fixture_dir
+        self.images_per_expose = images_per_expose
+
+    # Funktion zur Vergabe einer eindeutigen Exposé-ID je Bundesland, Seite und Position
+    def exp_id(self, location, page, position):
+        return (zlib.crc32(location.encode('utf-8')) % 1000) * 10 ** 6 + page * 100 + position
+
+    def _saved_page(self, *parts):
+        if not self.fixture_dir:
+            return None
+        path = os.path.join(self.fixture_dir, *parts)
+        if os.path.isfile(path):
+            with open(path, encoding='utf-8') as file:
+                return file.read()
+        return None
+
+    def search_page(self, location, page):
+        saved = self._saved_page('search', f'{location}_page_{page}.html')
+        if saved is not None:
+            return saved
+
+        listings = []
+        for position in range(self.listings_per_page):
+            exp_id = self.exp_id(location, page, position)
+            listings.append(f'<a data-exp-id="{exp_id}" data-exp-referrer="RESULT_LIST_LISTING" '
+                            f'href="/expose/{exp_id}">Angebot {exp_id}</a>')
+        if self.grouped_per_page:
+            grouped_ids = [str(self.exp_id(location, page, self.listings_per_page + position))
+                           for position in range(self.grouped_per_page)]
+            listings.append(f'<div class="grouped-listing"><button class="padding-left-none link-text-secondary button" '
+                            f'data-group="{",".join(grouped_ids)}" onclick="expandGroup(this)">'
+                            f'Weitere Angebote anzeigen</button></div>')
+
+        pagination = "\n".join(f'<li><a href="?pagenumber={number}">{number}</a></li>'
+                               for number in range(1, self.total_pages + 1))
+        return SEARCH_TEMPLATE.format(location=location, page=page, listings="\n".join(listings),
+                                      pagination=pagination, prev_page=max(page - 1, 1),
+                                      next_page=min(page + 1, self.total_pages))
+
+    # Funktion zur Erzeugung einer Ressource mit der für ihren Typ typischen Größe
+    def asset(self, name):
+        extension = os.path.splitext(name)[1]
+        if extension not in ASSET_TYPES:
+            return None, None
+        content_type, size = ASSET_TYPES[extension]
+        if extension == '.js':
+            return content_type, ("/* tracking fixture */\n" + " " * size + "\nvoid 0;\n").encode('utf-8')
+        return content_type, bytes(size)
+
+    def expose_page(self, exp_id):
+        saved = self._saved_page('expose', f'{exp_id}.html')
+        if saved is not None:
+            return saved
+
+        living_space = 80 + exp_id % 120
+        price = 150000 + (exp_id % 997) * 1000
+        assets = ""
+        if self.images_per_expose:
+            assets = EXPOSE_ASSETS.format(
+                images="".join(f'<img src="/assets/photo-{exp_id}-{number}.jpg" width="640" height="480">'
+                               for number in range(self.images_per_expose)),
+                tiles="".join(f'<img src="/assets/map-tile-{exp_id}-{number}.png" width="256" height="256">'
+                              for number in range(4)))
+        return EXPOSE_TEMPLATE.format(
+            assets=assets,
+            title=f"Fixture-Haus {exp_id}",
+            price=f"{price:,} €".replace(',', '.'),
+            address=f"Musterstraße {exp_id % 100}, 10115 Berlin",
+            rooms=3 + exp_id % 4,
+            living_space=f"{living_space} m²",
+            property_area=f"{400 + exp_id % 600} m²",
+            price_per_m2=f"{price // living_space:,} €/m²".replace(',', '.'),
+            bedrooms=2 + exp_id % 3,
+        )
+
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        site = self.server.site
+        url = urlparse(self.path)
+
+        search_match = SEARCH_PATH.match(url.path)
+        expose_match = EXPOSE_PATH.match(url.path)
+        asset_match = ASSET_PATH.match(url.path)
+        content_type = 'text/html; charset=utf-8'
+        if search_match:
+            page = int(parse_qs(url.query).get('pagenumber', ['1'])[0])
+            payload = site.search_page(search_match.group('location'), page).encode('utf-8')
+        elif expose_match:
+            payload = site.expose_page(int(expose_match.group('exp_id'))).encode('utf-8')
+        elif asset_match:
+            content_type, payload = site.asset(asset_match.group('name'))
+        else:
+            payload = None
+
+        if payload is None:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        with self.server.stats_lock:
+            self.server.stats['requests'] += 1
+            self.server.stats['bytes_sent'] += len(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Funktion zum Starten des Fixture-Servers in einem Hintergrund-Thread
+def start_fixture_server(site=None, host='127.0.0.1', port=0):
+    server = ThreadingHTTPServer((host, port), FixtureRequestHandler)
+    server.site = site or FixtureSite()
+    server.stats = {'requests': 0, 'bytes_sent': 0}
+    server.stats_lock = threading.Lock()
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"Fixture server running at {server.base_url}")
+    return server
+
+
+# Funktion zum Auslesen und Zurücksetzen der Übertragungsstatistik
+def reset_server_stats(server):
+    with server.stats_lock:
+        stats = dict(server.stats)
+        server.stats['requests'] = 0
+        server.stats['bytes_sent'] = 0
+    return stats
+
+
+# Funktion zum Beenden des Fixture-Servers
+def stop_fixture_server(server):
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    fixture_server = start_fixture_server(port=8024)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stop_fixture_server(fixture_server)
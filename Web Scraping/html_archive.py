@@ -0,0 +1,82 @@
+"""
+Inhaltsadressiertes Archiv für das Roh-HTML der Exposé-Seiten.
+
+Jede Seite wird gzip-komprimiert unter ihrem SHA-256-Hash abgelegt
+(objects/ab/abcdef....html.gz), identische Seiten belegen also nur einmal Speicher.
+Eine JSON-Lines-Indexdatei ordnet jedem Abruf Exposé-ID, Link, Suchkategorie,
+Bundesland, Seite und Hash zu. Mehrere Prozesse können gleichzeitig in dasselbe Archiv
+schreiben, da Objekte atomar umbenannt und Indexzeilen mit einem einzigen Schreibaufruf
+angehängt werden.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import time
+
+
+class HtmlArchive:
+    """
+    Args:
+        archive_dir (str): Wurzelverzeichnis des Archivs.
+        compresslevel (int): gzip-Kompressionsstufe der Objekte.
+    """
+
+    def __init__(self, archive_dir='html_archive', compresslevel=6):
+        self.archive_dir = archive_dir
+        self.compresslevel = compresslevel
+        self.index_path = os.path.join(archive_dir, 'index.jsonl')
+        os.makedirs(os.path.join(archive_dir, 'objects'), exist_ok=True)
+
+    def object_path(self, digest):
+        return os.path.join(self.archive_dir, 'objects', digest[:2], f'{digest}.html.gz')
+
+    # Funktion zum Speichern einer Seite; liefert den Hash des Inhalts
+    def store(self, html, exp_id, link, property_kind, location, page):
+        content = html.encode('utf-8')
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.object_path(digest)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f'{path}.{os.getpid()}.tmp'
+            with open(temp_path, 'wb') as file:
+                file.write(gzip.compress(content, self.compresslevel))
+            os.replace(temp_path, path)
+
+        entry = {
+            'exp_id': exp_id,
+            'link': link,
+            'property_kind': property_kind,
+            'location': location,
+            'page': page,
+            'sha256': digest,
+            'fetched_at': time.time(),
+        }
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8')
+        descriptor = os.open(self.index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(descriptor, line)
+        finally:
+            os.close(descriptor)
+        return digest
+
+    def load(self, digest):
+        with open(self.object_path(digest), 'rb') as file:
+            return gzip.decompress(file.read()).decode('utf-8')
+
+    # Funktion zum Lesen des Index; pro Exposé wird nur der jüngste Abruf geliefert
+    def latest_entries(self):
+        latest = {}
+        if not os.path.exists(self.index_path):
+            return []
+        with open(self.index_path, encoding='utf-8') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                previous = latest.get(entry['exp_id'])
+                if previous is None or entry['fetched_at'] >= previous['fetched_at']:
+                    latest[entry['exp_id']] = entry
+        return list(latest.values())
@@ -0,0 +1,118 @@
+"""
+Browserloser Parser für das HTML-Archiv.
+
+Baut die Detaildatensätze aus den archivierten Exposé-Seiten neu auf, ohne die Seiten
+erneut abzurufen. Es werden dieselben Selektoren wie im Scraper verwendet
+(expose_selectors.py); über extra_selectors lassen sich zusätzliche Felder auslesen.
+Die Seiten werden parallel auf alle CPU-Kerne verteilt, sodass ein korrigierter
+Selektor oder ein neues Feld in Minuten statt durch einen mehrtägigen Crawl
+nachgezogen werden kann.
+"""
+
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+from expose_selectors import DETAIL_SELECTORS, CRITERIA_SELECTOR
+from html_archive import HtmlArchive
+
+# Block-Elemente, die in WebElement.text einen Zeilenumbruch erzeugen
+BLOCK_TAGS = {'address', 'article', 'blockquote', 'dd', 'div', 'dl', 'dt', 'footer', 'h1', 'h2', 'h3', 'h4',
+              'h5', 'h6', 'header', 'li', 'ol', 'p', 'section', 'table', 'tr', 'ul'}
+INVISIBLE_TAGS = {'script', 'style', 'noscript', 'template'}
+METADATA_FIELDS = ['exp_id', 'link', 'property_kind', 'location', 'page']
+
+
+# Funktion zum Sammeln der Textknoten mit Zeilenumbrüchen um Block-Elemente
+def collect_text(node, parts):
+    for child in node.children:
+        if isinstance(child, NavigableString):
+            # Kommentare, Doctype usw. sind Unterklassen von NavigableString und werden übersprungen
+            if type(child) is NavigableString:
+                parts.append(str(child))
+        elif isinstance(child, Tag) and child.name not in INVISIBLE_TAGS:
+            if child.name == 'br':
+                parts.append("\n")
+                continue
+            is_block = child.name in BLOCK_TAGS
+            if is_block:
+                parts.append("\n")
+            collect_text(child, parts)
+            if is_block:
+                parts.append("\n")
+
+
+# Funktion zur Nachbildung des sichtbaren Textes eines Elements (wie WebElement.text)
+def visible_text(element):
+    parts = []
+    collect_text(element, parts)
+    lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+# Funktion zur Extraktion eines Feldes mit Fallback-Selektor und "nil" als Standardwert
+def select_text(soup, selector, fallback_selector=None):
+    element = soup.select_one(selector)
+    if element is None and fallback_selector:
+        element = soup.select_one(fallback_selector)
+    return visible_text(element) if element is not None else "nil"
+
+
+# Funktion zur Extraktion eines Detaildatensatzes aus dem HTML einer Exposé-Seite
+def parse_expose_html(html, extra_selectors=None):
+    """
+    Args:
+        html (str): HTML einer Exposé-Seite.
+        extra_selectors (dict, optional): Zusätzliche Felder als Feldname -> (Selektor, Fallback).
+
+    Returns:
+        dict: Detaildatensatz im Format von extract_details oder None, wenn die Seite
+            keine Detailsektion enthält.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    if soup.select_one("div.is24-ex-details") is None:
+        return None
+
+    selectors = {**DETAIL_SELECTORS, **(extra_selectors or {})}
+    details = {field: select_text(soup, selector, fallback_selector)
+               for field, (selector, fallback_selector) in selectors.items()}
+    details['criteriagroup_boolean_listing'] = {
+        span.get('class')[0]: visible_text(span) for span in soup.select(CRITERIA_SELECTOR)
+    }
+    return details
+
+
+# Funktion zur Verarbeitung eines Indexeintrags in einem Worker-Prozess
+def parse_entry(archive_dir, extra_selectors, entry):
+    details = parse_expose_html(HtmlArchive(archive_dir).load(entry['sha256']), extra_selectors)
+    if details is None:
+        return None
+    return {**{field: entry[field] for field in METADATA_FIELDS}, **details}
+
+
+# Hauptfunktion zum Neuaufbau aller Datensätze aus dem Archiv
+def reparse_archive(archive_dir, output_path, extra_selectors=None, max_workers=None, chunksize=64):
+    entries = HtmlArchive(archive_dir).latest_entries()
+    print(f"Reparsing {len(entries)} archived exposés with {max_workers or os.cpu_count()} processes...")
+
+    fieldnames = METADATA_FIELDS + list({**DETAIL_SELECTORS, **(extra_selectors or {})}) + \
+        ['criteriagroup_boolean_listing']
+    parsed = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as executor, \
+            open(output_path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames)
+        writer.writeheader()
+        for record in executor.map(partial(parse_entry, archive_dir, extra_selectors), entries, chunksize=chunksize):
+            if record is not None:
+                writer.writerow(record)
+                parsed += 1
+
+    print(f"{parsed} of {len(entries)} exposés parsed and saved to {output_path}")
+    return parsed
+
+
+if __name__ == '__main__':
+    reparse_archive('html_archive', 'reparsed_properties.csv')
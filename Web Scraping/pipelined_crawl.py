@@ -0,0 +1,272 @@
+"""
+Pipelinierter Crawl für ImmobilienScout24 (Producer/Consumer).
+
+Ein Producer mit eigener WebDriver-Sitzung lädt und expandiert die Ergebnisseiten und
+legt die gefundenen Exposé-Links in eine begrenzte Queue. Mehrere Consumer-Sitzungen
+entnehmen die Links und extrahieren die Details, während der Producer bereits die
+nächste Ergebnisseite vorbereitet. Ist die Queue voll, blockiert der Producer
+(Backpressure). Sobald alle Exposés einer Seite bearbeitet sind, schreibt der Hauptthread
+die Seite als CSV-Datei. Unterstützt werden alle Suchkategorien aus PROPERTY_KINDS.
+"""
+
+import queue
+import threading
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from crawl_frontier import CrawlFrontier
+from crawl_metrics import CrawlMetrics, metrics_for
+from html_archive import HtmlArchive
+from rate_limiter import limiter_for
+from record_sink import StreamingRecordSink
+from wait_conditions import PageTimer
+from websraping_immoscout24 import (BASE_URL, PROPERTY_KINDS, create_driver, get_url, open_page, get_total_pages,
+                                    expand_all_grouped_listings, collect_all_listings, extract_details_batched,
+                                    save_data_to_csv, locations)
+
+
+class PageWork:
+    """
+    Sammelt die Ergebnisse aller Exposés einer Ergebnisseite.
+
+    Args:
+        property_kind (str): Suchkategorie der Seite.
+        location (str): Bundesland der Seite.
+        page (int): Seitennummer.
+        listings (list): Liste von (exp_id, link)-Tupeln.
+    """
+
+    def __init__(self, property_kind, location, page, listings):
+        self.property_kind = property_kind
+        self.location = location
+        self.page = page
+        self.listings = listings
+        self.records = [None] * len(listings)
+        self.remaining = len(listings)
+        self.lock = threading.Lock()
+
+    # Funktion zum Eintragen eines Ergebnisses; liefert True, wenn die Seite vollständig ist
+    def set_record(self, position, record):
+        with self.lock:
+            self.records[position] = record
+            self.remaining -= 1
+            return self.remaining == 0
+
+
+# Funktion zum Einreihen eines Links; gibt auf, sobald der Hauptthread den Crawl beendet hat
+def put_link(link_queue, item, stop):
+    while not stop.is_set():
+        try:
+            link_queue.put(item, timeout=1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+# Funktion des Producers: Ergebnisseiten laden, expandieren und Links einreihen
+def produce_links(property_kinds, locations, link_queue, done_queue, state, base_url, start_page, frontier_path,
+                  driver_options=None, rate_limiter=None, metrics=None, max_retries=2):
+    metrics = metrics or CrawlMetrics()
+    driver = create_driver(driver_options=driver_options)
+    frontier = CrawlFrontier(frontier_path) if frontier_path else None
+    try:
+        captcha_handled = False
+        for property_kind in property_kinds:
+            for location in locations:
+                # Die Gesamtseitenanzahl ist erst nach dem Laden der ersten Seite bekannt
+                total_pages = start_page
+                page = start_page
+                while page <= total_pages:
+                    if page != start_page and frontier is not None and \
+                            frontier.page_status(location, page, property_kind) == 'done':
+                        print(f"Skipping {property_kind} {location} page {page}, already done.")
+                        page += 1
+                        continue
+
+                    # Wiederholungsversuche pro Seite wie in crawl_pool.crawl_worker
+                    for attempt in range(1, max_retries + 2):
+                        try:
+                            print(f"Producer accessing {property_kind} {location} page {page}...")
+                            timer = PageTimer(location, page)
+                            # Das erste CAPTCHA der Sitzung wird erwartet, spätere werden beim Auftreten gelöst
+                            open_page(driver, get_url(location, page, base_url, property_kind), rate_limiter,
+                                      expect_captcha=not captcha_handled, timer=timer, metrics=metrics,
+                                      location=location)
+                            captcha_handled = True
+                            if page == start_page:
+                                with metrics.phase('pagination', location=location):
+                                    total_pages = get_total_pages(driver, timer=timer)
+                            if frontier is not None and frontier.page_status(location, page, property_kind) == 'done':
+                                print(f"Skipping {property_kind} {location} page {page}, already done.")
+                                listings = None
+                                break
+
+                            with metrics.phase('expansion', location=location, page=page):
+                                expand_all_grouped_listings(driver, timer=timer)
+                            with metrics.phase('link_collection', location=location, page=page):
+                                listings = collect_all_listings(driver, base_url)
+                            if frontier is not None:
+                                listings = frontier.claim_exposes(listings, location, page, property_kind)
+                            timer.print_report()
+                            break
+                        except WebDriverException as e:
+                            print(f"Producer error on {property_kind} {location} page {page} (attempt {attempt}): {e}")
+                            metrics.retry(location=location, page=page, attempt=attempt)
+                            # Nach einem Fehler wird das CAPTCHA beim nächsten Aufruf erneut geprüft
+                            captcha_handled = False
+                            if frontier is not None:
+                                frontier.release_page(location, page, property_kind)
+                    else:
+                        print(f"Producer gave up on {property_kind} {location} page {page}.")
+                        if frontier is not None:
+                            frontier.mark_page(location, page, 'failed', property_kind)
+                        page += 1
+                        continue
+
+                    if listings is not None:
+                        work = PageWork(property_kind, location, page, listings)
+                        with state['lock']:
+                            state['pages_produced'] += 1
+                        if not listings:
+                            done_queue.put(work)
+                        # Die Queue ist begrenzt und bremst so den Producer
+                        for position, (exp_id, link) in enumerate(listings):
+                            if not put_link(link_queue, (work, position, exp_id, link), state['stop']):
+                                return
+                    page += 1
+    finally:
+        driver.quit()
+        if frontier is not None:
+            frontier.close()
+        state['producer_done'].set()
+
+
+# Funktion eines Consumers: Exposés besuchen und Details extrahieren
+def consume_links(consumer_id, link_queue, done_queue, frontier_path, driver_options=None, archive_dir=None,
+                  rate_limiter=None, metrics=None):
+    metrics = metrics or CrawlMetrics()
+    driver = create_driver(driver_options=driver_options)
+    frontier = CrawlFrontier(frontier_path) if frontier_path else None
+    archive = HtmlArchive(archive_dir) if archive_dir else None
+    captcha_handled = False
+    try:
+        while True:
+            item = link_queue.get()
+            if item is None:
+                break
+            work, position, exp_id, link = item
+            details = None
+            try:
+                with metrics.phase('expose_load', exp_id=exp_id):
+                    # Auch jede Consumer-Sitzung erhält beim ersten Aufruf ihr CAPTCHA
+                    open_page(driver, link, rate_limiter, expect_captcha=not captcha_handled, metrics=metrics,
+                              exp_id=exp_id)
+                captcha_handled = True
+                with metrics.phase('extraction', exp_id=exp_id):
+                    details = extract_details_batched(driver)
+                if archive is not None:
+                    archive.store(driver.page_source, exp_id, link, work.property_kind, work.location, work.page)
+                if details is None:
+                    metrics.timeout('details', exp_id=exp_id)
+                else:
+                    metrics.record(details, exp_id=exp_id)
+            except TimeoutException:
+                print(f"[consumer {consumer_id}] Timeout loading {link}.")
+                metrics.timeout('page_load', exp_id=exp_id)
+                details = None
+            except Exception as e:
+                # Auch andere Fehler (z.B. OSError beim Archivieren) betreffen nur dieses Exposé
+                print(f"[consumer {consumer_id}] Error on {link}: {e}")
+                details = None
+            finally:
+                # Das Ergebnis wird immer eingetragen, damit die Seite abgeschlossen werden kann
+                if work.set_record(position, details):
+                    done_queue.put(work)
+            if details is None and frontier is not None:
+                frontier.mark_expose(exp_id, 'failed')
+    finally:
+        driver.quit()
+        if frontier is not None:
+            frontier.close()
+
+
+# Hauptprogramm des pipelinierten Crawls
+def run_pipelined_crawl(locations, property_kinds=('haus-kaufen',), num_consumers=3, max_queued_links=60,
+                        base_url=BASE_URL, start_page=1, frontier_path=None, write_page=save_data_to_csv,
+                        driver_options=None, archive_dir=None, rate_limits=None, metrics_dir=None):
+    for property_kind in property_kinds:
+        if property_kind not in PROPERTY_KINDS:
+            raise ValueError(f"Unknown property kind: {property_kind}")
+
+    link_queue = queue.Queue(maxsize=max_queued_links)
+    done_queue = queue.Queue()
+    state = {'lock': threading.Lock(), 'pages_produced': 0, 'producer_done': threading.Event(),
+             'stop': threading.Event()}
+
+    frontier = CrawlFrontier(frontier_path) if frontier_path else None
+    if frontier is not None:
+        frontier.reset_in_progress()
+    # Producer und Consumer teilen sich einen Limiter, der alle Seitenaufrufe taktet
+    rate_limiter = limiter_for(base_url, rate_limits)
+    metrics = metrics_for(metrics_dir, 'pipeline')
+
+    producer = threading.Thread(target=produce_links,
+                                args=(property_kinds, locations, link_queue, done_queue, state, base_url,
+                                      start_page, frontier_path, driver_options, rate_limiter, metrics))
+    consumers = [threading.Thread(target=consume_links,
+                                  args=(consumer_id, link_queue, done_queue, frontier_path, driver_options,
+                                        archive_dir, rate_limiter, metrics))
+                 for consumer_id in range(num_consumers)]
+    producer.start()
+    for consumer in consumers:
+        consumer.start()
+
+    # Der Hauptthread schreibt fertige Seiten, bis der Producer fertig und alles geschrieben ist
+    pages_written = 0
+    while True:
+        try:
+            work = done_queue.get(timeout=1)
+        except queue.Empty:
+            with state['lock']:
+                finished = state['producer_done'].is_set() and pages_written >= state['pages_produced']
+            if finished:
+                break
+            if not any(consumer.is_alive() for consumer in consumers):
+                print("All consumers exited, stopping the producer.")
+                break
+            continue
+
+        print(f"Rate limiter: {rate_limiter.state()}")
+
+        records = [record for record in work.records if record]
+        if records:
+            write_page(records, work.location, work.page, work.property_kind)
+        if frontier is not None:
+            exp_ids = [exp_id for (exp_id, _), record in zip(work.listings, work.records) if record]
+            frontier.complete_page(work.location, work.page, exp_ids, work.property_kind)
+        pages_written += 1
+        metrics.flush()
+
+    # Ein noch blockierter Producer gibt beim nächsten put_link auf
+    state['stop'].set()
+    producer.join()
+    for consumer in consumers:
+        if consumer.is_alive():
+            link_queue.put(None)
+    for consumer in consumers:
+        consumer.join()
+
+    print(f"Crawl metrics: {metrics.flush()}")
+    if frontier is not None:
+        print(f"Frontier summary: {frontier.summary()}")
+        frontier.close()
+    print(f"Data collection complete, {pages_written} pages written.")
+    return pages_written
+
+
+if __name__ == '__main__':
+    with StreamingRecordSink() as record_sink:
+        run_pipelined_crawl(locations, property_kinds=('haus-kaufen', 'wohnung-kaufen'),
+                            frontier_path='crawl_frontier.sqlite3', write_page=record_sink.write_page,
+                            metrics_dir='crawl_metrics')
@@ -0,0 +1,171 @@
+"""
+Adaptiver Token-Bucket-Scheduler für alle Seitenaufrufe des Crawlers.
+
+Jede Navigation (Ergebnisseite oder Exposé) entnimmt vorher ein Token aus einem
+gemeinsamen Bucket pro Host. Die Nachfüllrate steigt additiv, solange die Ladezeiten
+unter latency_target bleiben, und sinkt multiplikativ, sobald sie darüber liegen (AIMD).
+Erscheint ein CAPTCHA oder läuft ein Seitenaufruf in einen Timeout, pausieren alle
+Sitzungen für eine exponentiell wachsende Backoff-Zeit; der erste gesunde Aufruf danach
+setzt den Backoff-Zähler zurück.
+
+Der Zustand liegt in einem geteilten multiprocessing.Array und gilt damit gleichermaßen
+für Threads (pipelined_crawl) und für Worker-Prozesse (crawl_pool), denen der Limiter
+beim Start als Argument übergeben wird.
+"""
+
+import multiprocessing as mp
+import time
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+
+# Grenzwerte des Schedulers (Raten in Aufrufen pro Sekunde, Zeiten in Sekunden)
+RATE_LIMITS = {
+    'initial_rate': 0.5,
+    'min_rate': 0.1,
+    'max_rate': 4.0,
+    'burst': 2.0,
+    'rate_increase': 0.05,
+    'rate_decrease': 0.5,
+    'latency_target': 3.0,
+    'backoff_base': 15.0,
+    'backoff_max': 600.0,
+}
+
+# Positionen der Zustandswerte im geteilten Array
+RATE, TOKENS, UPDATED_AT, BACKOFF_UNTIL, FAILURE_STREAK, REQUESTS, CAPTCHAS, TIMEOUTS, LATENCY = range(9)
+
+CAPTCHA_SELECTOR = ".geetest_radar_tip"
+
+
+class RateLimiter:
+    """
+    Args:
+        host (str): Host, für den der Bucket gilt (nur zur Anzeige im Zustand).
+        limits (dict, optional): Überschreibungen für RATE_LIMITS.
+        context (multiprocessing context, optional): Kontext, in dem das geteilte Array
+            angelegt wird; für Worker-Prozesse muss es derselbe wie beim Starten der Prozesse sein.
+    """
+
+    def __init__(self, host='www.immobilienscout24.de', limits=None, context=None):
+        self.host = host
+        self.limits = {**RATE_LIMITS, **(limits or {})}
+        context = context or mp.get_context()
+        self.shared = context.Array('d', 9)
+        self.shared[RATE] = self.limits['initial_rate']
+        self.shared[TOKENS] = self.limits['burst']
+        self.shared[UPDATED_AT] = time.time()
+
+    def _refill(self, now):
+        state = self.shared
+        elapsed = max(now - state[UPDATED_AT], 0.0)
+        state[TOKENS] = min(state[TOKENS] + elapsed * state[RATE], self.limits['burst'])
+        state[UPDATED_AT] = now
+
+    # Funktion zum Warten auf ein Token; liefert die gewartete Zeit
+    def acquire(self):
+        waited = 0.0
+        while True:
+            with self.shared.get_lock():
+                now = time.time()
+                self._refill(now)
+                if now < self.shared[BACKOFF_UNTIL]:
+                    delay = self.shared[BACKOFF_UNTIL] - now
+                elif self.shared[TOKENS] >= 1.0:
+                    self.shared[TOKENS] -= 1.0
+                    self.shared[REQUESTS] += 1
+                    return waited
+                else:
+                    delay = (1.0 - self.shared[TOKENS]) / self.shared[RATE]
+            time.sleep(delay)
+            waited += delay
+
+    # Funktion zur Meldung eines erfolgreichen Aufrufs mit seiner Ladezeit
+    def record_success(self, latency):
+        with self.shared.get_lock():
+            self._refill(time.time())
+            state = self.shared
+            # Gleitender Mittelwert der Ladezeit für die Zustandsanzeige
+            state[LATENCY] = latency if state[LATENCY] == 0 else 0.8 * state[LATENCY] + 0.2 * latency
+            if latency <= self.limits['latency_target']:
+                state[RATE] = min(state[RATE] + self.limits['rate_increase'], self.limits['max_rate'])
+                state[FAILURE_STREAK] = 0
+            else:
+                state[RATE] = max(state[RATE] * self.limits['rate_decrease'], self.limits['min_rate'])
+
+    def _back_off(self, counter):
+        with self.shared.get_lock():
+            now = time.time()
+            self._refill(now)
+            state = self.shared
+            state[counter] += 1
+            state[FAILURE_STREAK] += 1
+            state[RATE] = max(state[RATE] * self.limits['rate_decrease'], self.limits['min_rate'])
+            state[TOKENS] = 0.0
+            delay = min(self.limits['backoff_base'] * 2 ** (state[FAILURE_STREAK] - 1), self.limits['backoff_max'])
+            state[BACKOFF_UNTIL] = max(state[BACKOFF_UNTIL], now + delay)
+            rate = state[RATE]
+        print(f"Backing off {self.host} for {delay:.0f} s (rate now {rate:.2f}/s).")
+
+    # Funktion zur Meldung einer CAPTCHA-Seite
+    def record_captcha(self):
+        self._back_off(CAPTCHAS)
+
+    # Funktion zur Meldung eines Timeouts
+    def record_timeout(self):
+        self._back_off(TIMEOUTS)
+
+    # Funktion zur Abfrage des aktuellen Zustands
+    def state(self):
+        with self.shared.get_lock():
+            state = list(self.shared)
+        return {
+            'host': self.host,
+            'rate_per_second': round(state[RATE], 3),
+            'tokens': round(state[TOKENS], 2),
+            'backoff_remaining': round(max(state[BACKOFF_UNTIL] - time.time(), 0.0), 1),
+            'failure_streak': int(state[FAILURE_STREAK]),
+            'requests': int(state[REQUESTS]),
+            'captchas': int(state[CAPTCHAS]),
+            'timeouts': int(state[TIMEOUTS]),
+            'mean_latency': round(state[LATENCY], 3),
+        }
+
+
+# Funktion zur Erstellung eines Limiters für den Host einer Basis-URL
+def limiter_for(base_url, limits=None, context=None):
+    return RateLimiter(urlparse(base_url).netloc, limits, context)
+
+
+# Funktion zum Aufruf einer URL über den Limiter
+def navigate(driver, url, rate_limiter=None, expect_captcha=False):
+    """
+    Ruft url auf und meldet Ladezeit, Timeout oder CAPTCHA an den Limiter. Ohne Limiter
+    wird nur geprüft, ob die Seite ein CAPTCHA enthält.
+
+    Args:
+        expect_captcha (bool): Erster Aufruf einer Sitzung, bei dem das CAPTCHA erwartet und
+            anschließend gelöst wird; es löst keinen Backoff aus.
+
+    Returns:
+        bool: True, wenn die geladene Seite ein CAPTCHA enthält.
+    """
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    start = time.perf_counter()
+    try:
+        driver.get(url)
+    except TimeoutException:
+        if rate_limiter is not None:
+            rate_limiter.record_timeout()
+        raise
+    latency = time.perf_counter() - start
+
+    captcha = bool(driver.find_elements(By.CSS_SELECTOR, CAPTCHA_SELECTOR))
+    if rate_limiter is not None:
+        if not captcha:
+            rate_limiter.record_success(latency)
+        elif not expect_captcha:
+            rate_limiter.record_captcha()
+    return captcha
@@ -0,0 +1,145 @@
+"""
+Streamende, absturzsichere Datensatz-Senke für den Scraper.
+
+Statt einer CSV-Datei pro Ergebnisseite wird jeder Datensatz sofort nach der Extraktion
+an eine Partitionsdatei angehängt: {output_dir}/{property_kind}/{location}/part-00001.csv.
+Erreicht eine Datei max_file_bytes, wird in die nächste Teildatei gewechselt. Alle Dateien
+verwenden das feste Spaltenschema RECORD_FIELDS. An Checkpoints (alle checkpoint_every
+Datensätze und am Ende jeder Ergebnisseite) werden die Puffer geleert und per fsync auf
+die Platte geschrieben. Eine nach einem Absturz unvollständige letzte Zeile wird beim
+erneuten Öffnen abgeschnitten.
+"""
+
+import csv
+import os
+import re
+
+from expose_selectors import RECORD_FIELDS
+
+PART_PATTERN = re.compile(r'^part-(\d{5})\.csv$')
+RECORD_TERMINATOR = b'\r\n'
+
+
+class StreamingRecordSink:
+    """
+    Args:
+        output_dir (str): Wurzelverzeichnis der Partitionen.
+        max_file_bytes (int): Größe, ab der in eine neue Teildatei gewechselt wird.
+        checkpoint_every (int): Anzahl der Datensätze zwischen zwei fsync-Checkpoints.
+        fieldnames (list): Festes Spaltenschema; fehlende Felder werden mit "nil" belegt.
+    """
+
+    def __init__(self, output_dir='records', max_file_bytes=64 * 1024 * 1024, checkpoint_every=50,
+                 fieldnames=RECORD_FIELDS):
+        self.output_dir = output_dir
+        self.max_file_bytes = max_file_bytes
+        self.checkpoint_every = checkpoint_every
+        self.fieldnames = list(fieldnames)
+        self.partitions = {}
+        self.records_since_checkpoint = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # Funktion zum Öffnen der aktuellen Teildatei einer Partition
+    def _open_partition(self, property_kind, location):
+        directory = os.path.join(self.output_dir, property_kind, location)
+        os.makedirs(directory, exist_ok=True)
+        parts = sorted(int(match.group(1)) for match in map(PART_PATTERN.match, os.listdir(directory)) if match)
+        part_number = parts[-1] if parts else 1
+        path = os.path.join(directory, f'part-{part_number:05d}.csv')
+
+        if os.path.exists(path):
+            truncate_partial_line(path)
+            if os.path.getsize(path) >= self.max_file_bytes:
+                part_number += 1
+                path = os.path.join(directory, f'part-{part_number:05d}.csv')
+
+        return self._start_file(directory, part_number, path)
+
+    def _start_file(self, directory, part_number, path):
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        file = open(path, 'a', newline='', encoding='utf-8')
+        writer = csv.DictWriter(file, fieldnames=self.fieldnames, restval='nil', extrasaction='ignore',
+                                lineterminator=RECORD_TERMINATOR.decode('ascii'))
+        if is_new:
+            writer.writeheader()
+        return {'directory': directory, 'part_number': part_number, 'path': path, 'file': file, 'writer': writer}
+
+    # Funktion zum Schreiben eines einzelnen Datensatzes
+    def write(self, record, property_kind, location):
+        key = (property_kind, location)
+        partition = self.partitions.get(key)
+        if partition is None:
+            partition = self.partitions[key] = self._open_partition(property_kind, location)
+
+        partition['writer'].writerow(record)
+        self.records_since_checkpoint += 1
+        if self.records_since_checkpoint >= self.checkpoint_every:
+            self.checkpoint()
+
+        if partition['file'].tell() >= self.max_file_bytes:
+            self._roll_over(key)
+
+    # Funktion zum Schreiben einer ganzen Ergebnisseite (Signatur wie save_data_to_csv)
+    def write_page(self, all_data, location, current_page, property_kind='haus-kaufen'):
+        for record in all_data:
+            self.write(record, property_kind, location)
+        self.checkpoint()
+        print(f"Data for {location}, page {current_page} appended to {self.output_dir}.")
+
+    def _roll_over(self, key):
+        partition = self.partitions[key]
+        self._sync(partition)
+        partition['file'].close()
+        part_number = partition['part_number'] + 1
+        path = os.path.join(partition['directory'], f'part-{part_number:05d}.csv')
+        self.partitions[key] = self._start_file(partition['directory'], part_number, path)
+
+    @staticmethod
+    def _sync(partition):
+        partition['file'].flush()
+        os.fsync(partition['file'].fileno())
+
+    # Funktion zum dauerhaften Sichern aller offenen Partitionen
+    def checkpoint(self):
+        for partition in self.partitions.values():
+            self._sync(partition)
+        self.records_since_checkpoint = 0
+
+    def close(self):
+        self.checkpoint()
+        for partition in self.partitions.values():
+            partition['file'].close()
+        self.partitions = {}
+
+
+# Funktion zum Abschneiden einer nach einem Absturz unvollständigen letzten Zeile
+def truncate_partial_line(path):
+    """
+    Datensätze enden mit CRLF, Zeilenumbrüche innerhalb von Feldern (z.B. in 'address')
+    bestehen dagegen nur aus LF. Daher wird bis zum letzten CRLF gekürzt.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return
+    with open(path, 'rb+') as file:
+        file.seek(max(size - 2, 0))
+        if file.read() == RECORD_TERMINATOR:
+            return
+        # Rückwärts bis zum letzten vollständigen Datensatzende suchen (Blöcke überlappen um ein Byte)
+        position = size
+        block_size = 64 * 1024
+        while position > 0:
+            start = max(position - block_size, 0)
+            file.seek(start)
+            block = file.read(min(position + 1, size) - start)
+            terminator = block.rfind(RECORD_TERMINATOR)
+            if terminator != -1:
+                file.truncate(start + terminator + len(RECORD_TERMINATOR))
+                return
+            position = start
+        file.truncate(0)
@@ -0,0 +1,40 @@
+import os
+import shutil
+
+import pytest
+
+from crawl_pool import run_crawl_pool
+from fixture_server import FixtureSite, start_fixture_server, stop_fixture_server
+
+# Pfad des ChromeDrivers wie im Hauptprogramm, ersatzweise aus dem PATH
+DRIVER_PATH = "./chromedriver/chromedriver" if os.path.isfile("./chromedriver/chromedriver") \
+    else shutil.which('chromedriver')
+LOCATIONS = ['berlin', 'bremen']
+
+pytestmark = pytest.mark.skipif(DRIVER_PATH is None, reason="chromedriver not available")
+
+
+@pytest.fixture
+def fixture_site():
+    site = FixtureSite(total_pages=2, listings_per_page=3, grouped_per_page=1, images_per_expose=0)
+    server = start_fixture_server(site)
+    yield site, server.base_url
+    stop_fixture_server(server)
+
+
+def test_crawl_pool_writes_all_pages_in_order(fixture_site):
+    site, base_url = fixture_site
+    written = []
+
+    def write_page(records, location, page, property_kind='haus-kaufen'):
+        written.append((location, page, sorted(record['title'] for record in records)))
+
+    failed_pages = run_crawl_pool(LOCATIONS, num_workers=2, base_url=base_url, captcha_timeout=1,
+                                  driver_path=DRIVER_PATH, write_page=write_page,
+                                  driver_options={'headless': True})
+
+    assert failed_pages == []
+    expected = [(location, page, sorted(f"Fixture-Haus {site.exp_id(location, page, position)}"
+                                        for position in range(site.listings_per_page + site.grouped_per_page)))
+                for location in LOCATIONS for page in range(1, site.total_pages + 1)]
+    assert written == expected
@@ -0,0 +1,142 @@
+"""
+Bedingungsbasierte Wartefunktionen für den Scraper.
+
+Anstelle fester time.sleep-Pausen wird gewartet, bis eine Bedingung erfüllt ist
+(DOM ruhig, Seite geladen, CAPTCHA verschwunden). Jede Wartezeit
+ist durch eine konfigurierbare Obergrenze aus WAIT_LIMITS beschränkt. Der PageTimer
+protokolliert pro Ergebnisseite, wie viel Zeit mit Warten und wie viel mit Arbeit
+verbracht wurde.
+"""
+
+import json
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Obergrenzen und Ruhezeiten der Wartebedingungen in Sekunden
+WAIT_LIMITS = {
+    'poll_interval': 0.05,
+    'captcha_appear': 20,
+    'captcha_settle': 5,
+    'expand_quiet': 0.15,
+    'expand_pass': 0.5,
+    'expand_final_check': 1.0,
+    'pagination': 10,
+    'pagination_retry': 2,
+}
+
+# JavaScript, das einen MutationObserver installiert und den Zeitpunkt der letzten DOM-Änderung liefert
+DOM_QUIET_SCRIPT = """
+if (!window.__scraperMutationObserver) {
+    window.__scraperLastMutation = Date.now();
+    window.__scraperMutationObserver = new MutationObserver(function () {
+        window.__scraperLastMutation = Date.now();
+    });
+    window.__scraperMutationObserver.observe(document.documentElement,
+        {childList: true, subtree: true, attributes: true});
+}
+return Date.now() - window.__scraperLastMutation;
+"""
+
+
+# Funktion zur Bestimmung eines Grenzwerts mit optionaler Überschreibung
+def get_limit(name, limits=None):
+    if limits and name in limits:
+        return limits[name]
+    return WAIT_LIMITS[name]
+
+
+# Funktion zum Warten, bis der DOM für eine Ruhezeit keine Änderungen mehr zeigt
+def wait_for_dom_quiet(driver, quiet_for, timeout, poll_interval=None):
+    """
+    Wartet, bis seit der letzten DOM-Mutation mindestens quiet_for Sekunden vergangen sind.
+
+    Returns:
+        bool: True, wenn der DOM innerhalb des Timeouts zur Ruhe gekommen ist.
+    """
+    poll_interval = poll_interval or WAIT_LIMITS['poll_interval']
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            quiet_ms = driver.execute_script(DOM_QUIET_SCRIPT)
+        except WebDriverException:
+            quiet_ms = 0
+        if quiet_ms is not None and quiet_ms >= quiet_for * 1000:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(poll_interval)
+
+
+# Funktion zum Warten auf den vollständig geladenen Dokumentzustand
+def wait_for_ready_state(driver, timeout):
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=WAIT_LIMITS['poll_interval']).until(
+            lambda d: d.execute_script("return document.readyState") == 'complete')
+        return True
+    except TimeoutException:
+        return False
+
+
+# Funktion zum Warten, bis ein Element verschwunden ist
+def wait_for_invisibility(driver, css_selector, timeout):
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=WAIT_LIMITS['poll_interval']).until(
+            EC.invisibility_of_element_located((By.CSS_SELECTOR, css_selector)))
+        return True
+    except TimeoutException:
+        return False
+
+
+class PageTimer:
+    """
+    Misst für eine Ergebnisseite die Gesamtdauer und die darin enthaltenen Wartezeiten.
+
+    Args:
+        location (str): Bundesland der Ergebnisseite.
+        page (int): Seitennummer.
+    """
+
+    def __init__(self, location=None, page=None):
+        self.location = location
+        self.page = page
+        self.started = time.perf_counter()
+        self.wait_seconds = {}
+
+    @contextmanager
+    def waiting(self, label):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.wait_seconds[label] = self.wait_seconds.get(label, 0.0) + time.perf_counter() - start
+
+    def report(self):
+        total = time.perf_counter() - self.started
+        waiting = sum(self.wait_seconds.values())
+        return {
+            'location': self.location,
+            'page': self.page,
+            'total_seconds': round(total, 3),
+            'wait_seconds': round(waiting, 3),
+            'work_seconds': round(total - waiting, 3),
+            'wait_share': round(waiting / total, 3) if total > 0 else 0.0,
+            'wait_breakdown': {label: round(seconds, 3) for label, seconds in self.wait_seconds.items()},
+        }
+
+    def print_report(self):
+        report = self.report()
+        print(f"Timing {report['location']} page {report['page']}: total {report['total_seconds']} s, "
+              f"waiting {report['wait_seconds']} s ({report['wait_share']:.0%}), working {report['work_seconds']} s")
+        return report
+
+    # Funktion zum Anhängen des Berichts an eine JSON-Lines-Datei
+    def write_report(self, path):
+        report = self.report()
+        with open(path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(report, ensure_ascii=False) + "\n")
+        return report
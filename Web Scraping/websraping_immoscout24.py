@@ -1,5 +1,5 @@
 import csv
-import time
+import json
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -7,31 +7,116 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.chrome.service import Service
 
+from crawl_frontier import CrawlFrontier
+from crawl_metrics import CrawlMetrics, metrics_for
+from rate_limiter import limiter_for, navigate
+from expose_selectors import DETAIL_SELECTORS, CRITERIA_SELECTOR, RECORD_FIELDS
+from record_sink import StreamingRecordSink
+from wait_conditions import (PageTimer, get_limit, wait_for_dom_quiet, wait_for_invisibility,
+                             wait_for_ready_state)
 
-# Funktion zur CAPTCHAs-Umgehung
-def wait_and_click_captcha(driver):
+# Basis-URL der Immobilienplattform (für lokale Tests durch einen Fixture-Server ersetzbar)
+BASE_URL = "https://www.immobilienscout24.de"
+
+# URL-Muster der Bilder; sie werden freigegeben, solange ein CAPTCHA gelöst wird (geetest lädt Bilder)
+IMAGE_URL_PATTERNS = ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico']
+
+# URL-Muster der Ressourcen, die extract_details nicht benötigt (Bilder, Schriften, Videos sowie Karten
+# und Tracking nur von bekannten Fremd-Hosts, damit keine Skripte der Plattform selbst betroffen sind)
+BLOCKED_URL_PATTERNS = IMAGE_URL_PATTERNS + [
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm',
+    '*maps.googleapis.com*', '*maps.gstatic.com*', '*tile.openstreetmap.org*',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*facebook.net*',
+    '*hotjar.com*',
+]
+
+# Einstellungen der Chrome-Sitzung; einzelne Werte können in create_driver überschrieben werden
+DRIVER_OPTIONS = {
+    'block_resources': True,
+    'blocked_url_patterns': BLOCKED_URL_PATTERNS,
+    'page_load_strategy': 'eager',
+    'headless': False,
+    'page_load_timeout': 60,
+}
+
+# Suchkategorien und das Präfix der zugehörigen CSV-Dateien
+PROPERTY_KINDS = {
+    'haus-kaufen': 'HAUS_property_data',
+    'wohnung-kaufen': 'property_data',
+}
+
+
+# Funktion zum Setzen der blockierten URL-Muster einer Sitzung; allow_images lässt Bilder durch
+def block_urls(driver, allow_images=False):
+    patterns = getattr(driver, 'blocked_url_patterns', None)
+    if patterns is None:
+        return
+    if allow_images:
+        patterns = [pattern for pattern in patterns if pattern not in IMAGE_URL_PATTERNS]
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+
+# Funktion zur CAPTCHAs-Umgehung; liefert True, wenn das CAPTCHA geklickt wurde und verschwunden ist
+def wait_and_click_captcha(driver, timeout=None, limits=None, timer=None):
+    timer = timer or PageTimer()
     try:
         print("Waiting for CAPTCHA...")
-        captcha_button = WebDriverWait(driver, 20).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, ".geetest_radar_tip"))
-        )
+        with timer.waiting('captcha'):
+            captcha_button = WebDriverWait(driver, timeout or get_limit('captcha_appear', limits)).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, ".geetest_radar_tip"))
+            )
         captcha_button.click()
         print("CAPTCHA clicked.")
-        time.sleep(5)
+        # Statt fester 5 s wird gewartet, bis das CAPTCHA-Widget verschwunden ist
+        with timer.waiting('captcha'):
+            return wait_for_invisibility(driver, ".geetest_radar_tip", get_limit('captcha_settle', limits))
     except TimeoutException:
         print("CAPTCHA not found or not clickable within the timeout period.")
+        return False
+
+
+# Funktion zum Aufruf einer Seite, bei dem ein erscheinendes CAPTCHA gelöst wird
+def open_page(driver, url, rate_limiter=None, expect_captcha=False, captcha_timeout=None, limits=None, timer=None,
+              metrics=None, **context):
+    """
+    Ruft url über navigate auf. Beim ersten Aufruf einer Sitzung (expect_captcha) wird wie
+    bisher auf das CAPTCHA gewartet, ohne dass der Limiter einen Backoff auslöst. Ein später
+    unerwartet erscheinendes CAPTCHA wird ebenfalls gelöst; gelingt das nicht, wird eine
+    TimeoutException ausgelöst, damit der Wiederholungsversuch des Aufrufers greift.
+
+    Args:
+        context: Zusätzliche Angaben für die Metrik der CAPTCHA-Phase, z.B. location oder exp_id.
+
+    Returns:
+        bool: True, wenn die geladene Seite ein CAPTCHA enthielt.
+    """
+    captcha = navigate(driver, url, rate_limiter, expect_captcha)
+    if captcha or expect_captcha:
+        # Die Bilder der CAPTCHA-Aufgabe werden erst nach dem Klick geladen und bis dahin freigegeben
+        block_urls(driver, allow_images=True)
+        try:
+            with (metrics or CrawlMetrics()).phase('captcha', **context):
+                solved = wait_and_click_captcha(driver, captcha_timeout, limits, timer)
+        finally:
+            block_urls(driver)
+        if captcha and not solved:
+            raise TimeoutException(f"CAPTCHA on {url} was not solved.")
+    return captcha
 
 
 # Funktion zum Expandieren aller gruppierten Immobilienangebote
-def expand_all_grouped_listings(driver):
+def expand_all_grouped_listings(driver, limits=None, timer=None):
+    timer = timer or PageTimer()
     print("Starting to expand all grouped listings...")
     last_check = False
 
     while True:
         expand_buttons = driver.find_elements(By.CSS_SELECTOR, ".padding-left-none.link-text-secondary.button")
         if not expand_buttons and not last_check:
-            print("No expand buttons found, re-checking after a pause...")
-            time.sleep(1)
+            print("No expand buttons found, re-checking once the page is quiet...")
+            with timer.waiting('expand'):
+                wait_for_dom_quiet(driver, get_limit('expand_quiet', limits), get_limit('expand_final_check', limits))
             last_check = True
             continue
         elif not expand_buttons and last_check:
@@ -43,7 +128,9 @@ def expand_all_grouped_listings(driver):
             if button.is_displayed() and button.is_enabled():
                 driver.execute_script("arguments[0].click();", button)
                 print("Button clicked.")
-        time.sleep(0.5)
+        # Warten, bis die nachgeladenen Angebote eingefügt wurden und der DOM wieder ruhig ist
+        with timer.waiting('expand'):
+            wait_for_dom_quiet(driver, get_limit('expand_quiet', limits), get_limit('expand_pass', limits))
 
     print("Checked and expanded grouped listings where possible.")
     return True
@@ -63,32 +150,58 @@ def find_element_safe(driver, by, value, fallback_selector=None):
             return "nil"
 
 
-# Funktion zur Extraktion der Immobiliendetails
-def extract_details(driver):
+# JavaScript, das alle Felder und die Kriterien-Map in einem einzigen WebDriver-Aufruf ausliest.
+# Nicht gerenderte Elemente liefern wie WebElement.text einen leeren String, fehlende Elemente null.
+EXTRACT_DETAILS_SCRIPT = """
+var fields = arguments[0];
+var criteriaSelector = arguments[1];
+function visibleText(element) {
+    if (element.getClientRects().length === 0) {
+        return '';
+    }
+    return element.innerText.trim();
+}
+function textOf(selector) {
+    var element = selector ? document.querySelector(selector) : null;
+    return element ? visibleText(element) : null;
+}
+var details = {};
+fields.forEach(function (field) {
+    var value = textOf(field[1]);
+    if (value === null) {
+        value = textOf(field[2]);
+    }
+    details[field[0]] = value;
+});
+var criteria = {};
+document.querySelectorAll(criteriaSelector).forEach(function (span) {
+    criteria[span.getAttribute('class').trim().split(/\\s+/)[0]] = visibleText(span);
+});
+return JSON.stringify({details: details, criteria: criteria});
+"""
+
+
+# Funktion zum Warten auf die geladene Exposé-Seite
+def wait_for_details(driver):
     try:
         WebDriverWait(driver, 30).until(EC.visibility_of_element_located((By.CSS_SELECTOR, "div.is24-ex-details")))
+        return True
     except TimeoutException:
         print("Timeout beim Laden der Details. Überprüfe den Selector oder die Internetverbindung.")
+        return False
+
+
+# Funktion zur Extraktion der Immobiliendetails
+def extract_details(driver):
+    if not wait_for_details(driver):
         return None
 
     details = {
-        'title': find_element_safe(driver, By.CSS_SELECTOR, "h1[data-qa='expose-title']"),
-        'price': find_element_safe(driver, By.CSS_SELECTOR, "div.is24qa-kaufpreis-main span", "span.is24-preis-value"),
-        'address': find_element_safe(driver, By.CSS_SELECTOR, "span[data-qa='is24-expose-address'] div.address-block"),
-        'rooms': find_element_safe(driver, By.CSS_SELECTOR, "div.is24qa-zi-main"),
-        'living_space': find_element_safe(driver, By.CSS_SELECTOR, "dd.is24qa-wohnflaeche-ca"),
-        'property_area': find_element_safe(driver, By.CSS_SELECTOR, "dd.is24qa-grundstueck-ca"),
-        'price_per_m2': find_element_safe(driver, By.CSS_SELECTOR, "dd.is24qa-preism²"),
-        'type': find_element_safe(driver, By.CSS_SELECTOR, "dd.is24qa-typ"),
-        'usable_area': find_element_safe(driver, By.CSS_SELECTOR, "dd.is24qa-nutzflaeche-ca"),
-        'available_from': find_element_safe(driver, By.CSS_SELECTOR, "dd.is24qa-bezugsfrei-ab"),
-        'bedrooms': find_element_safe(driver, By.CSS_SELECTOR, "dd.is24qa-schlafzimmer"),
-        'bathrooms': find_element_safe(driver, By.CSS_SELECTOR, "dd.is24qa-badezimmer"),
-        'garage_parking': find_element_safe(driver, By.CSS_SELECTOR, "dd.is24qa-garage-stellplatz"),
-        'buyer_commission': find_element_safe(driver, By.CSS_SELECTOR, "dd.is24qa-provision"),
+        field: find_element_safe(driver, By.CSS_SELECTOR, selector, fallback_selector)
+        for field, (selector, fallback_selector) in DETAIL_SELECTORS.items()
     }
 
-    criteria_spans = driver.find_elements(By.CSS_SELECTOR, "span[class^='is24qa']")
+    criteria_spans = driver.find_elements(By.CSS_SELECTOR, CRITERIA_SELECTOR)
     criteria = {span.get_attribute('class').split()[0]: span.text.strip() for span in criteria_spans}
     details['criteriagroup_boolean_listing'] = criteria
 
@@ -96,39 +209,65 @@ def extract_details(driver):
     return details
 
 
-# Funktion zur Sammlung aller Immobilienlinks
-def collect_all_links(driver):
+# Funktion zur Extraktion der Immobiliendetails mit einem einzigen execute_script-Aufruf
+def extract_details_batched(driver):
+    if not wait_for_details(driver):
+        return None
+
+    fields = [[field, selector, fallback_selector] for field, (selector, fallback_selector) in DETAIL_SELECTORS.items()]
+    result = json.loads(driver.execute_script(EXTRACT_DETAILS_SCRIPT, fields, CRITERIA_SELECTOR))
+
+    details = {field: result['details'][field] if result['details'][field] is not None else "nil"
+               for field in DETAIL_SELECTORS}
+    details['criteriagroup_boolean_listing'] = result['criteria']
+
+    print(f"Details extracted: {details}")
+    return details
+
+
+# Funktion zur Sammlung aller Immobilienangebote als (data-exp-id, Link)-Paare
+def collect_all_listings(driver, base_url=BASE_URL):
     WebDriverWait(driver, 30).until(
         EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'a[data-exp-id]'))
     )
 
-    links = []
+    listings = {}
     selectors = [
         "a[data-exp-id][data-exp-referrer='RESULT_LIST_LISTING']",
         "a[data-exp-id][data-exp-referrer='RESULT_LIST_GROUPED']",
         "a[data-exp-id][data-exp-referrer='RESULT_LIST_LISTING_HOMEBUILDER_GROUPED']"
     ]
 
+    # Das Dictionary dedupliziert über die Exposé-ID in konstanter Zeit und behält die Reihenfolge bei
     for selector in selectors:
         link_elements = driver.find_elements(By.CSS_SELECTOR, selector)
         for link_element in link_elements:
             link = link_element.get_attribute('href')
             if link and not link.startswith("http"):
-                link = "https://www.immobilienscout24.de" + link
-            if link not in links:
-                links.append(link)
+                link = base_url + link
+            exp_id = link_element.get_attribute('data-exp-id') or link
+            if exp_id not in listings:
+                listings[exp_id] = link
 
-    print(f"Total links collected: {len(links)}")
-    return links
+    print(f"Total links collected: {len(listings)}")
+    return list(listings.items())
+
+
+# Funktion zur Sammlung aller Immobilienlinks
+def collect_all_links(driver, base_url=BASE_URL):
+    return [link for _, link in collect_all_listings(driver, base_url)]
 
 
 # Funktion zur Bestimmung der Gesamtseitenanzahl
-def get_total_pages(driver):
+def get_total_pages(driver, limits=None, timer=None):
+    timer = timer or PageTimer()
     retry_attempts = 0
     max_retries = 2
     while retry_attempts <= max_retries:
         try:
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, 'ul.reactPagination')))
+            with timer.waiting('pagination'):
+                WebDriverWait(driver, get_limit('pagination', limits)).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, 'ul.reactPagination')))
             pagination_links = driver.find_elements(By.CSS_SELECTOR, 'ul.reactPagination li:not(.p-prev):not(.p-next) a')
             pages_numbers = [link.text for link in pagination_links if link.text.isdigit()]
             max_page = max(map(int, pages_numbers)) if pages_numbers else 1
@@ -136,51 +275,142 @@ def get_total_pages(driver):
             return max_page
         except Exception as e:
             print(f"Error fetching pagination info on attempt {retry_attempts}: {e}")
-            time.sleep(2)
+            with timer.waiting('pagination'):
+                wait_for_ready_state(driver, get_limit('pagination_retry', limits))
             retry_attempts += 1
     print("Failed to find pagination after all retries.")
     return 1
 
 
-# Hauptprogramm zur Ausführung des Scraping-Vorgangs
-def main(locations, start_page=1):
-    service = Service(executable_path="./chromedriver/chromedriver")
-    driver = webdriver.Chrome(service=service)
+# Funktion zum Starten einer Chrome-Sitzung
+def create_driver(executable_path="./chromedriver/chromedriver", driver_options=None):
+    driver_options = {**DRIVER_OPTIONS, **(driver_options or {})}
+    options = webdriver.ChromeOptions()
+    options.page_load_strategy = driver_options['page_load_strategy']
+    if driver_options['headless']:
+        options.add_argument("--headless=new")
+    service = Service(executable_path=executable_path)
+    driver = webdriver.Chrome(service=service, options=options)
+    # Hängende Seitenaufrufe werden als Timeout gemeldet und lösen im Rate-Limiter einen Backoff aus
+    driver.set_page_load_timeout(driver_options['page_load_timeout'])
+    if driver_options['block_resources']:
+        # Anfragen auf Bilder, Schriften, Karten und Tracking werden per DevTools-Protokoll blockiert; Bilder
+        # nicht zusätzlich über die Profileinstellungen, da open_page sie für CAPTCHAs wieder freigibt
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.blocked_url_patterns = driver_options['blocked_url_patterns']
+        block_urls(driver)
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => false})")
+    return driver
+
+
+# Funktion zum Scrapen einer bereits geladenen Ergebnisseite
+def scrape_result_page(driver, base_url=BASE_URL, extract=extract_details_batched, frontier=None,
+                       location=None, page=None, limits=None, timer=None, property_kind='haus-kaufen',
+                       archive=None, sink=None, rate_limiter=None, metrics=None, exp_ids=None):
+    metrics = metrics or CrawlMetrics()
+    all_data = []
+    with metrics.phase('expansion', location=location, page=page):
+        expanded = expand_all_grouped_listings(driver, limits, timer)
+    if expanded:
+        with metrics.phase('link_collection', location=location, page=page):
+            listings = collect_all_listings(driver, base_url)
+        # Mit Frontier werden nur Exposés besucht, die noch nicht erledigt sind
+        if frontier is not None:
+            listings = frontier.claim_exposes(listings, location, page, property_kind)
+        for exp_id, link in listings:
+            try:
+                with metrics.phase('expose_load', exp_id=exp_id):
+                    open_page(driver, link, rate_limiter, limits=limits, timer=timer, metrics=metrics, exp_id=exp_id)
+            except TimeoutException:
+                print(f"Timeout loading {link}.")
+                metrics.timeout('page_load', exp_id=exp_id)
+                if frontier is not None:
+                    frontier.mark_expose(exp_id, 'failed')
+                continue
+            with metrics.phase('extraction', exp_id=exp_id):
+                details = extract(driver)
+            # Ohne Detailsektion ist extract beim Warten auf die Seite in den Timeout gelaufen
+            if details:
+                metrics.record(details, exp_id=exp_id)
+            else:
+                metrics.timeout('details', exp_id=exp_id)
+            # Optional wird das Roh-HTML für eine spätere Offline-Auswertung archiviert
+            if archive is not None:
+                archive.store(driver.page_source, exp_id, link, property_kind, location, page)
+            if details:
+                all_data.append(details)
+                # Die Exposé-IDs der gelieferten Datensätze werden für CrawlFrontier.complete_page gesammelt
+                if exp_ids is not None:
+                    exp_ids.append(exp_id)
+                # Mit Senke wird jeder Datensatz sofort nach der Extraktion geschrieben
+                if sink is not None:
+                    sink.write(details, property_kind, location)
+            elif frontier is not None:
+                frontier.mark_expose(exp_id, 'failed')
+    return all_data
+
+
+# Hauptprogramm zur Ausführung des Scraping-Vorgangs
+def main(locations, start_page=1, base_url=BASE_URL, frontier=None, limits=None, timing_report_path=None,
+         property_kind='haus-kaufen', driver_options=None, archive=None, sink=None, rate_limiter=None,
+         metrics=None):
+    metrics = metrics or CrawlMetrics()
+    driver = create_driver(driver_options=driver_options)
+    if frontier is not None:
+        frontier.reset_in_progress()
     for location in locations:
         current_page = start_page
         is_first_iteration = True
-        driver.get(get_url(location, current_page))
+        timer = PageTimer(location, current_page)
+        open_page(driver, get_url(location, current_page, base_url, property_kind), rate_limiter,
+                  expect_captcha=is_first_iteration, limits=limits, timer=timer, metrics=metrics, location=location)
         if is_first_iteration:
-            wait_and_click_captcha(driver)
-            total_pages = get_total_pages(driver)
+            with metrics.phase('pagination', location=location):
+                total_pages = get_total_pages(driver, limits, timer)
             is_first_iteration = False
         while current_page <= total_pages:
+            if frontier is not None and frontier.page_status(location, current_page, property_kind) == 'done':
+                print(f"Skipping {location} page {current_page}, already done.")
+                current_page += 1
+                continue
             print(f"Accessing {location} page {current_page}...")
             if current_page != start_page:
-                driver.get(get_url(location, current_page))
-            if expand_all_grouped_listings(driver):
-                links = collect_all_links(driver)
-                all_data = []
-                for link in links:
-                    driver.get(link)
-                    details = extract_details(driver)
-                    all_data.append(details)
-                save_data_to_csv(all_data, location, current_page)
+                timer = PageTimer(location, current_page)
+                open_page(driver, get_url(location, current_page, base_url, property_kind), rate_limiter,
+                          limits=limits, timer=timer, metrics=metrics, location=location, page=current_page)
+            exp_ids = []
+            all_data = scrape_result_page(driver, base_url, frontier=frontier, location=location, page=current_page,
+                                          limits=limits, timer=timer, property_kind=property_kind, archive=archive,
+                                          sink=sink, rate_limiter=rate_limiter, metrics=metrics, exp_ids=exp_ids)
+            # Die Seite gilt erst als erledigt, wenn ihre Datensätze dauerhaft gespeichert sind
+            if sink is not None:
+                sink.checkpoint()
+            elif all_data:
+                save_data_to_csv(all_data, location, current_page, property_kind)
+            if frontier is not None:
+                frontier.complete_page(location, current_page, exp_ids, property_kind)
+            timer.print_report()
+            if rate_limiter is not None:
+                print(f"Rate limiter: {rate_limiter.state()}")
+            if timing_report_path:
+                timer.write_report(timing_report_path)
+            metrics.flush()
             current_page += 1
     driver.quit()
+    if sink is not None:
+        sink.close()
     print("Data collection complete.")
 
 
 # Funktion zur URL-Generierung
-def get_url(location, page_number=1):
-    return f"https://www.immobilienscout24.de/Suche/de/{location}/haus-kaufen?pagenumber={page_number}"
+def get_url(location, page_number=1, base_url=BASE_URL, property_kind='haus-kaufen'):
+    return f"{base_url}/Suche/de/{location}/{property_kind}?pagenumber={page_number}"
 
 
 # Funktion zum Speichern der Daten in eine CSV-Datei
-def save_data_to_csv(all_data, location, current_page):
-    with open(f'HAUS_property_data_{location}_page_{current_page}.csv', 'w', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=all_data[0].keys())
+def save_data_to_csv(all_data, location, current_page, property_kind='haus-kaufen'):
+    with open(f'{PROPERTY_KINDS[property_kind]}_{location}_page_{current_page}.csv', 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=RECORD_FIELDS, restval='nil', extrasaction='ignore')
         writer.writeheader()
         writer.writerows(all_data)
     print(f"Data for {location}, page {current_page} saved to CSV.")
@@ -190,4 +420,7 @@ locations = ['baden-wuerttemberg', 'bayern', 'berlin', 'brandenburg', 'bremen',
              'hessen', 'mecklenburg-vorpommern', 'niedersachsen', 'nordrhein-westfalen',
              'rheinland-pfalz', 'saarland', 'sachsen', 'sachsen-anhalt', 'schleswig-holstein', 'thueringen']
 
-main(locations)
+if __name__ == '__main__':
+    main(locations, frontier=CrawlFrontier(), timing_report_path='page_timing.jsonl', sink=StreamingRecordSink(),
+         rate_limiter=limiter_for(BASE_URL),
+         metrics=metrics_for('crawl_metrics', 'main'))